@@ -1,9 +1,14 @@
+import csv
 import json
 import os
+import time
+import zlib
+import struct
 import configparser
 from pathlib import Path
 import shutil
 import bpy
+import numpy as np
 
 from .Properties import AC_FOLDER_NAME
 
@@ -22,8 +27,18 @@ def read_json(file):
         return None
     
 
-def read_config(file):
+def write_csv(rows, file, header=None):
+    with open(file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(header)
+        writer.writerows(rows)
+
+
+def read_config(file, preserve_case=False):
     config = configparser.ConfigParser()
+    if preserve_case: # e.g. WIDTH in map.ini
+        config.optionxform = str
     try:
         config.read(file)
     except:
@@ -35,6 +50,30 @@ def write_config(config, file):
         config.write(configfile)
 
 
+def write_png(pixels, file):
+    """ Write an RGBA image (numpy uint8 array (height, width, 4), first row on top) as PNG """
+    height, width = pixels.shape[:2]
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8) # filter byte 0 (none) per row
+    rows[:, 1:] = pixels.reshape(height, width * 4)
+
+    def chunk(tag: bytes, data: bytes):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    with open(file, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>2I5B', width, height, 8, 6, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)))
+        f.write(chunk(b'IEND', b''))
+
+
+def get_file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
 def get_addon_dir():
     return os.path.dirname(os.path.abspath(__file__))
 
@@ -78,6 +117,16 @@ def get_properties(context):
     return context.scene.ac_tools_properties
 
 
+def tag_redraw(area_type: str = 'VIEW_3D'):
+    wm = bpy.context.window_manager
+    if not wm:
+        return
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == area_type:
+                area.tag_redraw()
+
+
 def get_blender_path(path):
     abs_path = bpy.path.abspath(path)
     if not os.path.exists(abs_path):
@@ -85,6 +134,163 @@ def get_blender_path(path):
     return abs_path
 
 
+""" 
+CLASS FileIndex()
+Filename index of a track folder, so lookups don't walk the whole tree each time.
+The index is rebuilt when one of the indexed directories changed (mtime) or on refresh().
+"""
+class FileIndex():
+    VALIDATE_INTERVAL = 2.0 # seconds between directory mtime checks
+
+    def __init__(self, root: str):
+        self._root = root
+        self._files = {}        # filename -> path (first match like os.walk)
+        self._dir_mtimes = {}   # directory -> st_mtime_ns
+        self._last_check = 0.0
+        self.build()
+
+    def build(self):
+        files = {}
+        dir_mtimes = {}
+        for dirpath, _, filenames in os.walk(self._root):
+            try:
+                dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            for name in filenames:
+                files.setdefault(name, os.path.join(dirpath, name))
+
+        self._files = files
+        self._dir_mtimes = dir_mtimes
+        self._last_check = time.monotonic()
+
+    def is_stale(self):
+        for dirpath, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(dirpath).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def lookup(self, filename: str):
+        now = time.monotonic()
+        if now - self._last_check > self.VALIDATE_INTERVAL:
+            if self.is_stale():
+                self.build()
+            self._last_check = now
+
+        path = self._files.get(filename)
+        if path and not os.path.isfile(path): # moved or deleted in between checks
+            self.build()
+            path = self._files.get(filename)
+        return path
+
+
+_file_indices = {} # absolute track folder -> FileIndex
+
+def get_file_index(track_path: str, refresh: bool = False):
+    index = _file_indices.get(track_path)
+    if index is None:
+        index = _file_indices[track_path] = FileIndex(track_path)
+    elif refresh:
+        index.build()
+    return index
+
+def invalidate_file_index(track_path: str = None):
+    if track_path is None:
+        _file_indices.clear()
+    else:
+        _file_indices.pop(bpy.path.abspath(track_path), None)
+"""
+END CLASS
+"""
+
+
+""" 
+CLASS FileWatcher()
+Polls mtime/size of files in the project track folder (bpy.app.timers) and calls back when they changed.
+Files are watched from their first use on (per opened file), nothing is polled before.
+A change is only reported after the file stayed the same for DEBOUNCE seconds (editors write in steps).
+"""
+class FileWatcher():
+    POLL_INTERVAL = 1.0
+    DEBOUNCE = 0.5
+
+    def __init__(self):
+        self._callbacks = {}    # filename -> callback(path)
+        self._paths = {}        # filename -> resolved path
+        self._stamps = {}       # filename -> last reported stamp
+        self._pending = {}      # filename -> (stamp, first seen)
+        self._track_folder = None
+
+    def watch(self, filename: str, callback):
+        self._callbacks[filename] = callback
+
+    def is_watching(self, filename: str):
+        return filename in self._callbacks
+
+    def unwatch(self, filename: str):
+        self._callbacks.pop(filename, None)
+        self._paths.pop(filename, None)
+        self._stamps.pop(filename, None)
+        self._pending.pop(filename, None)
+
+    def reset(self):
+        self._paths.clear()
+        self._stamps.clear()
+        self._pending.clear()
+        self._track_folder = None
+
+    def poll(self, track_folder: str):
+        if track_folder != self._track_folder:
+            self.reset()
+            self._track_folder = track_folder
+
+        if not track_folder or not get_blender_path(track_folder): # no (existing) track folder set yet, nothing to watch
+            return
+
+        now = time.monotonic()
+        tf = None
+        for filename, callback in self._callbacks.items():
+            path = self._paths.get(filename)
+            stamp = get_file_stamp(path) if path else None
+            if stamp is None: # (re)locate file - index lookup, not a folder walk
+                tf = tf or TrackFolder(track_folder)
+                path = tf.get_ac_file_path(filename)
+                stamp = get_file_stamp(path) if path else None
+                self._paths[filename] = path
+
+            if stamp == self._stamps.get(filename):
+                self._pending.pop(filename, None)
+                continue
+
+            pending = self._pending.get(filename)
+            if pending is None or pending[0] != stamp:
+                self._pending[filename] = (stamp, now)
+                continue
+            if now - pending[1] < self.DEBOUNCE:
+                continue
+
+            del self._pending[filename]
+            self._stamps[filename] = stamp
+            try:
+                callback(path)
+            except Exception as e:
+                print(f"Error reloading {filename}: {e}")
+"""
+END CLASS
+"""
+
+file_watcher = FileWatcher()
+
+def _poll_file_watcher():
+    scene = bpy.context.scene
+    if scene and file_watcher._callbacks:
+        file_watcher.poll(get_properties(bpy.context).track_folder)
+    return FileWatcher.POLL_INTERVAL
+
+
 """ 
 CLASS TrackFolder()
 Interface for Track Folder and property 'track_folder' 
@@ -109,18 +315,24 @@ class TrackFolder():
 
 
     def get_ac_file_path(self, filename: str):
+        """ Path of filename somewhere in the track folder, None if the folder or file doesn't exist (callers report it) """
         track_path = get_blender_path(self._path)
         if not track_path:
-            print(f"Cannot locate '{self._path}'")
             return None
         
-        # file: collection of: (<path>, <subfolders>, <files>)
-        for file in os.walk(track_path):
-            for name in file[2]:
-                #print(os.path.join(file[0], name))
-                if name == filename:
-                    return os.path.join(file[0], name)
-        return None
+        return get_file_index(track_path).lookup(filename)
+
+    def get_folder(self, subfolder: str = ""):
+        """ Absolute path of the track folder (or a sub folder of it), None if the track folder doesn't exist """
+        track_path = get_blender_path(self._path)
+        if not track_path:
+            return None
+        return os.path.join(track_path, subfolder) if subfolder else track_path
+
+    def refresh_index(self):
+        track_path = get_blender_path(self._path)
+        if track_path:
+            get_file_index(track_path, refresh=True)
 
 
     def get_track_file(self):
@@ -149,6 +361,7 @@ class TrackFolder():
         # rename folder
         print(f"Renaming Folder {track_folder} to {new_track_folder}")
         shutil.move(track_folder, new_track_folder)
+        invalidate_file_index(track_folder)
 
         # set track property
         print(f"Setting property 'track_folder' to {new_track_folder}")
@@ -178,8 +391,9 @@ def create_triangle_mesh(name):
     return mesh
 
 
-import math
-from mathutils import Vector
-def get_distance(p1: Vector, p2: Vector):
-    #return math.sqrt((p2.x - p1.x)**2 + (p2.y - p1.y)**2 + (p2.z - p1.z)**2)
-    return (p2 - p1).length
\ No newline at end of file
+def register():
+    bpy.app.timers.register(_poll_file_watcher, first_interval=FileWatcher.POLL_INTERVAL, persistent=True)
+
+def unregister():
+    if bpy.app.timers.is_registered(_poll_file_watcher):
+        bpy.app.timers.unregister(_poll_file_watcher)
@@ -0,0 +1,176 @@
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+from mathutils import kdtree
+from mathutils.bvhtree import BVHTree
+
+
+# NUMPY MESH HELPERS
+
+def get_vertices(mesh: bpy.types.Mesh):
+    """ Vertex coordinates (n, 3) in object space """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    return co.reshape(-1, 3)
+
+
+def to_world(coords, matrix):
+    """ Transform (n, 3) coordinates with a 4x4 (world) matrix in one multiply """
+    m = np.array(matrix, dtype=np.float64)
+    return coords @ m[:3, :3].T + m[:3, 3]
+
+
+def to_world_normals(normals, matrix):
+    """ Transform (n, 3) normals with the inverse transpose of a 4x4 (world) matrix, normalized """
+    m = np.array(matrix, dtype=np.float64)
+    world = normals @ np.linalg.inv(m[:3, :3])
+    length = np.linalg.norm(world, axis=1, keepdims=True)
+    return world / np.where(length > 0, length, 1)
+
+
+def get_world_vertices(obj: bpy.types.Object, mesh: bpy.types.Mesh = None):
+    return to_world(get_vertices(mesh or obj.data), obj.matrix_world)
+
+
+def get_triangles(mesh: bpy.types.Mesh):
+    """ Vertex indices (n, 3) of the loop triangles (triangulated faces) """
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('vertices', tris)
+    return tris.reshape(-1, 3)
+
+
+def get_corner_vertex_ids(mesh: bpy.types.Mesh):
+    """
+    Per loop id of the vertex the exporter writes: unique (vertex, normal, active uv) corners,
+    vertices on hard edges / flat faces and on UV seams are split like in the KN5. Returns (ids, count)
+    """
+    corners = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', corners)
+    if len(corners) == 0:
+        return corners, len(mesh.vertices)
+
+    normals = np.empty(len(corners) * 3, dtype=np.float32)
+    mesh.corner_normals.foreach_get('vector', normals)
+    columns = [corners.view(np.float32), normals.reshape(-1, 3)]
+    uv_layer = mesh.uv_layers.active
+    if uv_layer:
+        uvs = np.empty(len(corners) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get('uv', uvs)
+        columns.append(uvs.reshape(-1, 2))
+
+    keys = np.ascontiguousarray(np.column_stack(columns))
+    _, ids = np.unique(keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel(), return_inverse=True)
+    ids = ids.ravel().astype(np.int32)
+    return ids, int(ids.max()) + 1
+
+
+def get_evaluated_triangles(obj: bpy.types.Object, depsgraph: bpy.types.Depsgraph = None):
+    """ World space vertices and triangles of the evaluated mesh (modifiers applied) """
+    depsgraph = depsgraph or bpy.context.evaluated_depsgraph_get()
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+    try:
+        return to_world(get_vertices(mesh), obj.matrix_world), get_triangles(mesh)
+    finally:
+        eval_obj.to_mesh_clear()
+
+
+"""
+CLASS MeshCache()
+Per object cache for derived mesh data (KD-tree, BVH, ...) in world space.
+Entries are dropped by a depsgraph handler when geometry or transform changed, on undo and on file load.
+"""
+class MeshCache():
+
+    def __init__(self):
+        self._entries = {}  # object name -> {'stamp': ..., <kind>: data}
+
+    @staticmethod
+    def get_stamp(obj: bpy.types.Object):
+        return (obj.data.name, len(obj.data.vertices), tuple(map(tuple, obj.matrix_world)))
+
+    def get(self, obj: bpy.types.Object, kind: str, build):
+        stamp = self.get_stamp(obj)
+        entry = self._entries.get(obj.name)
+        if entry is None or entry['stamp'] != stamp:
+            entry = self._entries[obj.name] = {'stamp': stamp}
+        if kind not in entry:
+            entry[kind] = build(obj)
+        return entry[kind]
+
+    def discard(self, name: str):
+        self._entries.pop(name, None)
+
+    def discard_mesh(self, mesh_name: str):
+        for name in [name for name, entry in self._entries.items() if entry['stamp'][0] == mesh_name]:
+            del self._entries[name]
+
+    def clear(self):
+        self._entries.clear()
+
+    def on_depsgraph_update(self, depsgraph: bpy.types.Depsgraph):
+        if not self._entries:
+            return
+        for update in depsgraph.updates:
+            id = update.id
+            if isinstance(id, bpy.types.Object):
+                if update.is_updated_geometry or update.is_updated_transform:
+                    self.discard(id.name)
+            elif isinstance(id, bpy.types.Mesh) and update.is_updated_geometry:
+                self.discard_mesh(id.name)
+"""
+END CLASS
+"""
+
+mesh_cache = MeshCache()
+
+
+def build_kdtree(obj: bpy.types.Object):
+    world = get_world_vertices(obj)
+    kd = kdtree.KDTree(len(world))
+    for i, co in enumerate(world.tolist()):
+        kd.insert(co, i)
+    kd.balance()
+    return kd
+
+
+def get_kdtree(obj: bpy.types.Object):
+    """ KD-tree of the world space vertices of obj (cached until the mesh is edited) """
+    return mesh_cache.get(obj, 'kdtree', build_kdtree)
+
+
+def build_bvh(obj: bpy.types.Object):
+    verts, tris = get_evaluated_triangles(obj)
+    return BVHTree.FromPolygons(verts.tolist(), tris.tolist(), all_triangles=True)
+
+
+def get_bvh(obj: bpy.types.Object):
+    """ BVH-tree of the evaluated mesh of obj in world space (cached until the mesh is edited) """
+    return mesh_cache.get(obj, 'bvh', build_bvh)
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    mesh_cache.on_depsgraph_update(depsgraph)
+
+@persistent
+def _on_undo_load(*args):
+    mesh_cache.clear()
+
+_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+    (bpy.app.handlers.undo_post, _on_undo_load),
+    (bpy.app.handlers.redo_post, _on_undo_load),
+    (bpy.app.handlers.load_post, _on_undo_load),
+)
+
+def register():
+    for handlers, fn in _handlers:
+        if fn not in handlers:
+            handlers.append(fn)
+
+def unregister():
+    for handlers, fn in _handlers:
+        if fn in handlers:
+            handlers.remove(fn)
+    mesh_cache.clear()
@@ -0,0 +1,179 @@
+import bpy
+import os
+import time
+import functools
+from collections import deque
+
+from . import auto_load
+from . import Functions
+from .Functions import write_json
+
+# Opt-in profiling of operators, panel draws and file I/O helpers.
+# Wrappers are only installed while profiling is enabled, so there is no overhead otherwise.
+
+SAMPLE_SIZE = 1000  # samples kept per entry for p95
+PROFILE_FILE = "ac_tools_profile.json"
+
+CLASS_METHODS = ('execute', 'invoke', 'modal', 'draw', 'draw_item', 'filter_items')
+READ_FUNCTIONS = ('read_json', 'read_config', 'read_file')
+IO_FUNCTIONS = READ_FUNCTIONS + ('write_json', 'write_config', 'write_csv', 'write_png')
+
+
+class ProfileStats():
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.bytes_read = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, elapsed: float, nbytes: int = 0):
+        self.count += 1
+        self.total += elapsed
+        self.bytes_read += nbytes
+        self.samples.append(elapsed)
+
+    def p95(self):
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p95_ms": self.p95() * 1000,
+            "bytes_read": self.bytes_read,
+        }
+
+
+stats = {}          # name -> ProfileStats
+_patches = []       # (owner, attribute, original)
+
+
+def record(name: str, elapsed: float, nbytes: int = 0):
+    entry = stats.get(name)
+    if entry is None:
+        entry = stats[name] = ProfileStats()
+    entry.add(elapsed, nbytes)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+
+def _wrap(name: str, fn, counts_bytes: bool = False):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            record(name, elapsed, _file_size(args[0]) if counts_bytes and args else 0)
+    return wrapper
+
+
+def _patch(owner, attr: str, wrapper):
+    _patches.append((owner, attr, getattr(owner, attr)))
+    setattr(owner, attr, wrapper)
+
+
+def _patch_function(fn, name: str, counts_bytes: bool = False):
+    """ Replace fn in every add-on module that imported it """
+    wrapper = _wrap(name, fn, counts_bytes)
+    for module in auto_load.modules:
+        for attr, value in list(vars(module).items()):
+            if value is fn:
+                _patch(module, attr, wrapper)
+
+
+def is_enabled():
+    return bool(_patches)
+
+
+def enable():
+    if is_enabled():
+        return
+
+    # operators & panels
+    for cls in auto_load.ordered_classes:
+        for attr in CLASS_METHODS:
+            fn = cls.__dict__.get(attr)
+            if callable(fn):
+                _patch(cls, attr, _wrap(f"{cls.__name__}.{attr}", fn))
+
+    # file I/O helpers
+    for fn_name in IO_FUNCTIONS:
+        _patch_function(getattr(Functions, fn_name), fn_name, counts_bytes=fn_name in READ_FUNCTIONS)
+    for cls, attr in ((Functions.TrackFolder, 'get_ac_file_path'), (Functions.FileIndex, 'build')):
+        _patch(cls, attr, _wrap(f"{cls.__name__}.{attr}", cls.__dict__[attr]))
+
+    # material loading
+    from . import Tools_Materials
+    _patch_function(Tools_Materials.load_materials, 'load_materials')
+    _patch(Tools_Materials.SurfaceStore, 'load', _wrap("SurfaceStore.load", Tools_Materials.SurfaceStore.__dict__['load']))
+
+
+def disable():
+    while _patches:
+        owner, attr, original = _patches.pop()
+        setattr(owner, attr, original)
+
+
+def reset():
+    stats.clear()
+
+
+def get_sorted_stats():
+    return sorted(stats.items(), key=lambda item: item[1].total, reverse=True)
+
+
+def _update_enabled(self, context):
+    if self.ac_tools_profiling:
+        enable()
+    else:
+        disable()
+
+
+# OPERATOR #
+
+class PROFILE_OT_reset(bpy.types.Operator):
+    bl_idname = "ac_tools.profile_reset"
+    bl_label = "Reset Profile"
+    bl_description = "Clear recorded timings"
+
+    def execute(self, context):
+        reset()
+        return {'FINISHED'}
+
+
+class PROFILE_OT_dump(bpy.types.Operator):
+    bl_idname = "ac_tools.profile_dump"
+    bl_label = "Save Profile"
+    bl_description = f"Write recorded timings to {PROFILE_FILE} (next to the .blend)"
+
+    def execute(self, context):
+        folder = os.path.dirname(bpy.data.filepath) if bpy.data.filepath else bpy.app.tempdir
+        path = os.path.join(folder, PROFILE_FILE)
+        write_json({name: entry.as_dict() for name, entry in get_sorted_stats()}, path)
+        self.report({'INFO'}, f"Profile written to {path}")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.types.WindowManager.ac_tools_profiling = bpy.props.BoolProperty(
+        name="Profiling",
+        description="Record call counts and timings of AC Tools operators, panels and file access",
+        default=False,
+        update=_update_enabled
+    )
+
+def unregister():
+    disable()
+    del bpy.types.WindowManager.ac_tools_profiling
@@ -3,6 +3,8 @@ import os
 import subprocess as sp
 
 from .Functions import TrackFolder, get_properties, read_json
+from .Tools_Track import generate_ai_lines
+from .Tools_Optimize import restore_after_export, split_for_export
 
 
 from pathlib import Path
@@ -44,24 +46,44 @@ Parameters:
         if not props.disable_export_checks and not ready_for_export(self, context):
             return {'FINISHED'}
 
-        # EXPORT SCENE as FBX
-        bpy.ops.export_scene.fbx(
-            filepath=fbx_path, 
-            check_existing=False, 
-            global_scale=0.01, # if problems -> set to 1
-            apply_unit_scale=True,
-            apply_scale_options='FBX_SCALE_ALL',
-            object_types={'EMPTY', 'MESH', 'OTHER'},
-            axis_forward='-Z', 
-            axis_up='Y',
-            use_tspace=True,
-            use_mesh_modifiers=True,
-            use_mesh_modifiers_render=True,
-            use_triangles=True,
-            mesh_smooth_type='OFF',
-            colors_type='SRGB',
-            use_selection=props.exp_use_sel
-            )
+        # EXPORT SCENE as FBX (oversized meshes are split for the export only)
+        split_state = []
+        try:
+            if props.exp_split_meshes:
+                split_state = split_for_export(context, props.split_vertex_limit)
+            bpy.ops.export_scene.fbx(
+                filepath=fbx_path, 
+                check_existing=False, 
+                global_scale=0.01, # if problems -> set to 1
+                apply_unit_scale=True,
+                apply_scale_options='FBX_SCALE_ALL',
+                object_types={'EMPTY', 'MESH', 'OTHER'},
+                axis_forward='-Z', 
+                axis_up='Y',
+                use_tspace=True,
+                use_mesh_modifiers=True,
+                use_mesh_modifiers_render=True,
+                use_triangles=True,
+                mesh_smooth_type='OFF',
+                colors_type='SRGB',
+                use_selection=props.exp_use_sel
+                )
+        finally:
+            restore_after_export(split_state)
+        if split_state:
+            self.report({'INFO'}, f"Split {len(split_state)} mesh(es) over {props.split_vertex_limit} vertices for the export")
+
+        if props.exp_generate_ai:
+            ai_folder = TrackFolder(props.track_folder).get_folder('ai')
+            if not ai_folder:
+                self.report({'WARNING'}, "Track folder doesn't exist, AI lines not written")
+            else:
+                os.makedirs(ai_folder, exist_ok=True)
+                try:
+                    for report_type, message in generate_ai_lines(context, ai_folder):
+                        self.report(report_type, message)
+                except ValueError as e:
+                    self.report({'WARNING'}, f"AI lines not written: {e}")
         
         self.report({'INFO'}, f"Exported to {fbx_path}")
         return {'FINISHED'}
@@ -69,6 +91,7 @@ Parameters:
 
 # Additional/Functional Export Checks (can be disabled through property 'disable_export_checks')
 from .Properties import AC_OBJ_PREFIX, AC_COLLECTION_NAME, FILE_UI_TRACK
+from .Tools_Objects import ac_registry
 def ready_for_export(self, context: bpy.types.Context):
     if not ac_objects_valid(self, context):
         return False
@@ -82,18 +105,19 @@ def ac_objects_valid(self, context):
         self.report({'INFO'}, f"Collection '{AC_COLLECTION_NAME}' doesn't exist. Please add AC-Objects before export!")
         return False
     
-    objects = context.view_layer.layer_collection.children[AC_COLLECTION_NAME].collection.objects
+    scene = context.scene
     
     # check if AC objects exist and match track_ui pits etc
     for prefix in AC_OBJ_PREFIX.values():
+        count = ac_registry.count(scene, prefix)
+
         # check if existing at all
-        if not any(obj.name.startswith(prefix) for obj in objects):
+        if count == 0:
             self.report({'INFO'}, f"AC-Object missing! '{prefix}_<n>'")
             return False
         
         # check timing
         if prefix == AC_OBJ_PREFIX['TIME']:
-            count = sum(1 for obj in objects if obj.name.startswith(prefix))
             if count % 2 > 0:
                 self.report({'INFO'}, f"One timing object is missing!")
                 return False
@@ -109,9 +133,8 @@ def ac_objects_valid(self, context):
                 self.report({'INFO'}, f"Could not extract pit count from {FILE_UI_TRACK}. Please check manually!")
                 return False
             
-            scene_pit_count = sum(1 for obj in objects if obj.name.startswith(prefix))
-            if scene_pit_count != required_pit_count:
-                self.report({'INFO'}, f"Required pit count: '{required_pit_count}' - pits in scene: '{scene_pit_count}'. Setup pits or adjust pit setting in track ui file!")
+            if count != required_pit_count:
+                self.report({'INFO'}, f"Required pit count: '{required_pit_count}' - pits in scene: '{count}'. Setup pits or adjust pit setting in track ui file!")
                 return False
             continue
         
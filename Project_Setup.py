@@ -4,9 +4,10 @@ import stat
 import bpy
 import os
 import subprocess as sp
+from bpy.app.handlers import persistent
 
 from .Properties import FILE_UI_TRACK, FILE_SURFACES, FILE_EXT_CFG, AC_FOLDER_NAME
-from .Functions import TrackFolder, get_template, open_file_in_scripting, read_config, read_json, write_config, write_json, get_properties
+from .Functions import TrackFolder, file_watcher, get_template, invalidate_file_index, tag_redraw, open_file_in_scripting, read_config, read_json, write_config, write_json, get_properties
 
 # TODO adjust KsEditor.ini so its day always
 # TODO init blender file (insert track template w/ path + curb w/ path)
@@ -33,6 +34,7 @@ class PROJECT_OT_init(bpy.types.Operator):
         make_ai_folder(tf._path)
         make_data_folder(tf._path)
         make_extension_folder(tf._path)
+        tf.refresh_index()
 
         self.report({'INFO'}, f"Sub-Folder {tf._path} created")
         return {'FINISHED'}
@@ -107,6 +109,7 @@ class PROJECT_OT_create_file(bpy.types.Operator):
         file = self.path
         if os.path.exists(os.path.dirname(file)):
             open(file, 'x') # create file
+            invalidate_file_index()
             self.report({'INFO'}, f"File {file} Created!")
         else:
             self.report({'INFO'}, f"Cannot create file {file}")
@@ -186,4 +189,35 @@ def make_extension_folder(path):
     ext_cfg_file = os.path.join(extension_folder, FILE_EXT_CFG)
     cfg = read_config(get_template(FILE_EXT_CFG))
     write_config(cfg, ext_cfg_file)
-    
\ No newline at end of file
+    
+
+
+# cached content of ui_track.json (kept up to date by the file watcher, don't read it in draw)
+track_ui_data = {}
+
+def ensure_track_ui():
+    """ Start watching ui_track.json on first use, track_ui_data is filled by the next poll """
+    if not file_watcher.is_watching(FILE_UI_TRACK):
+        file_watcher.watch(FILE_UI_TRACK, reload_track_ui)
+
+def reload_track_ui(path):
+    data = read_json(path) if path else None
+    track_ui_data.clear()
+    if isinstance(data, dict):
+        track_ui_data.update(data)
+    tag_redraw()
+
+
+@persistent
+def _on_load_post(*args):
+    track_ui_data.clear()
+    file_watcher.unwatch(FILE_UI_TRACK)
+
+
+def register():
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    file_watcher.unwatch(FILE_UI_TRACK)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
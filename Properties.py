@@ -12,14 +12,27 @@ AC_OBJ_PREFIX = {
     "TIME":   "AC_TIME"
 }
 
+AC_MERGED_COLLECTION_NAME = "AC_MERGED_ORIGINALS"
+AC_COLLISION_COLLECTION_NAME = "AC_COLLISION"
+
 AC_FOLDER_NAME = "ac_track"
 
 FILE_UI_TRACK = 'ui_track.json'
 FILE_EXT_CFG = 'ext_config.ini'
 FILE_SURFACES = 'surfaces.ini'
+FILE_SURFACE_RULES = 'surface_rules.json'
+FILE_MAP_INI = 'map.ini'
 
 # BLENDER PROPERTIES
 
+class ACSurfaceItem(bpy.types.PropertyGroup):
+    # name = surface key (synced from the materials registry on reload)
+    prefix: bpy.props.StringProperty(name="prefix") # type: ignore
+    surface_type: bpy.props.StringProperty(name="surface_type") # type: ignore
+    friction: bpy.props.FloatProperty(name="friction", default=-1.0) # type: ignore # -1: not in surfaces.ini
+    is_valid_track: bpy.props.BoolProperty(name="is_valid_track") # type: ignore
+
+
 class MyProperties(bpy.types.PropertyGroup):
 
     track_folder: bpy.props.StringProperty(
@@ -63,6 +76,107 @@ class MyProperties(bpy.types.PropertyGroup):
         default=False
     ) # type: ignore
 
+    exp_split_meshes: bpy.props.BoolProperty(
+        name="Split Large Meshes",
+        description="Split meshes over the vertex limit into chunks for the export only (scene is restored afterwards)",
+        default=False
+    ) # type: ignore
+
+    exp_generate_ai: bpy.props.BoolProperty(
+        name="Write AI Lines",
+        description="Write ai/fast_lane.ai and ai/pit_lane.ai after the FBX export (see Generate AI Lines)",
+        default=False
+    ) # type: ignore
+
+    split_vertex_limit: bpy.props.IntProperty(
+        name="Vertex Limit",
+        description="Maximum vertices per mesh when splitting, counted like the KN5 stores them: unique (vertex, normal, uv) corners. KN5 meshes are limited to 65535, the default leaves headroom for tangent splits",
+        default=65000,
+        min=3,
+        max=65535
+    ) # type: ignore
+
+    merge_max_vertices: bpy.props.IntProperty(
+        name="Max Vertices",
+        description="Only objects with at most this many vertices are merged",
+        default=2000,
+        min=1
+    ) # type: ignore
+
+    merge_cell_size: bpy.props.FloatProperty(
+        name="Cell Size",
+        description="Objects are only merged with objects in the same grid cell (keeps culling effective)",
+        default=100.0,
+        min=1.0,
+        unit='LENGTH'
+    ) # type: ignore
+
+    lod_ratios: bpy.props.StringProperty(
+        name="LOD Ratios",
+        description="Decimation ratio per LOD level, comma separated (LOD1, LOD2, ...)",
+        default="0.5, 0.2"
+    ) # type: ignore
+
+    lod_workers: bpy.props.IntProperty(
+        name="Workers",
+        description="Background Blender processes for LOD generation (0: half of the CPU cores)",
+        default=0,
+        min=0,
+        max=64
+    ) # type: ignore
+
+    map_resolution: bpy.props.IntProperty(
+        name="Map Resolution",
+        description="Size of the longest side of map.png in pixels",
+        default=2048,
+        min=128,
+        max=16384
+    ) # type: ignore
+
+    surfaces: bpy.props.CollectionProperty(type=ACSurfaceItem) # type: ignore
+    surface_index: bpy.props.IntProperty(name="surface_index", default=0) # type: ignore
+    surface_filter: bpy.props.EnumProperty(
+        name="surface_filter",
+        description="Show surfaces of type",
+        items=[
+            ('ALL', "All", "Show all surfaces"),
+            ('default', "Default", "Default AC surfaces"),
+            ('custom', "Custom", "Custom surfaces of surfaces.ini"),
+            ('collision', "Collision", "Collision surfaces"),
+        ],
+        default='ALL'
+    ) # type: ignore
+
+    # budgets of the analysis panel
+    budget_draw_calls: bpy.props.IntProperty(
+        name="Draw Calls",
+        description="Budget for draw calls of the export set (object x material)",
+        default=1000,
+        min=1
+    ) # type: ignore
+
+    budget_triangles: bpy.props.IntProperty(
+        name="Triangles",
+        description="Budget for triangles of the export set",
+        default=1500000,
+        min=1
+    ) # type: ignore
+
+    budget_mesh_vertices: bpy.props.IntProperty(
+        name="Vertices per Mesh",
+        description="Maximum vertices of a single mesh (AC uses 16 bit indices)",
+        default=65535,
+        min=1
+    ) # type: ignore
+
+    budget_cell_size: bpy.props.FloatProperty(
+        name="Cell Size",
+        description="Size of the grid cells used to find the heaviest areas of the track",
+        default=200.0,
+        min=1.0,
+        unit='LENGTH'
+    ) # type: ignore
+
 # Registration-Funktionen, falls nicht automatisch registriert:
 def register():
     bpy.types.Scene.ac_tools_properties = bpy.props.PointerProperty(type=MyProperties)
@@ -0,0 +1,247 @@
+import bpy
+import os
+import math
+import numpy as np
+from pathlib import Path
+from mathutils import Vector
+
+from .Functions import get_properties, write_csv, write_json
+from .Functions_Mesh import get_corner_vertex_ids, get_triangles, get_world_vertices
+from .Tools_Materials import MaterialData, ensure_materials, materials
+
+# Scene analysis (surface usage, performance budgets)
+
+WORST_COUNT = 5     # offenders listed per category
+CELL_WORST_COUNT = 3    # objects listed per heavy cell
+
+# last results for the Analysis panel
+last_surface_report = {}
+last_budget_report = {}
+
+
+def get_report_path(suffix: str):
+    if not bpy.data.filepath:
+        return None
+    return os.path.join(os.path.dirname(bpy.data.filepath), Path(bpy.data.filepath).stem + suffix)
+
+
+def get_world_area(obj: bpy.types.Object, tris):
+    """ Surface area of obj in world space (m²): triangle cross products of the world transformed vertices """
+    if len(tris) == 0:
+        return 0.0
+    co = get_world_vertices(obj)
+    a, b, c = co[tris[:, 0]], co[tris[:, 1]], co[tris[:, 2]]
+    return 0.5 * float(np.linalg.norm(np.cross(b - a, c - a), axis=1).sum())
+
+
+def collect_surface_usage(scene: bpy.types.Scene):
+    """
+    One pass over all mesh objects: objects, triangles and area per AC prefix,
+    untagged mesh objects and surfaces that are never used.
+    Triangles are read once per mesh (instances share them), areas are measured in world space
+    (exact for non-uniform scale and shear).
+    """
+    match_prefix = materials.get_prefix_matcher().match
+    mesh_tris = {}
+    usage = {}      # prefix -> [objects, triangles, area]
+    untagged = []
+
+    for obj in scene.objects:
+        if obj.type != 'MESH' or obj.name.startswith('AC_'):
+            continue
+
+        m = match_prefix(obj.name)
+        if not m:
+            untagged.append(obj.name)
+            continue
+
+        mesh = obj.data
+        tris = mesh_tris.get(mesh.name)
+        if tris is None:
+            tris = mesh_tris[mesh.name] = get_triangles(mesh)
+
+        entry = usage.setdefault(m.group(0), [0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += len(tris)
+        entry[2] += get_world_area(obj, tris)
+
+    surfaces = {}
+    for prefix, (objects, triangles, area) in sorted(usage.items()):
+        surfaces[prefix] = {
+            "key": materials.prefix_to_key.get(prefix),
+            "objects": objects,
+            "triangles": triangles,
+            "area_m2": round(area, 2),
+        }
+
+    unused = [key for key, item in materials.get_all_of_type(MaterialData.TYPE_CUSTOM).items() if item['prefix'] not in usage]
+
+    return {
+        "surfaces": surfaces,
+        "untagged": untagged,
+        "unused_keys": unused,
+    }
+
+
+def get_export_objects(context: bpy.types.Context):
+    """ Mesh objects the FBX export will write (see PROJECT_OT_export_fbx_for_ac) """
+    objects = context.selected_objects if get_properties(context).exp_use_sel else context.view_layer.objects
+    return [obj for obj in objects if obj.type == 'MESH']
+
+
+def get_render_stats(mesh: bpy.types.Mesh):
+    """
+    (draw calls, triangles, vertices) of an evaluated mesh as the exporter writes it.
+    Draw calls = used material slots, vertices = unique (vertex, normal, uv) corners,
+    the splits on hard edges and UV seams the KN5 has (see get_corner_vertex_ids).
+    """
+    count = len(mesh.polygons)
+    if count == 0:
+        return 0, 0, 0
+
+    material_indices = np.empty(count, dtype=np.int32)
+    mesh.polygons.foreach_get('material_index', material_indices)
+    loop_totals = np.empty(count, dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', loop_totals)
+
+    _, vertices = get_corner_vertex_ids(mesh)
+
+    return len(np.unique(material_indices)), int(loop_totals.sum()) - 2 * count, vertices
+
+
+def collect_budget(context: bpy.types.Context):
+    """
+    Draw calls, triangles and vertices of the export set with modifiers applied,
+    summed per grid cell (object bounding box center) to locate heavy areas.
+    The worst objects are listed per heavy cell (what is visible together), not scene wide.
+    """
+    props = get_properties(context)
+    depsgraph = context.evaluated_depsgraph_get()
+    cell_size = props.budget_cell_size
+
+    objects = []
+    cells = {}      # (x, y) -> [draw calls, triangles, objects]
+    for obj in get_export_objects(context):
+        eval_obj = obj.evaluated_get(depsgraph)
+        mesh = eval_obj.to_mesh()
+        try:
+            draw_calls, triangles, vertices = get_render_stats(mesh)
+        finally:
+            eval_obj.to_mesh_clear()
+        if triangles == 0:
+            continue
+
+        center = obj.matrix_world @ (sum((Vector(corner) for corner in eval_obj.bound_box), Vector()) / 8)
+        cell = (math.floor(center.x / cell_size), math.floor(center.y / cell_size))
+        item = {
+            "name": obj.name,
+            "draw_calls": draw_calls,
+            "triangles": triangles,
+            "vertices": vertices,
+            "cell": cell,
+        }
+        objects.append(item)
+        entry = cells.setdefault(cell, [0, 0, []])
+        entry[0] += draw_calls
+        entry[1] += triangles
+        entry[2].append(item)
+
+    totals = {
+        "objects": len(objects),
+        "draw_calls": sum(o['draw_calls'] for o in objects),
+        "triangles": sum(o['triangles'] for o in objects),
+    }
+    budgets = {
+        "draw_calls": props.budget_draw_calls,
+        "triangles": props.budget_triangles,
+        "mesh_vertices": props.budget_mesh_vertices,
+    }
+    heavy_cells = sorted(cells.items(), key=lambda item: item[1][0], reverse=True)[:WORST_COUNT]
+
+    def worst(items, key):
+        return [o['name'] for o in sorted(items, key=lambda o: o[key], reverse=True)[:CELL_WORST_COUNT]]
+
+    return {
+        "totals": totals,
+        "budgets": budgets,
+        "over_vertex_limit": [o['name'] for o in objects if o['vertices'] > props.budget_mesh_vertices],
+        "cells": [{
+            "cell": cell,
+            "min": (cell[0] * cell_size, cell[1] * cell_size),
+            "draw_calls": draw_calls,
+            "triangles": triangles,
+            "worst_draw_calls": worst(cell_objects, 'draw_calls'),
+            "worst_triangles": worst(cell_objects, 'triangles'),
+        } for cell, (draw_calls, triangles, cell_objects) in heavy_cells],
+        "objects": objects,
+    }
+
+
+# OPERATOR #
+
+class ANALYSIS_OT_surface_report(bpy.types.Operator):
+    bl_idname = "ac_tools.surface_report"
+    bl_label = "Surface Report"
+    bl_description = "Count objects, triangles and area per AC surface, list untagged objects and unused surfaces"
+
+    write_files: bpy.props.BoolProperty(
+        name="Write Files",
+        description="Write the report as CSV and JSON next to the .blend",
+        default=True
+    ) # type: ignore
+
+    def execute(self, context):
+        ensure_materials(context)
+        report = collect_surface_usage(context.scene)
+
+        last_surface_report.clear()
+        last_surface_report.update(report)
+
+        if self.write_files:
+            csv_path = get_report_path("_surfaces.csv")
+            if not csv_path:
+                self.report({'INFO'}, "Save .blend first to write the report files")
+            else:
+                rows = [(prefix, s['key'], s['objects'], s['triangles'], s['area_m2']) for prefix, s in report['surfaces'].items()]
+                rows.append(("<untagged>", "", len(report['untagged']), "", ""))
+                write_csv(rows, csv_path, header=("prefix", "key", "objects", "triangles", "area_m2"))
+                write_json(report, get_report_path("_surfaces.json"))
+                self.report({'INFO'}, f"Report written to {csv_path}")
+
+        self.report({'INFO'}, f"{len(report['surfaces'])} surfaces used, {len(report['untagged'])} untagged mesh objects, {len(report['unused_keys'])} unused surfaces")
+        return {'FINISHED'}
+
+
+class ANALYSIS_OT_budget_report(bpy.types.Operator):
+    bl_idname = "ac_tools.budget_report"
+    bl_label = "Budget Report"
+    bl_description = "Estimate draw calls, triangles and vertices of the export set (modifiers applied) and compare them with the budgets"
+
+    write_files: bpy.props.BoolProperty(
+        name="Write Files",
+        description="Write the report as JSON next to the .blend",
+        default=True
+    ) # type: ignore
+
+    def execute(self, context):
+        report = collect_budget(context)
+
+        last_budget_report.clear()
+        last_budget_report.update(report)
+
+        if self.write_files:
+            path = get_report_path("_budget.json")
+            if not path:
+                self.report({'INFO'}, "Save .blend first to write the report files")
+            else:
+                write_json(report, path)
+
+        totals, budgets = report['totals'], report['budgets']
+        for key in ('draw_calls', 'triangles'):
+            if totals[key] > budgets[key]:
+                self.report({'WARNING'}, f"{key.replace('_', ' ').capitalize()} over budget: {totals[key]} / {budgets[key]}")
+        if report['over_vertex_limit']:
+            self.report({'WARNING'}, f"{len(report['over_vertex_limit'])} mesh(es) over {budgets['mesh_vertices']} vertices: {', '.join(report['over_vertex_limit'][:WORST_COUNT])}")
+
+        self.report({'INFO'}, f"{totals['objects']} objects, {totals['draw_calls']} draw calls, {totals['triangles']} triangles")
+        return {'FINISHED'}
@@ -0,0 +1,375 @@
+import bpy
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import subprocess as sp
+import numpy as np
+from bpy.app.handlers import persistent
+
+from .Functions import get_properties, tag_redraw, write_json
+from .Tools_Materials import ensure_materials, strip_prefix
+
+# LOD generation for trackside assets
+# Decimation runs in headless Blender workers (workers/lod_worker.py), results are cached
+# per geometry hash and ratio in LOD_CACHE_FOLDER next to the .blend.
+# Workers run in the background and are polled by a timer, the LOD objects are created when all finished.
+# LOD objects are named <name>_LOD1, <name>_LOD2, ... without the surface prefix of <name>
+# (visual only, visibility distances are set in KsEditor / ext_config)
+
+LOD_CACHE_FOLDER = ".ac_lod_cache"
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "workers", "lod_worker.py")
+LOD_SUFFIX = re.compile(r"_LOD\d+$")
+LOD_POLL_INTERVAL = 0.5 # seconds between worker checks
+
+
+def parse_ratios(text: str):
+    """ '0.5, 0.25' -> [0.5, 0.25] (ValueError if not in (0, 1)) """
+    ratios = [float(value) for value in text.replace(';', ',').split(',') if value.strip()]
+    if not ratios or any(not 0.0 < ratio < 1.0 for ratio in ratios):
+        raise ValueError(f"LOD ratios must be between 0 and 1: '{text}'")
+    return ratios
+
+
+def get_geometry_hash(mesh: bpy.types.Mesh):
+    """ Hash of vertices, faces, uvs and material indices of a mesh """
+    h = hashlib.sha1()
+    buffers = (
+        (mesh.vertices, 'co', 3, np.float32),
+        (mesh.loops, 'vertex_index', 1, np.int32),
+        (mesh.polygons, 'loop_start', 1, np.int32),
+        (mesh.polygons, 'material_index', 1, np.int32),
+    )
+    for collection, prop, width, dtype in buffers:
+        data = np.empty(len(collection) * width, dtype=dtype)
+        collection.foreach_get(prop, data)
+        h.update(data.tobytes())
+    if mesh.uv_layers.active:
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        mesh.uv_layers.active.data.foreach_get('uv', uvs)
+        h.update(uvs.tobytes())
+    return h.hexdigest()
+
+
+def get_lod_candidates(context: bpy.types.Context):
+    """ Selected mesh objects, or all meshes of the active collection (LOD objects excluded) """
+    objects = context.selected_objects or context.collection.all_objects
+    return [obj for obj in objects if obj.type == 'MESH' and not LOD_SUFFIX.search(obj.name)]
+
+
+def start_workers(tasks: list, source_path: str, workers: int, tmp_dir: str):
+    """ Split tasks round robin over headless Blender processes. Returns [(process, log file)] """
+    processes = []
+    for i in range(min(workers, len(tasks))):
+        job_path = os.path.join(tmp_dir, f"job_{i}.json")
+        write_json({"source": source_path, "tasks": tasks[i::workers]}, job_path)
+        log = open(os.path.join(tmp_dir, f"job_{i}.log"), 'w+', encoding='utf-8')
+        processes.append((sp.Popen(
+            [bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1", "--python", WORKER_SCRIPT, "--", job_path],
+            stdout=log,
+            stderr=sp.STDOUT
+        ), log))
+    return processes
+
+
+def get_cache_path(cache_dir: str, key: str, ratio: float):
+    return os.path.join(cache_dir, f"{key}_{ratio:.3f}.blend")
+
+
+def load_cached_mesh(path: str):
+    with bpy.data.libraries.load(path) as (data_from, data_to):
+        data_to.meshes = list(data_from.meshes[:1])
+    return data_to.meshes[0] if data_to.meshes else None
+
+
+def get_lod_name(obj: bpy.types.Object, level: int):
+    """ <name>_LOD<level> without the surface prefix of obj: LODs are visual only, never physical surfaces """
+    return f"{strip_prefix(obj.name)}_LOD{level}"
+
+
+def get_lod_objects():
+    """ {(source name, level): LOD object} of the LODs in the file, tagged with 'ac_lod_source' / 'ac_lod_level' """
+    return {(lod['ac_lod_source'], lod.get('ac_lod_level', 0)): lod for lod in bpy.data.objects if 'ac_lod_source' in lod}
+
+
+def set_lod_object(obj: bpy.types.Object, level: int, mesh: bpy.types.Mesh, lod: bpy.types.Object = None):
+    """
+    Update the existing LOD of obj, or create <name>_LOD<level> next to obj.
+    A new LOD never replaces another object: Blender adds a .001 suffix if the name is taken
+    (prefixes are stripped, so '1WALL.fence' and 'fence' share the name)
+    """
+    if lod is None:
+        lod = bpy.data.objects.new(get_lod_name(obj, level), mesh)
+        lod['ac_lod_source'] = obj.name
+        lod['ac_lod_level'] = level
+        for coll in obj.users_collection:
+            coll.objects.link(lod)
+    else:
+        old = lod.data
+        lod.data = mesh
+        if old and old.users == 0:
+            bpy.data.meshes.remove(old)
+    lod.matrix_world = obj.matrix_world
+    return lod
+
+
+def create_lod_objects(object_hashes: list, ratios: list, cache_dir: str):
+    """
+    LOD objects from the cache for [(object name, geometry hash)], objects deleted in the meantime are skipped.
+    Returns (LOD objects, names that were taken by other objects)
+    """
+    lods = []
+    collisions = []
+    existing = get_lod_objects()
+    loaded = {}     # cache path -> mesh (shared by instances)
+    for obj_name, key in object_hashes:
+        obj = bpy.data.objects.get(obj_name)
+        if obj is None:
+            continue
+        for level, ratio in enumerate(ratios, start=1):
+            path = get_cache_path(cache_dir, key, ratio)
+            mesh = loaded.get(path)
+            if mesh is None:
+                if not os.path.exists(path):
+                    continue
+                mesh = loaded[path] = load_cached_mesh(path)
+                if mesh is None:
+                    continue
+                mesh.use_fake_user = False
+                mesh.name = get_lod_name(obj, level)
+                for slot in obj.material_slots:
+                    mesh.materials.append(slot.material)
+            lod = existing.get((obj.name, level))
+            name = get_lod_name(obj, level)
+            if lod is None and name in bpy.data.objects:
+                collisions.append(name)
+            lods.append(set_lod_object(obj, level, mesh, lod))
+    return lods, collisions
+
+
+# running generation (one at a time), polled by _poll_lod_job
+_lod_job = {}
+
+# result of the last generation (shown in UI_Optimize)
+last_lod_result = {}
+
+def is_lod_job_running():
+    return bool(_lod_job)
+
+
+def get_lod_job_progress():
+    """ (finished workers, workers) of the running generation """
+    processes = _lod_job.get('processes', [])
+    return sum(process.poll() is not None for process, _ in processes), len(processes)
+
+
+def start_lod_job(context: bpy.types.Context, objects: list, ratios: list, workers: int, cache_dir: str):
+    """
+    Decimated copies of the evaluated meshes of objects for every ratio.
+    Only (geometry, ratio) pairs missing in the cache are sent to the workers, which run in the background:
+    a timer polls them and creates the LOD objects once all finished (finish_lod_job).
+    Returns the number of decimation tasks, 0 if everything was cached (LODs are created right away).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    depsgraph = context.evaluated_depsgraph_get()
+
+    # hash evaluated geometry (instances share one entry)
+    sources = {}        # hash -> temporary source mesh
+    object_hashes = []  # (object name, hash), objects may be deleted while the workers run
+    for obj in objects:
+        mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+        key = get_geometry_hash(mesh)
+        if key in sources or len(mesh.polygons) == 0:
+            bpy.data.meshes.remove(mesh)
+        else:
+            mesh.name = key
+            mesh.materials.clear() # materials are taken from the object, not written to the cache
+            sources[key] = mesh
+        if key in sources:
+            object_hashes.append((obj.name, key))
+
+    tasks = [{"mesh": key, "ratio": ratio, "output": get_cache_path(cache_dir, key, ratio)}
+             for key in sources for ratio in ratios if not os.path.exists(get_cache_path(cache_dir, key, ratio))]
+
+    _lod_job.update({
+        'objects': object_hashes,
+        'ratios': ratios,
+        'cache_dir': cache_dir,
+        'computed': len(tasks),
+        'cached': len(sources) * len(ratios) - len(tasks),
+        'processes': [],
+        'tmp_dir': None,
+    })
+    try:
+        if tasks:
+            _lod_job['tmp_dir'] = tempfile.mkdtemp(prefix="ac_tools_lod_")
+            source_path = os.path.join(_lod_job['tmp_dir'], "source.blend")
+            bpy.data.libraries.write(source_path, {sources[key] for key in {task['mesh'] for task in tasks}})
+            _lod_job['processes'] = start_workers(tasks, source_path, workers, _lod_job['tmp_dir'])
+    except BaseException:
+        cancel_lod_job()
+        raise
+    finally:
+        for mesh in sources.values():
+            bpy.data.meshes.remove(mesh)
+
+    if tasks:
+        bpy.app.timers.register(_poll_lod_job, first_interval=LOD_POLL_INTERVAL)
+    else:
+        finish_lod_job()
+    return len(tasks)
+
+
+def _close_workers(job: dict, terminate: bool = False):
+    """ Close worker logs (printing the ones of failed workers) and remove the job folder. Returns failed worker count """
+    failed = 0
+    for process, log in job.get('processes', []):
+        with log:
+            if terminate and process.poll() is None:
+                process.terminate()
+                process.wait()
+            elif process.wait() != 0:
+                failed += 1
+                log.seek(0)
+                print(f"AC Tools: LOD worker failed ({process.returncode})\n{log.read()}")
+    if job.get('tmp_dir'):
+        shutil.rmtree(job['tmp_dir'], ignore_errors=True)
+    return failed
+
+
+def _poll_lod_job():
+    if not _lod_job:
+        return None
+    finished, workers = get_lod_job_progress()
+    if finished < workers:
+        tag_redraw()
+        return LOD_POLL_INTERVAL
+    finish_lod_job()
+    return None
+
+
+def finish_lod_job():
+    """ All workers finished: create the LOD objects from the cache """
+    job = dict(_lod_job)
+    _lod_job.clear()
+    failed = _close_workers(job)
+
+    lods, collisions = create_lod_objects(job['objects'], job['ratios'], job['cache_dir'])
+    message = f"{len(lods)} LOD object(s): {job['computed']} decimated, {job['cached']} from cache"
+    if collisions:
+        message += f", {len(collisions)} name(s) already taken (e.g. '{collisions[0]}'), suffixed"
+    last_lod_result.clear()
+    last_lod_result.update({
+        'message': message,
+        'failed': failed,
+    })
+    if lods:
+        try:
+            bpy.ops.ed.undo_push(message="Generate LODs") # created outside of the operator
+        except RuntimeError:
+            pass
+    tag_redraw()
+    return lods
+
+
+def cancel_lod_job():
+    """ Stop the running workers, results finished so far stay in the cache """
+    if bpy.app.timers.is_registered(_poll_lod_job):
+        bpy.app.timers.unregister(_poll_lod_job)
+    job = dict(_lod_job)
+    _lod_job.clear()
+    _close_workers(job, terminate=True)
+    tag_redraw()
+
+
+# OPERATOR #
+
+class OPTIMIZE_OT_generate_lods(bpy.types.Operator):
+    bl_idname = "ac_tools.generate_lods"
+    bl_label = "Generate LODs"
+    bl_description = "Create decimated <name>_LOD1, _LOD2, ... objects for the selected objects (or the active collection) in background Blender processes"
+    bl_options = {'REGISTER'} # objects are created when the workers finished, with their own undo step
+
+    @classmethod
+    def poll(cls, context):
+        return not is_lod_job_running()
+
+    def execute(self, context):
+        if not bpy.data.filepath:
+            self.report({'INFO'}, "Save .blend first (LOD cache is stored next to it)")
+            return {'FINISHED'}
+
+        props = get_properties(context)
+        try:
+            ratios = parse_ratios(props.lod_ratios)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        objects = get_lod_candidates(context)
+        if not objects:
+            self.report({'INFO'}, "No mesh objects selected")
+            return {'FINISHED'}
+
+        ensure_materials(context) # surface prefixes are stripped from the LOD names
+        workers = props.lod_workers or max(1, (os.cpu_count() or 2) // 2)
+        cache_dir = os.path.join(os.path.dirname(bpy.data.filepath), LOD_CACHE_FOLDER)
+        tasks = start_lod_job(context, objects, ratios, workers, cache_dir)
+
+        if tasks:
+            self.report({'INFO'}, f"Decimating {tasks} mesh(es) for {len(objects)} object(s) in the background")
+        else:
+            self.report({'INFO'}, last_lod_result['message'])
+        return {'FINISHED'}
+
+
+class OPTIMIZE_OT_cancel_lods(bpy.types.Operator):
+    bl_idname = "ac_tools.cancel_lods"
+    bl_label = "Cancel LOD Generation"
+    bl_description = "Stop the running LOD workers (meshes finished so far stay cached)"
+
+    @classmethod
+    def poll(cls, context):
+        return is_lod_job_running()
+
+    def execute(self, context):
+        cancel_lod_job()
+        self.report({'INFO'}, "LOD generation cancelled")
+        return {'FINISHED'}
+
+
+class OPTIMIZE_OT_clear_lod_cache(bpy.types.Operator):
+    bl_idname = "ac_tools.clear_lod_cache"
+    bl_label = "Clear LOD Cache"
+    bl_description = f"Delete the cached LOD meshes ({LOD_CACHE_FOLDER} next to the .blend)"
+
+    @classmethod
+    def poll(cls, context):
+        return not is_lod_job_running()
+
+    def execute(self, context):
+        cache_dir = os.path.join(os.path.dirname(bpy.data.filepath), LOD_CACHE_FOLDER) if bpy.data.filepath else None
+        removed = 0
+        if cache_dir and os.path.isdir(cache_dir):
+            for entry in os.scandir(cache_dir):
+                if entry.is_file() and entry.name.endswith(".blend"):
+                    os.remove(entry.path)
+                    removed += 1
+        self.report({'INFO'}, f"Removed {removed} cached LOD mesh(es)")
+        return {'FINISHED'}
+
+
+@persistent
+def _on_load_post(*args):
+    """ Results of a running generation belong to the previous file """
+    cancel_lod_job()
+
+
+def register():
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    cancel_lod_job()
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
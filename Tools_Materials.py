@@ -1,9 +1,11 @@
 import copy
+import re
 import bpy
 import os
+from bpy.app.handlers import persistent
 
 from .Properties import FILE_SURFACES
-from .Functions import TrackFolder, get_properties, open_file_in_scripting, read_config, write_config
+from .Functions import TrackFolder, file_watcher, get_file_stamp, get_properties, invalidate_file_index, open_file_in_scripting, read_config, tag_redraw, write_config
 
 DEFAULT_MATERIALS = {
     "road": {"prefix": "1ROAD", "type": "default"},
@@ -116,33 +118,17 @@ class AddMaterial(bpy.types.Operator):
             return {'FINISHED'}
         
         
-        tf = TrackFolder(props.track_folder)
-
-        surfaces_file = tf.get_ac_file_path(FILE_SURFACES)
-        if not surfaces_file:
+        store = get_surface_store(TrackFolder(props.track_folder))
+        if not store:
             self.report({'INFO'}, f"Error. Cannot locate surface.ini.") # TODO auto create file
             return {'FINISHED'}
         
         self.key = self.key.upper()
-        max_nr = 0
-        cfg = read_config(surfaces_file)
-        for surface_slot in cfg.sections():
-            key = cfg[surface_slot].get('key')
-            if key == self.key:
-                self.report({'INFO'}, f"Error. Material {key} vs {self.key} already exists.")
-                return {'FINISHED'}
-
-            # find max nr and new slotname
-            try:
-                nr = int(surface_slot.split('_')[1])
-                if nr >= max_nr:
-                    max_nr = nr + 1
-            except:
-                continue
+        if store.has_key(self.key):
+            self.report({'INFO'}, f"Error. Material {self.key} already exists.")
+            return {'FINISHED'}
 
-        slot = f"SURFACE_{max_nr}" # this will be the "name" of the new material slot [SURFACE_<n>] -> cfg[slot] = ...
-        cfg[slot] = {
-            "key": self.key,
+        slot = store.add_surface(self.key, {
             "friction": round(self.friction, 2),          # Rundung auf 2 Dezimalstellen
             "damping": round(self.damping, 2),
             "wav": self.wav,
@@ -156,9 +142,8 @@ class AddMaterial(bpy.types.Operator):
             "is_pitlane": int(self.is_pitlane),         # Bool zu Int
             "vibration_gain": round(self.vibration_gain, 2),
             "vibration_length": round(self.vibration_length, 2),
-        }
-
-        write_config(cfg, surfaces_file)
+        })
+        store.save()
 
         load_materials(context)
 
@@ -213,10 +198,36 @@ class RemoveMaterial(bpy.types.Operator):
         return objects is not None and len(objects) > 0
 
     def execute(self, context):
+        ensure_materials(context)
         remove_prefix(self, context.selected_objects)
 
         return {'FINISHED'}
 
+class OBJECT_OT_apply_surface(bpy.types.Operator):
+    bl_idname = "object.ac_apply_surface"
+    bl_label = "Apply Surface"
+    bl_description = "Renaming object so the AC surface (material) will be applied"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    surface: StringProperty(
+        name="Surface",
+        description="Key of the surface in the materials registry"
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        objects = context.selected_objects
+        return objects is not None and len(objects) > 0
+
+    @classmethod
+    def description(cls, context, properties):
+        return f"Renaming object so {properties.surface} material will be applied"
+
+    def execute(self, context):
+        ensure_materials(context)
+        rename_objects(self, context.selected_objects, self.surface.lower())
+        return {'FINISHED'}
+
 # DYNAMIC MATERIAL SYSTEM:
 
 import subprocess as sp
@@ -243,7 +254,7 @@ class LoadMaterials(bpy.types.Operator):
     bl_description = "Loads custom materials from surface.ini"
 
     def execute(self, context):
-        nr = load_materials(context)
+        nr = load_materials(context, force=True)
         self.report({'INFO'}, f"Successfully loaded {nr} materials.")
         return {'FINISHED'}
     
@@ -256,10 +267,21 @@ class MaterialData:
     def __init__(self):
         self.data = copy.deepcopy(DEFAULT_MATERIALS)
         self.prefix_to_key = {item['prefix']: key for key, item in self.data.items()}
+        self._prefix_matcher = None
+        self.revision = 0   # incremented on every change (surface list sync)
 
     def add_material(self, key, prefix, material_type, physics: bool = True):
         self.data[key] = {'prefix': f"{int(physics)}{prefix}", 'type': material_type}
-        self.prefix_to_key[prefix] = key
+        self.prefix_to_key[self.data[key]['prefix']] = key
+        self._prefix_matcher = None
+        self.revision += 1
+
+    def remove_material(self, key):
+        item = self.data.pop(key, None)
+        if item:
+            self.prefix_to_key.pop(item['prefix'], None)
+            self._prefix_matcher = None
+            self.revision += 1
 
     def get(self, key):
         return self.data[key] if key in self.data else None
@@ -277,89 +299,222 @@ class MaterialData:
     def get_all_prefixes(self):
         return {item['prefix'] for item in self.data.values()}
 
+    def get_prefix_matcher(self):
+        """ Compiled regex matching any AC prefix at the start of a name (longest prefix wins) """
+        if self._prefix_matcher is None:
+            prefixes = sorted(self.get_all_prefixes(), key=len, reverse=True)
+            self._prefix_matcher = re.compile("|".join(re.escape(p) for p in prefixes))
+        return self._prefix_matcher
+
+    def match_prefix(self, name: str):
+        m = self.get_prefix_matcher().match(name)
+        return m.group(0) if m else None
 
 
-# custom material operators
+
+# materials registry (default + custom surfaces)
 materials = MaterialData()
-default_mat_operators = []
-custom_mat_operators = []
-collision_mat_operators = []
-
-def load_materials(context):
-    # unregister old
-    for op in default_mat_operators + custom_mat_operators + collision_mat_operators:
-        bpy.utils.unregister_class(op)
-        print(f"Removed {op}")
-
-    # init
-    default_mat_operators.clear()
-    custom_mat_operators.clear()
-    collision_mat_operators.clear()
-
-    global materials
-    materials.__init__()
 
-    # add custom surfaces to materials
-    custom_surfaces = get_surface_names(TrackFolder(get_properties(context).track_folder))
-    for surf in custom_surfaces:
-        if not materials.get(surf.lower()):
-            materials.add_material(surf.lower(), surf.upper(), MaterialData.TYPE_CUSTOM)
+_materials_loaded = False
 
-    #for key in materials.data.keys():
-    #    print(f"{key}: {materials.data[key]}")
+def load_materials(context, force: bool = False):
+    global _materials_loaded
+    store = get_surface_store(TrackFolder(get_properties(context).track_folder), force=force)
+    sync_custom_materials(store.keys() if store else [])
+    sync_surface_list(context.scene)
+    _materials_loaded = True
+    file_watcher.watch(FILE_SURFACES, reload_custom_materials) # from now on keep them up to date
+    return len(materials.data)
 
-    # create operators
-    for mat, data in materials.data.items():
-        op = create_material_operator(mat)
-        mat_type = data['type']
-        
-        if mat_type == MaterialData.TYPE_DEFAULT:
-            default_mat_operators.append(op)
-        elif mat_type == MaterialData.TYPE_CUSTOM:
-            custom_mat_operators.append(op)
-        elif mat_type == MaterialData.TYPE_COLLISION:
-            collision_mat_operators.append(op)
 
-        bpy.utils.register_class(op)
-        print(f"Load {mat}")
+def sync_surface_list(scene: bpy.types.Scene):
+    """ Copy the materials registry to the CollectionProperty shown in the surface list (once per reload) """
+    props = scene.ac_tools_properties
+    surfaces = props.surfaces
+    surfaces.clear()
+    for key, data in materials.data.items():
+        item = surfaces.add()
+        item.name = key
+        item.prefix = data['prefix']
+        item.surface_type = data['type']
 
-    return len(materials.data)
+        section = surface_store.get(key) if data['type'] == MaterialData.TYPE_CUSTOM else None
+        if section:
+            try:
+                item.friction = float(section.get('friction', -1))
+            except ValueError:
+                pass
+            item.is_valid_track = section.get('is_valid_track', '0').strip() == '1'
 
+    props.surface_index = max(0, min(props.surface_index, len(surfaces) - 1))
+    _synced_surface_lists[scene.as_pointer()] = get_surface_list_stamp()
 
-def get_surface_names(tf: TrackFolder):
-    surface_names = []
-    surfaces_file = tf.get_ac_file_path(FILE_SURFACES)
-    if surfaces_file:
-        cfg = read_config(surfaces_file)
-        for surface_slot in cfg.sections():
-            surf_name = cfg[surface_slot].get('key')
-            surface_names.append(surf_name)
-            print(f"Custom: {surface_slot} '{surf_name}'")
-
-    return surface_names
-
-
-# Dynamische Operator-Erstellung
-def create_material_operator(material_name):
-    class CustomMaterialOperator(bpy.types.Operator):
-        bl_idname = f"object.make_{material_name.lower()}"
-        bl_label = f"Make {material_name.capitalize()}"
-        bl_description = f"Renaming object so {material_name} material will be applied"
-        bl_options = {'REGISTER', 'UNDO'}
-        
-        @classmethod
-        def poll(cls, context):
-            objects = context.selected_objects
-            return objects is not None and len(objects) > 0
 
-        def __str__(self):
-            return material_name.upper()
+# scene -> stamp of the registry the surface list was last synced with
+_synced_surface_lists = {}
+
+def get_surface_list_stamp():
+    """ Changes whenever a material or a surfaces.ini value (friction, ...) shown in the list changed """
+    return (materials.revision, surface_store.revision)
+
+def is_surface_list_stale(scene: bpy.types.Scene):
+    return _synced_surface_lists.get(scene.as_pointer()) != get_surface_list_stamp()
+
+
+def request_surface_list_sync():
+    if not bpy.app.timers.is_registered(_sync_surface_list_timer):
+        bpy.app.timers.register(_sync_surface_list_timer, first_interval=0.0)
+
+def _sync_surface_list_timer():
+    if bpy.context.scene:
+        sync_surface_list(bpy.context.scene)
+        tag_redraw()
+    return None
 
-        def execute(self, context):
-            rename_objects(self, context.selected_objects, material_name.lower())
-            return {'FINISHED'}
-    
-    return CustomMaterialOperator
+
+def materials_loaded():
+    return _materials_loaded
+
+
+def ensure_materials(context):
+    """ Load custom materials the first time they are needed (per opened file) """
+    if not _materials_loaded:
+        load_materials(context)
+
+
+def request_materials_load():
+    """ Load materials right after the current redraw (panels must not read files in draw) """
+    if not bpy.app.timers.is_registered(_load_materials_timer):
+        bpy.app.timers.register(_load_materials_timer, first_interval=0.0)
+
+def _load_materials_timer():
+    if bpy.context.scene and not _materials_loaded:
+        load_materials(bpy.context)
+        tag_redraw()
+    return None
+
+
+def sync_custom_materials(custom_surfaces):
+    """ Add/remove only the custom surfaces that changed. Returns (added, removed). """
+    wanted = {surf.lower(): surf.upper() for surf in custom_surfaces}
+    current = materials.get_all_of_type(MaterialData.TYPE_CUSTOM)
+
+    removed = [key for key in current if key not in wanted]
+    for key in removed:
+        materials.remove_material(key)
+
+    added = []
+    for key, prefix in wanted.items():
+        if not materials.get(key):
+            materials.add_material(key, prefix, MaterialData.TYPE_CUSTOM)
+            added.append(key)
+
+    return added, removed
+
+
+def reload_custom_materials(path):
+    """ FileWatcher callback for surfaces.ini """
+    if not path: # file removed
+        added, removed = sync_custom_materials([])
+    elif surface_store.load(path):
+        added, removed = sync_custom_materials(surface_store.keys())
+    else:
+        return
+
+    if added or removed:
+        print(f"Reloaded {FILE_SURFACES}: +{len(added)} -{len(removed)} materials")
+    sync_surface_list(bpy.context.scene) # values (friction, ...) might have changed too
+    tag_redraw()
+
+
+""" 
+CLASS SurfaceStore()
+In-memory model of surfaces.ini, shared by all material code.
+Parsed once per (path, mtime, size) - key lookup is O(1), save() only writes when dirty.
+New surfaces take the lowest free SURFACE_<n> slot (AC stops reading at the first missing number).
+"""
+class SurfaceStore():
+    SLOT_PREFIX = "SURFACE_"
+
+    def __init__(self):
+        self.path = None
+        self._stamp = None
+        self._config = None
+        self._key_to_slot = {}  # KEY (upper) -> section name
+        self._used_nrs = set()
+        self.dirty = False
+        self.revision = 0
+
+    def load(self, path: str, force: bool = False):
+        """ (Re)parse surfaces.ini if it changed on disk. Returns True if data was (re)loaded. """
+        stamp = get_file_stamp(path)
+        if not force and stamp is not None and stamp == self._stamp:
+            return False
+
+        self.path = path
+        self._stamp = stamp
+        self._config = read_config(path)
+        self._key_to_slot.clear()
+        self._used_nrs.clear()
+        self.dirty = False
+
+        for surface_slot in self._config.sections():
+            self._index_slot(surface_slot)
+        self.revision += 1
+        return True
+
+    def _index_slot(self, surface_slot: str):
+        key = self._config[surface_slot].get('key')
+        if key:
+            self._key_to_slot.setdefault(key.upper(), surface_slot)
+        try:
+            self._used_nrs.add(int(surface_slot.split('_')[1]))
+        except (IndexError, ValueError):
+            pass
+
+    def keys(self):
+        return list(self._key_to_slot.keys())
+
+    def has_key(self, key: str):
+        return key.upper() in self._key_to_slot
+
+    def get(self, key: str):
+        slot = self._key_to_slot.get(key.upper())
+        return self._config[slot] if slot else None
+
+    def next_slot(self):
+        nr = 0
+        while nr in self._used_nrs:
+            nr += 1
+        return f"{self.SLOT_PREFIX}{nr}"
+
+    def add_surface(self, key: str, values: dict):
+        slot = self.next_slot()
+        self._config[slot] = {"key": key, **values}
+        self._index_slot(slot)
+        self.dirty = True
+        self.revision += 1
+        return slot
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return False
+        write_config(self._config, self.path)
+        self._stamp = get_file_stamp(self.path)
+        self.dirty = False
+        return True
+"""
+END CLASS
+"""
+
+surface_store = SurfaceStore()
+
+def get_surface_store(tf: TrackFolder, force: bool = False):
+    surfaces_file = tf.get_ac_file_path(FILE_SURFACES)
+    if not surfaces_file:
+        return None
+    surface_store.load(surfaces_file, force=force)
+    return surface_store
 
 
 # FUNCTIONS
@@ -369,28 +524,112 @@ def rename_objects(self, objects: bpy.types.Object, material_name: str):
         self.report({'ERROR'}, f"Invalid prefix {material_name}. Aborting rename.")
         return False
     
-    prefix = materials.get_prefix(material_name)
+    plan, skipped = plan_add_prefix(objects, materials.get_prefix(material_name))
+    renamed = apply_renames(plan)
+
+    if skipped:
+        self.report({'WARNING'}, f"{skipped} object(s) already are AC materials! Reset before reassigning.")
+    self.report({'INFO'}, f"Applied {material_name.upper()} to {renamed} object(s)")
+    return True
+
+
+def remove_prefix(self, objects):
+    plan = plan_remove_prefix(objects)
+    renamed = apply_renames(plan)
+
+    self.report({'INFO'}, f"Removed AC-Material from {renamed} object(s)")
+    return renamed > 0
+
 
+# BULK RENAMING
+
+def plan_add_prefix(objects, prefix: str):
+    """ Classify objects in one pass. Returns ([(obj, new_name)], number of objects already tagged) """
+    match = materials.get_prefix_matcher().match
+    plan = []
+    skipped = 0
     for obj in objects:
-        if obj.name.startswith(tuple(materials.get_all_prefixes())):
-            self.report({'ERROR'}, f"Object already is an AC material! Reset before reassigning.")
+        name = obj.name
+        if match(name):
+            skipped += 1
             continue
-        obj.name = prefix + '.' + obj.name
+        plan.append((obj, prefix + '.' + name))
+    return plan, skipped
 
-    return True
 
+def strip_prefix(name: str):
+    """ name without its AC prefix and delimiter ('1WALL.barrier' -> 'barrier'), unchanged if untagged """
+    m = materials.get_prefix_matcher().match(name)
+    if not m:
+        return name
+    new_name = name[m.end():]
+    if new_name.startswith(('.', '_', '-')):
+        new_name = new_name[1:]
+    return new_name
 
-def remove_prefix(self, objects):
+
+def plan_remove_prefix(objects):
+    plan = []
     for obj in objects:
-        for prefix in materials.get_all_prefixes():
-            # replace AC-Prefix
-            if obj.name.startswith(prefix):
-                obj.name = obj.name.replace(prefix, '')
-                # replace delimiter
-                if obj.name.startswith(('.', '_', '-')):
-                    obj.name = obj.name[1:]
-
-                self.report({'INFO'}, f"Removed AC-Material from object {obj.name}")
-                return True
-            
-    return False
+        name = obj.name
+        new_name = strip_prefix(name)
+        if new_name and new_name != name:
+            plan.append((obj, new_name))
+    return plan
+
+
+MAX_NAME_BYTES = 63
+
+def clip_name(name: str):
+    """ Name as Blender stores it - truncated to 63 bytes without splitting a character """
+    return name.encode('utf-8')[:MAX_NAME_BYTES].decode('utf-8', errors='ignore')
+
+
+def apply_renames(plan):
+    """
+    Rename objects, first the ones whose new name is free, then the ones freed by earlier renames,
+    so Blender's unique-name handling (.001 suffixes) only kicks in for real collisions.
+    """
+    taken = set(bpy.data.objects.keys())
+    pending = plan
+    while pending:
+        blocked = []
+        for obj, new_name in pending:
+            if clip_name(new_name) in taken:
+                blocked.append((obj, new_name))
+                continue
+            taken.discard(obj.name)
+            obj.name = new_name
+            taken.add(obj.name) # the name Blender actually assigned
+
+        if len(blocked) == len(pending): # no progress -> let Blender resolve the remaining names
+            for obj, new_name in blocked:
+                taken.discard(obj.name)
+                obj.name = new_name
+                taken.add(obj.name)
+            break
+        pending = blocked
+
+    return len(plan)
+
+
+@persistent
+def _on_load_post(*args):
+    """ New file -> drop per-file state, materials are loaded again on first use """
+    global _materials_loaded
+    _materials_loaded = False
+    materials.__init__()
+    surface_store.__init__()
+    _synced_surface_lists.clear()
+    invalidate_file_index()
+    file_watcher.unwatch(FILE_SURFACES)
+    file_watcher.reset()
+
+
+def register():
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    file_watcher.unwatch(FILE_SURFACES)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
@@ -1,14 +1,17 @@
 import bpy
-from math import radians
+import numpy as np
+from bpy.app.handlers import persistent
+from math import atan2, cos, pi, radians, sin
 from mathutils import Vector
 
-from .Properties import ALIGN_LEFT, ALIGN_RIGHT, AC_OBJ_PREFIX, AC_COLLECTION_NAME
-from .Functions import create_triangle_mesh, get_distance, get_properties
+from .Properties import ALIGN_LEFT, ALIGN_RIGHT, AC_OBJ_PREFIX, AC_COLLECTION_NAME, AC_COLLISION_COLLECTION_NAME
+from .Functions import create_triangle_mesh, get_properties
+from .Functions_Mesh import get_bvh, get_kdtree, get_world_vertices
+from .Tools_Materials import apply_renames, ensure_materials, materials, plan_remove_prefix, strip_prefix
+from .Tools_Optimize import build_mesh
 
 
 # TODO create objets referring to road (if road selected automatically place it on road / timing besides road)
-# TODO create simple collider objects 1WALL_<object> (cube with outer borders/convex hull?) with NULL material, visibility off
-#   advanced: make little mesh (like curvature for obj)
 
 
 class OBJECT_OT_create_start(bpy.types.Operator):
@@ -44,6 +47,65 @@ class OBJECT_OT_create_pit(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class OBJECT_OT_create_ac_grid(bpy.types.Operator):
+    bl_idname = "object.create_ac_grid"
+    bl_label = "Create Grid Layout"
+    bl_description = "Create multiple start, hotlap or pit positions at once (starting at cursor/track position)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    ac_type: bpy.props.EnumProperty(
+        name="Type",
+        items=[
+            ('START', "Start", "Grid positions (AC_START)"),
+            ('PIT', "Pit", "Pit boxes (AC_PIT)"),
+            ('HOTLAP', "Hotlap", "Hotlap start positions (AC_HOTLAP_START)"),
+        ],
+        default='START'
+    ) # type: ignore
+    count: bpy.props.IntProperty(
+        name="Count",
+        description="Number of positions to create",
+        default=20,
+        min=1,
+        max=500
+    ) # type: ignore
+    spacing: bpy.props.FloatProperty(
+        name="Spacing",
+        description="Distance between two positions along the heading",
+        default=3.0,
+        min=0.0,
+        unit='LENGTH'
+    ) # type: ignore
+    heading: bpy.props.FloatProperty(
+        name="Heading",
+        description="Driving direction of the grid (rotation around Z)",
+        default=0.0,
+        subtype='ANGLE'
+    ) # type: ignore
+    stagger: bpy.props.BoolProperty(
+        name="Stagger",
+        description="Alternate left/right by grid offset (grid_align/grid_offset)",
+        default=True
+    ) # type: ignore
+
+    def execute(self, context):
+        prefix = AC_OBJ_PREFIX[self.ac_type]
+        location = context.scene.cursor.location
+        heading = self.heading
+
+        placement = get_track_placement(context)
+        if placement: # start on the road, heading along the road
+            location = placement.center
+            heading = placement.heading
+
+        objects = create_ac_grid(prefix, self.count, location, self.spacing, heading, self.stagger)
+        self.report({'INFO'}, f"Created {len(objects)} {prefix} objects")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+
 class OBJECT_OT_create_time(bpy.types.Operator):
     bl_idname = "object.create_timing"
     bl_label = "Create Timing Position"
@@ -55,6 +117,188 @@ class OBJECT_OT_create_time(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class OBJECT_OT_create_colliders(bpy.types.Operator):
+    bl_idname = "object.create_colliders"
+    bl_label = "Create Colliders"
+    bl_description = "Create simple collision meshes (wall surface, NULL material, not rendered) for the selected barrier and wall objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    segment_length: bpy.props.FloatProperty(
+        name="Segment Length",
+        description="Length of the boxes the collider is made of (shorter follows curves closer)",
+        default=10.0,
+        min=0.5,
+        unit='LENGTH'
+    ) # type: ignore
+    thickness: bpy.props.FloatProperty(
+        name="Min. Thickness",
+        description="Minimum thickness of the collider",
+        default=0.3,
+        min=0.01,
+        unit='LENGTH'
+    ) # type: ignore
+    strip_source_prefix: bpy.props.BoolProperty(
+        name="Make Sources Visual",
+        description="Remove the physical surface prefix (e.g. 1WALL) from the selected objects, so AC only collides with the simple collider",
+        default=False
+    ) # type: ignore
+
+    def execute(self, context):
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH' and not obj.name.startswith('AC_')]
+        if not objects:
+            self.report({'INFO'}, "No mesh objects selected")
+            return {'FINISHED'}
+
+        ensure_materials(context)
+        colliders = create_colliders(context, objects, self.segment_length, self.thickness)
+        faces = sum(len(obj.data.polygons) for obj in colliders)
+        self.report({'INFO'}, f"Created {len(colliders)} collider(s) with {faces} faces")
+
+        # the detailed mesh must not stay a physical surface, otherwise AC collides with both
+        physical = [obj for obj in objects if is_physical(obj.name)]
+        if physical and self.strip_source_prefix:
+            renamed = apply_renames(plan_remove_prefix(physical))
+            self.report({'INFO'}, f"Removed the surface prefix from {renamed} source object(s)")
+        elif physical:
+            self.report({'WARNING'}, f"{len(physical)} source object(s) are still physical surfaces (e.g. {physical[0].name})")
+        return {'FINISHED'}
+
+
+
+""" 
+CLASS ACObjectRegistry()
+Index of the AC logic objects (AC_START/AC_HOTLAP_START/AC_PIT/AC_TIME) of the scene.
+Kept up to date by a depsgraph_update_post handler - structural changes only mark it dirty,
+the scene is scanned again on the next query. Counts are taken from the AC_OBJECTS collection.
+"""
+class ACObjectRegistry():
+    # parts of the name holding the number, e.g. AC_START_<n>, AC_TIME_<n>_L
+    INDEX_POS = {prefix: (-2 if key == 'TIME' else -1) for key, prefix in AC_OBJ_PREFIX.items()}
+
+    def __init__(self):
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        self._dirty = True
+        self._scene = None
+        self._object_count = -1
+        self._collection_len = -1
+        self._names = {}    # object pointer -> name (AC objects only)
+        self._max = {}      # prefix -> (highest number, object name)
+        self._counts = {}   # prefix -> count in AC collection
+
+    @classmethod
+    def parse(cls, name: str):
+        for prefix, pos in cls.INDEX_POS.items():
+            if name.startswith(prefix):
+                try:
+                    return prefix, int(name.rsplit('_')[pos])
+                except (IndexError, ValueError):
+                    return prefix, None
+        return None, None
+
+    def _add(self, obj: bpy.types.Object, in_collection: bool):
+        prefix, number = self.parse(obj.name)
+        if not prefix:
+            return
+        self._names[obj.as_pointer()] = obj.name
+        if number is not None and number >= self._max.get(prefix, (-1, None))[0]:
+            self._max[prefix] = (number, obj.name)
+        if in_collection:
+            self._counts[prefix] = self._counts.get(prefix, 0) + 1
+
+    def rebuild(self, scene: bpy.types.Scene):
+        self.mark_dirty()
+        for obj in scene.objects:
+            self._add(obj, in_collection=False)
+
+        collection = bpy.data.collections.get(AC_COLLECTION_NAME)
+        if collection:
+            for obj in collection.objects:
+                prefix, _ = self.parse(obj.name)
+                if prefix:
+                    self._counts[prefix] = self._counts.get(prefix, 0) + 1
+        self._collection_len = len(collection.objects) if collection else 0
+
+        self._scene = scene.as_pointer()
+        self._object_count = len(bpy.data.objects)
+        self._dirty = False
+
+    def ensure(self, scene: bpy.types.Scene):
+        if self._dirty or self._scene != scene.as_pointer():
+            self.rebuild(scene)
+
+    def register_object(self, obj: bpy.types.Object):
+        """ Add a newly created (and linked) AC object without rescanning """
+        if self._dirty:
+            return
+        self._add(obj, in_collection=True)
+        self._object_count = len(bpy.data.objects)
+        self._collection_len += 1
+
+    def next_index(self, scene: bpy.types.Scene, prefix: str):
+        """ Returns (next free number, name of the object with the highest number or None) """
+        self.ensure(scene)
+        number, name = self._max.get(prefix, (-1, None))
+        if name and name not in bpy.data.objects: # renamed/removed without depsgraph update
+            self.rebuild(scene)
+            number, name = self._max.get(prefix, (-1, None))
+        return number + 1, name
+
+    def count(self, scene: bpy.types.Scene, prefix: str):
+        self.ensure(scene)
+        return self._counts.get(prefix, 0)
+
+    def on_depsgraph_update(self, scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph):
+        if self._dirty:
+            return
+        if scene.as_pointer() != self._scene or len(bpy.data.objects) != self._object_count:
+            self.mark_dirty()
+            return
+
+        for update in depsgraph.updates:
+            id = update.id
+            if isinstance(id, bpy.types.Collection):
+                if id.name == AC_COLLECTION_NAME and len(id.objects) != self._collection_len: # (un)linked objects
+                    self.mark_dirty()
+                    return
+            elif isinstance(id, bpy.types.Object):
+                name = self._names.get(id.original.as_pointer())
+                if name != id.name and (name or self.parse(id.name)[0]): # renamed from/to AC object
+                    self.mark_dirty()
+                    return
+"""
+END CLASS
+"""
+
+ac_registry = ACObjectRegistry()
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    ac_registry.on_depsgraph_update(scene, depsgraph)
+
+@persistent
+def _on_undo_redo_load(*args):
+    ac_registry.mark_dirty()
+
+_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+    (bpy.app.handlers.undo_post, _on_undo_redo_load),
+    (bpy.app.handlers.redo_post, _on_undo_redo_load),
+    (bpy.app.handlers.load_post, _on_undo_redo_load),
+)
+
+def register():
+    for handlers, fn in _handlers:
+        if fn not in handlers:
+            handlers.append(fn)
+
+def unregister():
+    for handlers, fn in _handlers:
+        if fn in handlers:
+            handlers.remove(fn)
+
 
 # TODO offset to left or right and recalc when selected -> change orientation (UNDO step!!)
 def create_ac_object(prefix: str):
@@ -65,152 +309,366 @@ def create_ac_object(prefix: str):
     if align == ALIGN_RIGHT:
         offset = offset * -1
 
-    location = get_track_middle_point(prefix)
-    max_number = 0
-    for obj in bpy.context.scene.objects:
-        if obj.name.startswith(prefix):
-            try:
-                pos = -1
-                number = int(obj.name.rsplit('_')[pos])
-                if number >= max_number:
-                    max_number = number + 1
-                    location = Vector((obj.location.x, obj.location.y - 3, obj.location.z)) # offset y for grid layour  
-            except:
-                continue
+    max_number, last_name = ac_registry.next_index(bpy.context.scene, prefix)
 
-    name = f"{prefix}_{max_number}"
+    placement = get_track_placement(bpy.context)
+    if placement: # placed on the road under the cursor
+        obj = new_ac_object(f"{prefix}_{max_number}", placement.get_location(prefix, max_number, props.grid_align), placement.heading)
+        link_ac_objects([obj])
+        return
 
-    if name in bpy.data.objects:
-        bpy.data.objects.remove(bpy.data.objects[name])
+    location = bpy.context.scene.cursor.location
+    if last_name:
+        obj = bpy.data.objects[last_name]
+        location = Vector((obj.location.x, obj.location.y - 3, obj.location.z)) # offset y for grid layour  
 
-    obj = bpy.data.objects.new(name, create_triangle_mesh(name))
-    if max_number == 0:
-        obj.location = location
-    else:
-        obj.location = (
+    name = f"{prefix}_{max_number}"
+    if max_number != 0:
+        location = Vector((
             location.x - offset if max_number % 2 != 0 else location.x + offset, # grid layout left/right
             location.y,
             location.z
-        )
+        ))
+
+    obj = new_ac_object(name, location)
+    link_ac_objects([obj])
+
+
+def create_ac_grid(prefix: str, count: int, location: Vector, spacing: float, heading: float = 0.0, stagger: bool = True):
+    """ Create <count> AC objects in one batch, going backwards from location (first position) """
+    props = get_properties(bpy.context)
+    offset = props.grid_offset
+    if props.grid_align == ALIGN_RIGHT:
+        offset = offset * -1
+
+    first_number, _ = ac_registry.next_index(bpy.context.scene, prefix)
+    forward = Vector((-sin(heading), cos(heading), 0))
+    right = Vector((cos(heading), sin(heading), 0))
 
-    set_default_material(obj)
-    setup_ac_object(obj)
+    mesh = get_marker_mesh()
+    objects = []
+    for i in range(count):
+        number = first_number + i
+        pos = Vector(location) - forward * (spacing * i)
+        if stagger and number % 2 != 0:
+            pos -= right * offset # grid layout left/right
+        objects.append(new_ac_object(f"{prefix}_{number}", pos, heading, mesh))
+
+    link_ac_objects(objects)
+    return objects
 
 
 def create_timing_objects(prefix: str):
     props = get_properties(bpy.context)
     offset = props.grid_offset
 
-    location = get_track_middle_point(prefix)
-    max_number = 0
-    for obj in bpy.context.scene.objects:
-        if obj.name.startswith(prefix):
-            try:
-                pos = -2
-                number = int(obj.name.rsplit('_')[pos])
-                if number >= max_number:
-                    max_number = number + 1
-            except:
-                continue
+    max_number, _ = ac_registry.next_index(bpy.context.scene, prefix)
 
     # create for both sides
     name_l = f"{prefix}_{max_number}_L"
     name_r = f"{prefix}_{max_number}_R"
 
-    if name_l in bpy.data.objects:
-        bpy.data.objects.remove(bpy.data.objects[name_l])
-    if name_r in bpy.data.objects:
-        bpy.data.objects.remove(bpy.data.objects[name_r])
-
-    obj_l = bpy.data.objects.new(name_l, create_triangle_mesh(name_l))
-    obj_r = bpy.data.objects.new(name_r, create_triangle_mesh(name_r))
-
-    obj_l.location = Vector((location.x - (offset / 2), location.y, location.z))
-    obj_r.location = Vector((location.x + (offset / 2), location.y, location.z))
-
-    set_default_material(obj_l)
-    set_default_material(obj_r)
+    placement = get_track_placement(bpy.context)
+    if placement: # besides the road edges
+        side = placement.get_side_vector() * RoadPlacement.TIMING_MARGIN
+        obj_l = new_ac_object(name_l, placement.left - side, placement.heading)
+        obj_r = new_ac_object(name_r, placement.right + side, placement.heading)
+    else:
+        location = bpy.context.scene.cursor.location
+        obj_l = new_ac_object(name_l, Vector((location.x - (offset / 2), location.y, location.z)))
+        obj_r = new_ac_object(name_r, Vector((location.x + (offset / 2), location.y, location.z)))
 
-    setup_ac_object(obj_l)
-    setup_ac_object(obj_r)
+    link_ac_objects([obj_l, obj_r])
 
 
-def set_default_material(obj: bpy.types.Object):
-    name = "AC_OBJECT"
-    mat = (bpy.data.materials.get(name) or bpy.data.materials.new(name))
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    links = mat.node_tree.links
+def new_ac_object(name: str, location: Vector, heading: float = 0.0, mesh: bpy.types.Mesh = None):
+    """ Create AC object (not linked to the scene yet, see link_ac_objects) """
+    if name in bpy.data.objects:
+        bpy.data.objects.remove(bpy.data.objects[name])
 
-    node = nodes.get('Principled BSDF')
-    if node:
-        inp: bpy.types.Node = node.inputs.get('Base Color')
+    obj = bpy.data.objects.new(name, mesh or get_marker_mesh())
+    obj.location = location
+    # make z front and y up
+    obj.rotation_euler = (radians(90), 0, heading)
+    return obj
+
+
+AC_MARKER_NAME = "AC_MARKER"
+AC_MATERIAL_NAME = "AC_OBJECT"
+
+def get_ac_material():
+    """ Material of all AC objects (set up once) """
+    mat = bpy.data.materials.get(AC_MATERIAL_NAME)
+    if mat is None:
+        mat = bpy.data.materials.new(AC_MATERIAL_NAME)
+        mat.diffuse_color = (0.8, 0, 0, 1)
+        mat.use_nodes = True
+        node = mat.node_tree.nodes.get('Principled BSDF')
+        inp = node.inputs.get('Base Color') if node else None
         if inp:
             inp.default_value = (0.8, 0, 0, 1)
-            print("Input adjusted")
-        else:
-            print(f"Input not found {node.inputs}")
-            for i in node.inputs:
-                print(f"Input {i}")
-    else:
-        print(f"Node principled not found")
+    return mat
 
-    obj.data.materials.append(mat)
 
+def get_marker_mesh():
+    """ Triangle mesh shared by all AC objects """
+    mesh = bpy.data.meshes.get(AC_MARKER_NAME + "_Mesh")
+    if mesh is None:
+        mesh = create_triangle_mesh(AC_MARKER_NAME)
+    if not mesh.materials:
+        mesh.materials.append(get_ac_material())
+    return mesh
 
-def setup_ac_object(obj: bpy.types.Object):
-    from mathutils import Matrix
 
-    # make z front and y up
-    obj.rotation_euler = (radians(90), 0,0)
-    obj.data.update()
-
-    # Objekt zur Szene hinzufügen
+def link_ac_objects(objects):
+    # Objekte zur Szene hinzufügen
     if AC_COLLECTION_NAME not in bpy.data.collections:
         c = bpy.data.collections.new(AC_COLLECTION_NAME)
         bpy.context.scene.collection.children.link(c)
-    bpy.data.collections[AC_COLLECTION_NAME].objects.link(obj)
+    collection = bpy.data.collections[AC_COLLECTION_NAME]
+
+    for obj in objects:
+        collection.objects.link(obj)
+        ac_registry.register_object(obj)
+        obj.select_set(True)
+
+# COLLIDERS
+
+COLLIDER_MATERIAL_NAME = "NULL"
+
+# box faces (quads) of the 8 corners: bottom 0-3, top 4-7, counter clockwise seen from above
+BOX_FACES = ((0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7))
+
+def get_collider_material():
+    mat = bpy.data.materials.get(COLLIDER_MATERIAL_NAME)
+    if mat is None:
+        mat = bpy.data.materials.new(COLLIDER_MATERIAL_NAME)
+    return mat
+
+
+def get_segment_boxes(points, segment_length: float, thickness: float):
+    """
+    Oriented boxes around world space points (n, 3), all segments at once:
+    points are binned into cells of segment_length along the principal axis (and across it,
+    so parallel parts stay apart), every cell gets its own principal direction (grouped 2D PCA)
+    and is bounded by the min/max along it, padded to thickness and extruded over its height.
+    Returns box corners (segments, 8, 3).
+    """
+    xy = points[:, :2] - points[:, :2].mean(axis=0)
+    _, _, vt = np.linalg.svd(xy[:min(len(xy), 100000)], full_matrices=False)
+    t = xy @ vt[0]
+    s = xy @ vt[1]
+    cells = np.stack((np.floor((t - t.min()) / segment_length), np.floor((s - s.min()) / segment_length)), axis=1)
+    _, seg = np.unique(cells, axis=0, return_inverse=True)
+    seg = seg.ravel()
+    count = seg.max() + 1
+
+    # grouped covariance -> direction per segment
+    n = np.bincount(seg, minlength=count)
+    mean = np.stack([np.bincount(seg, xy[:, i], count) for i in range(2)], axis=1) / n[:, None]
+    d = xy - mean[seg]
+    cxx = np.bincount(seg, d[:, 0] * d[:, 0], count)
+    cyy = np.bincount(seg, d[:, 1] * d[:, 1], count)
+    cxy = np.bincount(seg, d[:, 0] * d[:, 1], count)
+    angle = 0.5 * np.arctan2(2 * cxy, cxx - cyy)
+    axis_u = np.stack((np.cos(angle), np.sin(angle)), axis=1)
+    axis_v = np.stack((-axis_u[:, 1], axis_u[:, 0]), axis=1)
+
+    # extents in local axes (grouped min/max)
+    u = np.einsum('ij,ij->i', d, axis_u[seg])
+    v = np.einsum('ij,ij->i', d, axis_v[seg])
+    bounds = {}
+    for key, values in (('u', u), ('v', v), ('z', points[:, 2])):
+        lo = np.full(count, np.inf)
+        hi = np.full(count, -np.inf)
+        np.minimum.at(lo, seg, values)
+        np.maximum.at(hi, seg, values)
+        bounds[key] = (lo, hi)
+
+    # pad thin walls to thickness
+    v_lo, v_hi = bounds['v']
+    pad = np.maximum(0.0, thickness - (v_hi - v_lo)) / 2
+    v_lo, v_hi = v_lo - pad, v_hi + pad
+    u_lo, u_hi = bounds['u']
+    z_lo, z_hi = bounds['z']
+
+    corners_u = np.stack((u_lo, u_hi, u_hi, u_lo), axis=1)
+    corners_v = np.stack((v_lo, v_lo, v_hi, v_hi), axis=1)
+    ring = (mean + points[:, :2].mean(axis=0))[:, None, :] + corners_u[..., None] * axis_u[:, None, :] + corners_v[..., None] * axis_v[:, None, :]
+
+    boxes = np.empty((count, 8, 3))
+    boxes[:, :4, :2] = ring
+    boxes[:, 4:, :2] = ring
+    boxes[:, :4, 2] = z_lo[:, None]
+    boxes[:, 4:, 2] = z_hi[:, None]
+    return boxes
+
+
+def build_box_mesh(name: str, boxes, material: bpy.types.Material):
+    count = len(boxes)
+    faces = np.array(BOX_FACES, dtype=np.int32)
+    corners = (faces[None, :, :] + (np.arange(count, dtype=np.int32) * 8)[:, None, None]).ravel()
+    return build_mesh(name, boxes.reshape(-1, 3), corners, np.full(count * len(BOX_FACES), 4, dtype=np.int32), [], [material])
+
+
+def is_physical(name: str):
+    """ Name starts with a surface prefix AC collides with (1<KEY>) """
+    prefix = materials.match_prefix(name)
+    return bool(prefix) and prefix.startswith('1')
+
+
+def create_colliders(context: bpy.types.Context, objects: list, segment_length: float, thickness: float):
+    """ One collider object <wall prefix>_<name> per object in the AC_COLLISION collection (replaced if it exists) """
+    collection = bpy.data.collections.get(AC_COLLISION_COLLECTION_NAME)
+    if collection is None:
+        collection = bpy.data.collections.new(AC_COLLISION_COLLECTION_NAME)
+        context.scene.collection.children.link(collection)
+
+    prefix = materials.get_prefix('wall')
+    material = get_collider_material()
+    depsgraph = context.evaluated_depsgraph_get()
+
+    colliders = []
+    for obj in objects:
+        eval_obj = obj.evaluated_get(depsgraph)
+        mesh = eval_obj.to_mesh()
+        try:
+            points = get_world_vertices(obj, mesh)
+        finally:
+            eval_obj.to_mesh_clear()
+        if len(points) < 2:
+            continue
+
+        name = f"{prefix}_{strip_prefix(obj.name)}" # 1WALL.barrier -> 1WALL_barrier
+        old = bpy.data.objects.get(name)
+        if old:
+            old_mesh = old.data
+            bpy.data.objects.remove(old)
+            if old_mesh and old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+
+        collider = bpy.data.objects.new(name, build_box_mesh(name, get_segment_boxes(points, segment_length, thickness), material))
+        collider.hide_render = True
+        collider.display_type = 'WIRE'
+        collection.objects.link(collider)
+        colliders.append(collider)
+    return colliders
+
+
+# TRACK PLACEMENT (track_align)
+
+"""
+CLASS RoadPlacement()
+Position on the road found by raycasts on the cached BVH-tree of the road mesh:
+center between both road edges, driving direction and the edge points.
+"""
+class RoadPlacement():
+    RAY_HEIGHT = 10.0       # raycasts start this much above the road
+    MAX_HALF_WIDTH = 50.0   # stop searching for an edge after this distance
+    EDGE_STEP = 1.0         # coarse step for edge search (refined by bisection)
+    DIRECTIONS = 36         # probed directions over 180 degrees
+    TIMING_MARGIN = 1.0     # timing objects are placed this much outside of the road
+
+    def __init__(self, center: Vector, direction: Vector, left: Vector, right: Vector):
+        self.center = center
+        self.direction = direction  # normalized, horizontal
+        self.left = left
+        self.right = right
+        self.width = (left.xy - right.xy).length
+        self.heading = atan2(-direction.x, direction.y) # rotation around z (AC objects point to +y)
+
+    def get_side_vector(self):
+        """ Horizontal vector pointing to the right of the driving direction """
+        return Vector((self.direction.y, -self.direction.x, 0))
+
+    def get_location(self, prefix: str, number: int = 0, align: str = ALIGN_LEFT):
+        if prefix == AC_OBJ_PREFIX['START']: # left/right half of the track
+            side = 1 if align == ALIGN_RIGHT else -1
+            if number % 2 != 0:
+                side = -side
+            return self.center + self.get_side_vector() * (side * self.width / 4)
+        return self.center.copy()
+"""
+END CLASS
+"""
+
+
+def _raycast_down(bvh, point: Vector, height: float):
+    origin = Vector((point.x, point.y, height + RoadPlacement.RAY_HEIGHT))
+    location, normal, index, dist = bvh.ray_cast(origin, Vector((0, 0, -1)), 2 * RoadPlacement.RAY_HEIGHT)
+    return location
+
+
+def _find_edge(bvh, start: Vector, direction: Vector):
+    """ Distance from start to the road edge along direction (march, then bisect) """
+    inside = 0.0
+    outside = None
+    t = RoadPlacement.EDGE_STEP
+    while t <= RoadPlacement.MAX_HALF_WIDTH:
+        if _raycast_down(bvh, start + direction * t, start.z) is None:
+            outside = t
+            break
+        inside = t
+        t += RoadPlacement.EDGE_STEP
+    if outside is None:
+        return RoadPlacement.MAX_HALF_WIDTH
+
+    for _ in range(8):
+        mid = (inside + outside) / 2
+        if _raycast_down(bvh, start + direction * mid, start.z) is None:
+            outside = mid
+        else:
+            inside = mid
+    return inside
+
+
+def find_road_placement(obj: bpy.types.Object, point: Vector, forward_hint: Vector):
+    bvh = get_bvh(obj)
+    hit = _raycast_down(bvh, point, point.z)
+    if hit is None: # cursor besides the road -> start at the nearest road vertex
+        co, _, _ = get_kdtree(obj).find(point)
+        hit = _raycast_down(bvh, co, co.z) if co is not None else None
+        if hit is None:
+            return None
+
+    # the direction across the road is the one with the smallest width
+    best = None
+    for i in range(RoadPlacement.DIRECTIONS):
+        angle = pi * i / RoadPlacement.DIRECTIONS
+        across = Vector((cos(angle), sin(angle), 0))
+        dist_a = _find_edge(bvh, hit, across)
+        dist_b = _find_edge(bvh, hit, -across)
+        if best is None or dist_a + dist_b < best[0]:
+            best = (dist_a + dist_b, across, dist_a, dist_b)
+    _, across, dist_a, dist_b = best
+
+    direction = Vector((-across.y, across.x, 0))
+    if direction.dot(forward_hint) < 0:
+        direction.negate()
+
+    edge_a = hit + across * dist_a
+    edge_b = hit - across * dist_b
+    edge_a.z = (_raycast_down(bvh, edge_a, hit.z) or edge_a).z
+    edge_b.z = (_raycast_down(bvh, edge_b, hit.z) or edge_b).z
+
+    # across points to the right or left of the driving direction
+    if across.dot(Vector((direction.y, -direction.x, 0))) > 0:
+        left, right = edge_b, edge_a
+    else:
+        left, right = edge_a, edge_b
 
-    obj.select_set(True)
+    center = (left + right) / 2
+    center.z = (_raycast_down(bvh, center, hit.z) or hit).z
+    return RoadPlacement(center, direction, left, right)
 
-# TODO make it location, roatation and track_width - not only location!
-def get_track_middle_point(prefix: str):
-    context = bpy.context
+
+def get_track_placement(context: bpy.types.Context):
+    """ Road placement at the cursor, None if track_align is off or the active object is no road mesh """
     props = get_properties(context)
     obj = context.active_object
-    cursor = context.scene.cursor.location
-
-    if not props.track_align or not obj:
-        print("Track Align deactivated or no active object - Using Cursor location")
-        return cursor
-    
-    # find closest x/y to the "left" and then also to the "right" of cursor (depending on direction...)
-    # draw line in 90 degree to track direction
-    # don't forget rotation (keep in mind local z=forward, y=up!)
-
-    vertices = [v.co for v in obj.data.vertices]
-    world_vertices = [obj.matrix_world @ v for v in vertices]
-    for v in world_vertices:
-        print(f"Track: {v}")
-    print(f"Cursor: {cursor}")
-
-    distances = [get_distance(cursor, v) for v in world_vertices]
-    for d in distances:
-        print(f"Distance {d}")
-
-
-
-
-
-    if prefix == AC_OBJ_PREFIX['TIME']:
-        pass # place to left and right of track
-    if prefix == AC_OBJ_PREFIX['PIT']:
-        pass # try to find pit direction and rotate location
-    if prefix == AC_OBJ_PREFIX['HOTLAP']:
-        pass # place in middle of track
-    if prefix == AC_OBJ_PREFIX['START']:
-        pass # place in left/right half of the track
-    
-    location = None
+    if not props.track_align or not obj or obj.type != 'MESH' or len(obj.data.vertices) == 0:
+        return None
 
-    return location
\ No newline at end of file
+    cursor = context.scene.cursor
+    forward_hint = cursor.matrix.to_3x3() @ Vector((0, 1, 0)) # rotate the cursor to flip the direction
+    return find_road_placement(obj, cursor.location, forward_hint)
@@ -0,0 +1,513 @@
+import bpy
+
+import math
+import numpy as np
+
+from .Properties import AC_MERGED_COLLECTION_NAME
+from .Functions import get_properties
+from .Functions_Mesh import get_corner_vertex_ids, to_world, to_world_normals
+from .Tools_Analysis import get_export_objects
+from .Tools_Materials import materials as ac_materials
+
+# Mesh optimization for the AC export (splitting of oversized meshes, merging of small objects)
+
+# attribute data type -> (values per element, foreach property, numpy dtype name)
+ATTRIBUTE_LAYOUT = {
+    'FLOAT':         (1, 'value', 'float32'),
+    'INT':           (1, 'value', 'int32'),
+    'INT8':          (1, 'value', 'int8'),
+    'BOOLEAN':       (1, 'value', 'bool'),
+    'FLOAT2':        (2, 'vector', 'float32'),
+    'INT32_2D':      (2, 'value', 'int32'),
+    'FLOAT_VECTOR':  (3, 'vector', 'float32'),
+    'FLOAT_COLOR':   (4, 'color', 'float32'),
+    'BYTE_COLOR':    (4, 'color', 'float32'),
+    'QUATERNION':    (4, 'value', 'float32'),
+}
+
+
+def _foreach_get(collection, prop: str, count: int, width: int = 1, dtype: str = 'float32'):
+    data = np.empty(count * width, dtype=dtype)
+    collection.foreach_get(prop, data)
+    return data.reshape(-1, width) if width > 1 else data
+
+
+def _polygon_loops(loop_start, loop_total):
+    """ Loop indices of the given polygons (concatenated) """
+    return np.repeat(loop_start - np.cumsum(loop_total) + loop_total, loop_total) + np.arange(loop_total.sum())
+
+
+def _edge_keys(edges, vertex_count: int):
+    """ Order independent key per edge (vertex index pairs (n, 2)) """
+    pairs = np.sort(edges, axis=1).astype(np.int64)
+    return pairs[:, 0] * vertex_count + pairs[:, 1]
+
+
+def _match_edges(mesh: bpy.types.Mesh, edges):
+    """ Index into edges (vertex pairs in the vertex order of mesh) for every edge of mesh, -1 if it has none """
+    vertex_count = len(mesh.vertices)
+    wanted = _edge_keys(_foreach_get(mesh.edges, 'vertices', len(mesh.edges), 2, 'int32'), vertex_count)
+    if edges is None or len(edges) == 0:
+        return np.full(len(wanted), -1)
+    keys = _edge_keys(edges, vertex_count)
+    order = np.argsort(keys)
+    index = order[np.minimum(np.searchsorted(keys[order], wanted), len(keys) - 1)]
+    return np.where(keys[index] == wanted, index, -1)
+
+
+def read_mesh_buffers(mesh: bpy.types.Mesh):
+    """ Flat arrays of a mesh needed to split it, read once per mesh """
+    buffers = {
+        'co': _foreach_get(mesh.vertices, 'co', len(mesh.vertices), 3),
+        'corners': _foreach_get(mesh.loops, 'vertex_index', len(mesh.loops), dtype='int32'),
+        'centers': _foreach_get(mesh.polygons, 'center', len(mesh.polygons), 3),
+        'loop_start': _foreach_get(mesh.polygons, 'loop_start', len(mesh.polygons), dtype='int32'),
+        'loop_total': _foreach_get(mesh.polygons, 'loop_total', len(mesh.polygons), dtype='int32'),
+        'edges': _foreach_get(mesh.edges, 'vertices', len(mesh.edges), 2, 'int32'),
+        # kept as custom normals, a chunk has no neighbours to smooth with along the cut
+        'normals': _foreach_get(mesh.corner_normals, 'vector', len(mesh.loops), 3),
+        'ids': get_corner_vertex_ids(mesh)[0],
+        'attributes': [],   # (name, data type, domain, foreach property, values)
+        'dropped': [],      # attributes of a type that can't be copied
+    }
+    for attr in mesh.attributes:
+        if attr.name == 'position' or attr.name.startswith('.'):
+            continue
+        layout = ATTRIBUTE_LAYOUT.get(attr.data_type)
+        if layout is None or attr.domain not in ('POINT', 'EDGE', 'CORNER', 'FACE'):
+            buffers['dropped'].append(attr.name)
+            continue
+        width, prop, dtype = layout
+        buffers['attributes'].append((attr.name, attr.data_type, attr.domain, prop, _foreach_get(attr.data, prop, len(attr.data), width, dtype)))
+    return buffers
+
+
+def split_polygons(buffers: dict, limit: int):
+    """
+    Recursive median bisection of the polygon centers along the longest axis
+    until every chunk has at most `limit` export vertices (see get_corner_vertex_ids).
+    Returns a list of polygon index arrays (one per chunk) in a stable order.
+    """
+    centers, ids = buffers['centers'], buffers['ids']
+    loop_start, loop_total = buffers['loop_start'], buffers['loop_total']
+
+    chunks = []
+    stack = [np.arange(len(centers))]
+    while stack:
+        polys = stack.pop()
+        if len(polys) <= 1 or len(np.unique(ids[_polygon_loops(loop_start[polys], loop_total[polys])])) <= limit:
+            chunks.append(polys)
+            continue
+        points = centers[polys]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argsort(points[:, axis], kind='stable')
+        half = len(polys) // 2
+        # second half first, so chunks come out in ascending order
+        stack.append(polys[order[half:]])
+        stack.append(polys[order[:half]])
+    return chunks
+
+
+def build_mesh(name: str, co, corners, loop_total, attributes, materials, edges=None, normals=None):
+    """
+    New mesh from flat buffers: vertex coordinates (n, 3), corner vertex indices,
+    corners per polygon and generic attributes [(name, data type, domain, foreach property, values)].
+    EDGE values belong to edges (vertex index pairs (n, 2)), edges are rebuilt from the polygons
+    and matched by their vertices. normals (one per corner) are set as custom normals.
+    """
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set('co', np.ascontiguousarray(co, dtype=np.float32).ravel())
+    mesh.loops.add(len(corners))
+    mesh.loops.foreach_set('vertex_index', np.ascontiguousarray(corners, dtype=np.int32).ravel())
+    mesh.polygons.add(len(loop_total))
+    mesh.polygons.foreach_set('loop_start', (np.cumsum(loop_total) - loop_total).astype(np.int32))
+
+    for material in materials:
+        mesh.materials.append(material)
+
+    # generic attributes (uv maps, material index, colors, ...), edge data once the edges exist
+    for attr_name, data_type, domain, prop, values in attributes:
+        if domain != 'EDGE':
+            target = mesh.attributes.get(attr_name) or mesh.attributes.new(attr_name, data_type, domain)
+            target.data.foreach_set(prop, np.ascontiguousarray(values).ravel())
+
+    mesh.update(calc_edges=True)
+    edge_attributes = [attr for attr in attributes if attr[2] == 'EDGE']
+    if edge_attributes:
+        edge_index = _match_edges(mesh, edges)
+        for attr_name, data_type, domain, prop, values in edge_attributes:
+            values = values[np.maximum(edge_index, 0)]
+            values[edge_index < 0] = 0   # edge without source (not expected, polygons only use existing edges)
+            target = mesh.attributes.get(attr_name) or mesh.attributes.new(attr_name, data_type, domain)
+            target.data.foreach_set(prop, np.ascontiguousarray(values).ravel())
+
+    mesh.validate()
+    if normals is not None and len(normals) == len(mesh.loops):
+        mesh.normals_split_custom_set(np.ascontiguousarray(normals, dtype=np.float32))
+    return mesh
+
+
+def build_chunk_mesh(buffers: dict, materials, polys, name: str):
+    """ New mesh from a subset of the polygons (vertices, corners, faces and their attributes) """
+    loop_total = buffers['loop_total'][polys]
+    loops = _polygon_loops(buffers['loop_start'][polys], loop_total)
+    verts, corners = np.unique(buffers['corners'][loops], return_inverse=True)
+
+    # source edges between chunk vertices, in chunk vertex indices
+    remap = np.full(len(buffers['co']), -1, dtype=np.int32)
+    remap[verts] = np.arange(len(verts), dtype=np.int32)
+    edges = remap[buffers['edges']]
+    inside = (edges >= 0).all(axis=1)
+
+    selection = {'POINT': verts, 'EDGE': inside, 'CORNER': loops, 'FACE': polys}
+    attributes = [(attr_name, data_type, domain, prop, values[selection[domain]]) for attr_name, data_type, domain, prop, values in buffers['attributes']]
+    return build_mesh(name, buffers['co'][verts], corners, loop_total, attributes, materials, edges[inside], buffers['normals'][loops])
+
+
+def split_object(obj: bpy.types.Object, limit: int, depsgraph: bpy.types.Depsgraph):
+    """
+    Split the evaluated mesh of obj (modifiers applied) into chunk objects named <name>_001, ...
+    The chunks keep the transform and collections of obj, obj itself is not changed.
+    Returns the new objects, an empty list if obj is within the limit.
+    """
+    source = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+    chunks = []
+    try:
+        if len(source.polygons) == 0 or get_corner_vertex_ids(source)[1] <= limit:
+            return []
+
+        buffers = read_mesh_buffers(source)
+        for i, polys in enumerate(split_polygons(buffers, limit), start=1):
+            name = f"{obj.name}_{i:03d}"
+            chunk = bpy.data.objects.new(name, build_chunk_mesh(buffers, source.materials, polys, name))
+            chunks.append(chunk)
+            chunk.matrix_world = obj.matrix_world
+            for coll in obj.users_collection:
+                coll.objects.link(chunk)
+        return chunks
+    except BaseException:
+        remove_objects(chunks)
+        raise
+    finally:
+        bpy.data.meshes.remove(source)
+
+
+def split_for_export(context: bpy.types.Context, limit: int):
+    """
+    Non-destructive split before the FBX export: originals over the limit are unlinked
+    and replaced by chunks, their children are parented to the first chunk meanwhile.
+    Undo it with restore_after_export(state) (in a finally block), which also brings back
+    the selection and active state unlinking takes from the originals.
+    If splitting fails, the objects split so far are restored before the error is raised.
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    use_selection = get_properties(context).exp_use_sel
+    view_layer = context.view_layer
+    state = []  # (original, collections, chunks, children, (selected, active))
+    try:
+        for obj in get_export_objects(context):
+            chunks = split_object(obj, limit, depsgraph)
+            if not chunks:
+                continue
+            collections = list(obj.users_collection)
+            children = [(child, child.matrix_parent_inverse.copy()) for child in obj.children]
+            state.append((obj, collections, chunks, children, (obj.select_get(view_layer=view_layer), view_layer.objects.active == obj)))
+            for child, _ in children:
+                child.parent = chunks[0]
+            for coll in collections:
+                coll.objects.unlink(obj)
+            if use_selection:
+                for chunk in chunks:
+                    chunk.select_set(True, view_layer=view_layer)
+    except BaseException:
+        restore_after_export(state)
+        raise
+    return state
+
+
+def remove_objects(objects: list):
+    """ Delete objects together with their (then unused) meshes """
+    for obj in objects:
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        if mesh and mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+
+
+def restore_after_export(state: list):
+    view_layer = bpy.context.view_layer
+    for obj, collections, chunks, children, (selected, active) in state:
+        for child, parent_inverse in children:
+            child.parent = obj
+            child.matrix_parent_inverse = parent_inverse
+        remove_objects(chunks)
+        for coll in collections:
+            if obj.name not in coll.objects:
+                coll.objects.link(obj)
+        if obj.name in view_layer.objects:
+            obj.select_set(selected, view_layer=view_layer)
+            if active:
+                view_layer.objects.active = obj
+
+
+def get_merged_collection(context: bpy.types.Context):
+    """ Collection holding the originals of merged objects (excluded from the view layer, so not exported) """
+    collection = bpy.data.collections.get(AC_MERGED_COLLECTION_NAME)
+    if collection is None:
+        collection = bpy.data.collections.new(AC_MERGED_COLLECTION_NAME)
+        collection.hide_render = True
+    if collection.name not in context.scene.collection.children:
+        context.scene.collection.children.link(collection)
+    layer_collection = context.view_layer.layer_collection.children.get(collection.name)
+    if layer_collection:
+        layer_collection.exclude = True
+    return collection
+
+
+def group_merge_candidates(objects, max_vertices: int, cell_size: float):
+    """
+    Small mesh objects grouped by (AC prefix, materials, grid cell of the origin).
+    Objects with negative scale (flipped faces) are left alone.
+    """
+    match_prefix = ac_materials.get_prefix_matcher().match
+    groups = {}
+    for obj in objects:
+        if obj.type != 'MESH' or obj.name.startswith('AC_') or 'ac_merged_sources' in obj:
+            continue
+        if len(obj.data.vertices) > max_vertices or obj.matrix_world.determinant() <= 0:
+            continue
+        m = match_prefix(obj.name)
+        location = obj.matrix_world.translation
+        key = (
+            m.group(0) if m else "",
+            tuple(slot.material.name if slot.material else "" for slot in obj.material_slots),
+            math.floor(location.x / cell_size),
+            math.floor(location.y / cell_size),
+        )
+        groups.setdefault(key, []).append(obj)
+    return {key: objs for key, objs in groups.items() if len(objs) > 1}
+
+
+def read_world_buffers(obj: bpy.types.Object, depsgraph: bpy.types.Depsgraph):
+    """ Buffers of the evaluated mesh of obj with vertices in world space """
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+    try:
+        buffers = read_mesh_buffers(mesh)
+        buffers['co'] = to_world(buffers['co'], obj.matrix_world)
+        buffers['normals'] = to_world_normals(buffers['normals'], obj.matrix_world)
+        buffers['vertex_count'] = int(buffers['ids'].max()) + 1 if len(buffers['ids']) else 0
+        # the active uv map is merged by role, not by name
+        uv_layer = mesh.uv_layers.active
+        buffers['active_uv'] = uv_layer.name if uv_layer else None
+        return buffers
+    finally:
+        eval_obj.to_mesh_clear()
+
+
+def get_merge_conflict(layouts: dict, buffers: dict):
+    """
+    Why the buffers can't be merged with the ones whose attribute layouts ({name: (data type, domain)},
+    active uv map as None) were collected so far, None if they can (their attributes are added then)
+    """
+    if buffers['dropped']:
+        return f"attribute '{buffers['dropped'][0]}' can't be merged"
+    own = {(None if attr_name == buffers['active_uv'] else attr_name): (data_type, domain) for attr_name, data_type, domain, _, _ in buffers['attributes']}
+    for key, layout in own.items():
+        if layouts.get(key, layout) != layout:
+            return f"attribute '{key or buffers['active_uv']}' differs in type or domain"
+    layouts.update(own)
+    return None
+
+
+def merge_buffers(parts: list):
+    """ Concatenate mesh buffers into (co, corners, loop_total, attributes, edges, normals), missing attributes are zero filled """
+    uv_name = next((part['active_uv'] for part in parts if part['active_uv']), None)
+    layouts = {}    # attribute name -> (data type, domain, foreach property, element shape, dtype)
+    for part in parts:
+        for attr_name, data_type, domain, prop, values in part['attributes']:
+            if attr_name == part['active_uv']:
+                attr_name = uv_name
+            layouts.setdefault(attr_name, (data_type, domain, prop, values.shape[1:], values.dtype))
+
+    co, corners, loop_total, edges, normals = [], [], [], [], []
+    attributes = {attr_name: [] for attr_name in layouts}
+    offset = 0
+    for part in parts:
+        co.append(part['co'])
+        corners.append(part['corners'] + offset)
+        loop_total.append(part['loop_total'])
+        edges.append(part['edges'] + offset)
+        normals.append(part['normals'])
+        offset += len(part['co'])
+
+        sizes = {'POINT': len(part['co']), 'EDGE': len(part['edges']), 'CORNER': len(part['corners']), 'FACE': len(part['loop_total'])}
+        values_of = {(uv_name if attr_name == part['active_uv'] else attr_name): values for attr_name, _, _, _, values in part['attributes']}
+        for attr_name, (data_type, domain, prop, shape, dtype) in layouts.items():
+            values = values_of.get(attr_name)
+            if values is None or values.shape[1:] != shape or domain not in sizes:
+                values = np.zeros((sizes[domain],) + shape, dtype=dtype)
+            attributes[attr_name].append(values)
+
+    return (
+        np.concatenate(co),
+        np.concatenate(corners),
+        np.concatenate(loop_total),
+        [(attr_name, data_type, domain, prop, np.concatenate(attributes[attr_name])) for attr_name, (data_type, domain, prop, _, _) in layouts.items()],
+        np.concatenate(edges),
+        np.concatenate(normals),
+    )
+
+
+def merge_group(context: bpy.types.Context, key: tuple, objects: list, limit: int, depsgraph: bpy.types.Depsgraph):
+    """
+    Merge objects of one group into as few meshes as the vertex limit allows.
+    Originals are moved to the merged collection, their collections are kept in 'ac_merged_from'.
+    Objects with data the merged mesh can't keep (see get_merge_conflict) are left alone.
+    Returns (merged objects, [(skipped object, reason)]).
+    """
+    prefix, material_names, cx, cy = key
+    base_name = f"{prefix}.merged_{cx}_{cy}" if prefix else f"merged_{cx}_{cy}"
+    if material_names and material_names[0]:
+        base_name += f"_{material_names[0]}"
+    target = objects[0].users_collection[0] if objects[0].users_collection else context.scene.collection
+    hidden = get_merged_collection(context)
+
+    # batches under the vertex limit (in object order)
+    batches, batch, count = [], [], 0
+    layouts = {}
+    skipped = []
+    for obj in objects:
+        buffers = read_world_buffers(obj, depsgraph)
+        if len(buffers['loop_total']) == 0:
+            continue
+        reason = get_merge_conflict(layouts, buffers)
+        if reason:
+            skipped.append((obj, reason))
+            continue
+        if batch and count + buffers['vertex_count'] > limit:
+            batches.append(batch)
+            batch, count = [], 0
+        batch.append((obj, buffers))
+        count += buffers['vertex_count']
+    if batch:
+        batches.append(batch)
+
+    merged = []
+    for i, batch in enumerate(batches, start=1):
+        if len(batch) < 2:
+            continue
+        name = f"{base_name}_{i:03d}"
+        co, corners, loop_total, attributes, edges, normals = merge_buffers([buffers for _, buffers in batch])
+        mesh = build_mesh(name, co, corners, loop_total, attributes, [slot.material for slot in batch[0][0].material_slots], edges, normals)
+        merged_obj = bpy.data.objects.new(name, mesh)
+        target.objects.link(merged_obj)
+        merged_obj['ac_merged_sources'] = [obj.name for obj, _ in batch]
+
+        for obj, _ in batch:
+            obj['ac_merged_from'] = [coll.name for coll in obj.users_collection if coll != context.scene.collection]
+            for coll in list(obj.users_collection):
+                coll.objects.unlink(obj)
+            hidden.objects.link(obj)
+        merged.append(merged_obj)
+    return merged, skipped
+
+
+def restore_merged(scene: bpy.types.Scene, merged_obj: bpy.types.Object):
+    """ Move the originals of a merged object back to their collections and delete it. Returns the restored count """
+    hidden = bpy.data.collections.get(AC_MERGED_COLLECTION_NAME)
+    restored = 0
+    for name in merged_obj.get('ac_merged_sources', []):
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            continue
+        # scene master collection (or a deleted one) -> scene collection
+        collections = [bpy.data.collections.get(coll_name) for coll_name in obj.get('ac_merged_from', [])]
+        for coll in [coll for coll in collections if coll] or [scene.collection]:
+            if obj.name not in coll.objects:
+                coll.objects.link(obj)
+        if hidden and obj.name in hidden.objects:
+            hidden.objects.unlink(obj)
+        if 'ac_merged_from' in obj:
+            del obj['ac_merged_from']
+        restored += 1
+
+    mesh = merged_obj.data
+    bpy.data.objects.remove(merged_obj)
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+    return restored
+
+
+# OPERATOR #
+
+class OPTIMIZE_OT_split_meshes(bpy.types.Operator):
+    bl_idname = "ac_tools.split_meshes"
+    bl_label = "Split Large Meshes"
+    bl_description = "Replace meshes over the vertex limit by spatial chunks (<name>_001, ...) with modifiers applied"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        props = get_properties(context)
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH'] or get_export_objects(context)
+        depsgraph = context.evaluated_depsgraph_get()
+
+        split = 0
+        created = 0
+        for obj in objects:
+            chunks = split_object(obj, props.split_vertex_limit, depsgraph)
+            if not chunks:
+                continue
+            mesh = obj.data
+            bpy.data.objects.remove(obj)
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+            split += 1
+            created += len(chunks)
+
+        self.report({'INFO'}, f"Split {split} mesh(es) into {created} chunks" if split else f"No mesh over {props.split_vertex_limit} vertices")
+        return {'FINISHED'}
+
+
+class OPTIMIZE_OT_merge_objects(bpy.types.Operator):
+    bl_idname = "ac_tools.merge_objects"
+    bl_label = "Merge Small Objects"
+    bl_description = "Merge small objects with the same AC surface and materials per grid cell to reduce draw calls (originals are kept hidden)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        props = get_properties(context)
+        objects = context.selected_objects or get_export_objects(context)
+        groups = group_merge_candidates(objects, props.merge_max_vertices, props.merge_cell_size)
+        depsgraph = context.evaluated_depsgraph_get()
+
+        merged = 0
+        sources = 0
+        for key, group in sorted(groups.items()):
+            merged_objs, skipped = merge_group(context, key, group, props.split_vertex_limit, depsgraph)
+            for merged_obj in merged_objs:
+                merged += 1
+                sources += len(merged_obj['ac_merged_sources'])
+            for obj, reason in skipped:
+                self.report({'WARNING'}, f"'{obj.name}' not merged: {reason}")
+
+        self.report({'INFO'}, f"Merged {sources} objects into {merged}" if merged else "Nothing to merge")
+        return {'FINISHED'}
+
+
+class OPTIMIZE_OT_restore_merged(bpy.types.Operator):
+    bl_idname = "ac_tools.restore_merged"
+    bl_label = "Restore Merged Objects"
+    bl_description = "Delete the selected merged objects (all if none selected) and bring back their originals"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        objects = [obj for obj in context.selected_objects if 'ac_merged_sources' in obj]
+        if not objects:
+            objects = [obj for obj in context.scene.objects if 'ac_merged_sources' in obj]
+
+        restored = sum(restore_merged(context.scene, obj) for obj in objects)
+
+        self.report({'INFO'}, f"Restored {restored} objects from {len(objects)} merged object(s)")
+        return {'FINISHED'}
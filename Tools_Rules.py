@@ -0,0 +1,207 @@
+import bpy
+import os
+import re
+import fnmatch
+
+from .Properties import FILE_SURFACES, FILE_SURFACE_RULES
+from .Functions import TrackFolder, get_file_stamp, get_properties, get_template, open_file_in_scripting, read_json, write_json
+from .Tools_Materials import apply_renames, ensure_materials, load_materials, materials, plan_add_prefix
+
+# Rule based surface classification
+# surface_rules.json (next to surfaces.ini):
+#   {"rules": [{"match": "material" | "collection" | "object", "pattern": "<glob>", "regex": false, "surface": "<key>"}, ...]}
+# First matching rule wins, patterns (glob and regex) are case insensitive.
+
+MATCH_TARGETS = ('material', 'collection', 'object')
+
+# result of the last preview {surface: count} (shown in UI_Materials)
+last_preview = {}
+
+
+"""
+CLASS RuleSet()
+Compiled rules of surface_rules.json, cached per file stamp.
+Matching results are memoized per unique material/collection/object name.
+"""
+class RuleSet():
+
+    def __init__(self, rules: list):
+        self.rules = []     # [(target, compiled pattern, surface)]
+        self.errors = []
+        for i, rule in enumerate(rules):
+            try:
+                target = rule.get('match', 'material')
+                if target not in MATCH_TARGETS:
+                    raise ValueError(f"unknown match '{target}'")
+                pattern = rule['pattern']
+                if not rule.get('regex', False):
+                    pattern = fnmatch.translate(pattern)
+                self.rules.append((target, re.compile(pattern, re.IGNORECASE), rule['surface'].lower()))
+            except (KeyError, ValueError, AttributeError, re.error) as e:
+                self.errors.append(f"Rule {i}: {e}")
+
+        self.targets = {target for target, _, _ in self.rules}
+        self._memo = {}     # (target, name) -> index of first matching rule
+
+    def first_match(self, target: str, name: str):
+        key = (target, name)
+        idx = self._memo.get(key)
+        if idx is None:
+            idx = len(self.rules)
+            for i, (rule_target, pattern, _) in enumerate(self.rules):
+                if rule_target == target and pattern.match(name):
+                    idx = i
+                    break
+            self._memo[key] = idx
+        return idx
+
+    def classify(self, obj_name: str, material_names, collection_names):
+        best = len(self.rules)
+        if 'object' in self.targets:
+            best = self.first_match('object', obj_name)
+        if 'material' in self.targets:
+            for name in material_names:
+                best = min(best, self.first_match('material', name))
+        if 'collection' in self.targets:
+            for name in collection_names:
+                best = min(best, self.first_match('collection', name))
+        return self.rules[best][2] if best < len(self.rules) else None
+"""
+END CLASS
+"""
+
+_rule_cache = {'stamp': None, 'rules': None}
+
+def get_rules_path(tf: TrackFolder):
+    surfaces_file = tf.get_ac_file_path(FILE_SURFACES)
+    if not surfaces_file:
+        return None
+    return os.path.join(os.path.dirname(surfaces_file), FILE_SURFACE_RULES)
+
+
+def load_rules(path: str):
+    stamp = get_file_stamp(path)
+    if stamp is None:
+        return None
+    if stamp != _rule_cache['stamp']:
+        data = read_json(path)
+        if isinstance(data, dict) and isinstance(data.get('rules', []), list):
+            rules = RuleSet(data.get('rules', []))
+        else:
+            rules = RuleSet([])
+            if data is None:
+                rules.errors.append(f"{FILE_SURFACE_RULES}: invalid JSON")
+            else:
+                rules.errors.append(f"{FILE_SURFACE_RULES}: expected {{\"rules\": [...]}} at the top level")
+        _rule_cache['rules'] = rules
+        _rule_cache['stamp'] = stamp
+    return _rule_cache['rules']
+
+
+def classify_scene(scene: bpy.types.Scene, rules: RuleSet):
+    """ One pass over all untagged mesh objects. Returns {surface: [objects]} """
+    collections_of = {}
+    if 'collection' in rules.targets:
+        for coll in bpy.data.collections:
+            for obj in coll.objects:
+                collections_of.setdefault(obj.name, []).append(coll.name)
+
+    match_prefix = materials.get_prefix_matcher().match
+    result = {}
+    for obj in scene.objects:
+        if obj.type != 'MESH' or obj.name.startswith('AC_') or match_prefix(obj.name):
+            continue
+        material_names = [slot.material.name for slot in obj.material_slots if slot.material] if 'material' in rules.targets else ()
+        surface = rules.classify(obj.name, material_names, collections_of.get(obj.name, ()))
+        if surface:
+            result.setdefault(surface, []).append(obj)
+    return result
+
+
+def classify_with_rules(self, context: bpy.types.Context, reload: bool = False):
+    """
+    Load the rules and classify the scene, reporting rule errors on the operator. Returns {surface: [objects]} or None
+    reload re-reads the surfaces into the scene - only from operators with an undo step
+    """
+    tf = TrackFolder(get_properties(context).track_folder)
+    path = get_rules_path(tf)
+    rules = load_rules(path) if path else None
+    if not rules:
+        self.report({'INFO'}, f"Cannot locate '{FILE_SURFACE_RULES}'")
+        return None
+    for error in rules.errors:
+        self.report({'WARNING'}, error)
+    if not rules.rules:
+        self.report({'ERROR'}, f"No valid rules in '{FILE_SURFACE_RULES}'")
+        return None
+
+    if reload:
+        load_materials(context)
+    else:
+        ensure_materials(context)
+    result = classify_scene(context.scene, rules)
+
+    invalid = [surface for surface in result if not materials.get(surface)]
+    for surface in invalid:
+        self.report({'WARNING'}, f"Unknown surface '{surface}' in {FILE_SURFACE_RULES} ({len(result.pop(surface))} objects skipped)")
+    return result
+
+
+# OPERATOR #
+
+# Preview and apply are separate operators: bl_options can't depend on a property,
+# and a preview must not push an undo step.
+class PreviewSurfaceRules(bpy.types.Operator):
+    bl_idname = "ac_tools.preview_surface_rules"
+    bl_label = "Preview Surface Rules"
+    bl_description = "Count the untagged mesh objects per surface the rules of surface_rules.json would apply, without renaming anything"
+
+    def execute(self, context):
+        result = classify_with_rules(self, context)
+        if result is None:
+            return {'CANCELLED'}
+
+        last_preview.clear()
+        last_preview.update({surface: len(objs) for surface, objs in result.items()})
+        self.report({'INFO'}, f"Preview: {sum(last_preview.values())} object(s) would be tagged")
+        return {'FINISHED'}
+
+
+class AutoTagSurfaces(bpy.types.Operator):
+    bl_idname = "ac_tools.auto_tag_surfaces"
+    bl_label = "Auto-Tag Surfaces"
+    bl_description = "Apply AC surfaces to untagged mesh objects using the rules of surface_rules.json"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        result = classify_with_rules(self, context, reload=True)
+        if result is None:
+            return {'CANCELLED'}
+
+        plan = []
+        for surface, objs in result.items():
+            plan.extend(plan_add_prefix(objs, materials.get_prefix(surface))[0])
+        renamed = apply_renames(plan)
+        last_preview.clear()
+
+        self.report({'INFO'}, f"Tagged {renamed} object(s) with {len(result)} surface(s)")
+        return {'FINISHED'}
+
+
+class EditSurfaceRules(bpy.types.Operator):
+    bl_idname = "ac_tools.edit_surface_rules"
+    bl_label = "Edit Surface Rules"
+    bl_description = "Edit rules for automatic surface tagging (created from template if missing)"
+
+    def execute(self, context):
+        path = get_rules_path(TrackFolder(get_properties(context).track_folder))
+        if not path:
+            self.report({'INFO'}, f"Cannot locate '{FILE_SURFACES}'")
+            return {'FINISHED'}
+
+        if not os.path.exists(path):
+            write_json(read_json(get_template(FILE_SURFACE_RULES)), path)
+
+        open_file_in_scripting(self, context, path)
+
+        return {'FINISHED'}
@@ -0,0 +1,790 @@
+import bpy
+import os
+import struct
+import numpy as np
+from mathutils import Vector, kdtree
+
+from .Properties import AC_OBJ_PREFIX, FILE_MAP_INI, FILE_UI_TRACK
+from .Functions import TrackFolder, get_properties, get_template, read_config, read_json, write_config, write_json, write_png
+from .Functions_Mesh import get_bvh, get_evaluated_triangles, to_world
+from .Tools_Materials import materials
+from .Tools_Objects import ACObjectRegistry
+
+# Track geometry from the road meshes (1ROAD objects): centerline, AI splines, map
+
+CENTERLINE_NAME = "AC_CENTERLINE"
+WELD_TOLERANCE = 0.01   # vertices closer than this are merged (road split into several objects)
+EDGE_SPACING = 0.25     # resolution of the resampled road edges
+SMOOTH_WINDOW = 5       # samples of the moving average over the raw centerline
+MAX_ROAD_WIDTH = 50.0   # paired edge points further apart than this are not inner / outer edge of one road
+
+
+"""
+CLASS Centerline()
+Closed centerline of the road: evenly spaced world space points (n, 3) and the road width at each point.
+"""
+class Centerline():
+
+    def __init__(self, points, widths):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.widths = np.asarray(widths, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def segment_lengths(self):
+        """ Length from each point to the next one (closed) """
+        return np.linalg.norm(np.roll(self.points, -1, axis=0) - self.points, axis=1)
+
+    @property
+    def length(self):
+        return float(self.segment_lengths.sum())
+
+    @property
+    def width(self):
+        """ Average width (weighted by length) """
+        return float(np.average(self.widths, weights=self.segment_lengths))
+
+    @property
+    def tangents(self):
+        """ Normalized driving direction at each point (central differences) """
+        d = np.roll(self.points, -1, axis=0) - np.roll(self.points, 1, axis=0)
+        return d / np.maximum(np.linalg.norm(d, axis=1, keepdims=True), 1e-9)
+"""
+END CLASS
+"""
+
+
+def get_road_objects(scene: bpy.types.Scene):
+    prefix = materials.get_prefix('road')
+    return [obj for obj in scene.objects if obj.type == 'MESH' and obj.name.startswith(prefix)]
+
+
+def collect_triangles(objects: list, depsgraph: bpy.types.Depsgraph):
+    """ World space vertices and triangles of all objects in one buffer """
+    verts, tris, offset = [], [], 0
+    for obj in objects:
+        v, t = get_evaluated_triangles(obj, depsgraph)
+        verts.append(v)
+        tris.append(t + offset)
+        offset += len(v)
+    if not verts:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+    return np.concatenate(verts), np.concatenate(tris).astype(np.int64)
+
+
+def weld(verts, tris, tolerance: float = WELD_TOLERANCE):
+    """ Merge vertices on a grid of tolerance (joins separate road objects), degenerate triangles are dropped """
+    q = np.ascontiguousarray(np.round(verts / tolerance).astype(np.int64))
+    _, first, inverse = np.unique(q.view(np.dtype((np.void, 24))).ravel(), return_index=True, return_inverse=True)
+    tris = inverse.ravel()[tris]
+    valid = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 2] != tris[:, 0])
+    return verts[first], tris[valid]
+
+
+def get_boundary_loops(tris, vertex_count: int):
+    """
+    Closed loops of boundary edges (edges used by a single triangle), most vertices first.
+    Loops are walked without the edge direction, so flipped triangles don't break them.
+    Returns (loops, defects): defects = boundary vertices without exactly two boundary edges
+    (open ends of holes / gaps, or junctions), loops through them are dropped.
+    """
+    edges = tris[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    keys = np.minimum(edges[:, 0], edges[:, 1]) * vertex_count + np.maximum(edges[:, 0], edges[:, 1])
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    boundary = edges[counts[inverse.ravel()] == 1]
+
+    neighbors = {}
+    for a, b in boundary.tolist():
+        neighbors.setdefault(a, []).append(b)
+        neighbors.setdefault(b, []).append(a)
+    defects = sum(len(n) != 2 for n in neighbors.values())
+
+    loops = []
+    visited = set()
+    for start, ends in neighbors.items():
+        if len(ends) != 2 or start in visited:
+            continue
+        loop = [start]
+        visited.add(start)
+        prev, v = start, ends[0]
+        while v != start and v not in visited and len(neighbors[v]) == 2:
+            visited.add(v)
+            loop.append(v)
+            a, b = neighbors[v]
+            prev, v = v, (b if a == prev else a)
+        if v == start and len(loop) > 2:
+            loops.append(loop)
+    return sorted(loops, key=len, reverse=True), defects
+
+
+def resample(points, spacing: float = None, count: int = None, closed: bool = True):
+    """ Evenly spaced points along a polyline (by spacing or count), the distance is measured on the first 3 columns """
+    line = np.vstack((points, points[:1])) if closed else points
+    distance = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(line[:, :3], axis=0), axis=1))))
+    if count is None:
+        count = max(3, int(round(distance[-1] / spacing)) + (0 if closed else 1))
+    targets = np.linspace(0.0, distance[-1], count, endpoint=not closed)
+    return np.stack([np.interp(targets, distance, line[:, i]) for i in range(points.shape[1])], axis=1)
+
+
+def _smooth(values, window: int):
+    """ Circular moving average """
+    if window < 2 or len(values) <= window:
+        return values
+    kernel = np.ones(window) / window
+    pad = window // 2
+    padded = np.concatenate((values[-pad:], values, values[:pad]))
+    if values.ndim == 1:
+        return np.convolve(padded, kernel, mode='valid')[:len(values)]
+    return np.stack([np.convolve(padded[:, i], kernel, mode='valid')[:len(values)] for i in range(values.shape[1])], axis=1)
+
+
+def _nearest(points, targets):
+    """ Index of the nearest target for every point (KD-tree) """
+    kd = kdtree.KDTree(len(targets))
+    for i, co in enumerate(targets.tolist()):
+        kd.insert(co, i)
+    kd.balance()
+    return np.fromiter((kd.find(co)[1] for co in points.tolist()), dtype=np.int64, count=len(points))
+
+
+def extract_centerline(objects: list, depsgraph: bpy.types.Depsgraph, spacing: float = 2.0):
+    """
+    Centerline of a closed road from its two longest boundary loops (outer and inner edge):
+    every point of one edge is paired with the nearest point of the other, the midpoints
+    are smoothed and resampled to spacing.
+    Raises ValueError with the reason if the road has no such pair of edges.
+    """
+    verts, tris = collect_triangles(objects, depsgraph)
+    if len(tris) == 0:
+        raise ValueError("Road objects have no faces")
+    verts, tris = weld(verts, tris)
+    loops, defects = get_boundary_loops(tris, len(verts))
+    hint = f" ({defects} road edge vertices are open ends or junctions: holes, gaps over {WELD_TOLERANCE} m or T-junctions)" if defects else ""
+    if not loops:
+        raise ValueError("Road has no closed edge" + hint)
+    if len(loops) < 2:
+        raise ValueError("Road has only one closed edge, inner and outer edge are connected or the road is not a loop" + hint)
+
+    def perimeter(loop):
+        co = verts[loop]
+        return float(np.linalg.norm(co - np.roll(co, 1, axis=0), axis=1).sum())
+    loops.sort(key=perimeter, reverse=True)
+
+    edge_a = resample(verts[loops[0]], EDGE_SPACING)
+    edge_b = resample(verts[loops[1]], EDGE_SPACING)
+    nearest = _nearest(edge_a, edge_b)
+
+    # both edges must follow each other: a pit lane or run-off in the road mesh pulls one edge away
+    widths = np.linalg.norm(edge_a - edge_b[nearest], axis=1)
+    back = np.linalg.norm(edge_b - edge_a[_nearest(edge_b, edge_a)], axis=1)
+    gap = max(float(np.percentile(widths, 95)), float(np.percentile(back, 95)))
+    if gap > MAX_ROAD_WIDTH:
+        raise ValueError(f"Inner and outer edge are up to {gap:.0f} m apart (max {MAX_ROAD_WIDTH:.0f} m): pit lane, run-off or a second road in the road objects?")
+
+    center = _smooth((edge_a + edge_b[nearest]) / 2, SMOOTH_WINDOW)
+
+    # resample center and width together
+    samples = resample(np.column_stack((center, widths)), spacing)
+    return Centerline(samples[:, :3], _smooth(samples[:, 3], SMOOTH_WINDOW))
+
+
+def create_centerline_curve(context: bpy.types.Context, centerline: Centerline):
+    """ Poly spline CENTERLINE_NAME (radius = half road width), replaced if it exists """
+    old = bpy.data.objects.get(CENTERLINE_NAME)
+    if old:
+        old_curve = old.data
+        bpy.data.objects.remove(old)
+        if old_curve and old_curve.users == 0:
+            bpy.data.curves.remove(old_curve)
+
+    curve = bpy.data.curves.new(CENTERLINE_NAME, 'CURVE')
+    curve.dimensions = '3D'
+    spline = curve.splines.new('POLY')
+    spline.points.add(len(centerline) - 1)
+    spline.points.foreach_set('co', np.column_stack((centerline.points, np.ones(len(centerline)))).astype(np.float32).ravel())
+    spline.points.foreach_set('radius', (centerline.widths / 2).astype(np.float32))
+    spline.use_cyclic_u = True
+
+    obj = bpy.data.objects.new(CENTERLINE_NAME, curve)
+    context.scene.collection.objects.link(obj)
+    return obj
+
+
+def write_track_dimensions(path: str, centerline: Centerline):
+    """ Length and average width (meters) into ui_track.json """
+    data = read_json(path)
+    if not isinstance(data, dict):
+        return False
+    data['length'] = f"{centerline.length:.0f}"
+    data['width'] = f"{centerline.width:.1f}"
+    write_json(data, path)
+    return True
+
+
+def read_curve_points(name: str):
+    """ World space points (n, 3) and radii (n,) of the first poly spline of curve object name, None if missing """
+    obj = bpy.data.objects.get(name)
+    if not obj or obj.type != 'CURVE' or not obj.data.splines or len(obj.data.splines[0].points) < 2:
+        return None
+    points = obj.data.splines[0].points
+    co = np.empty(len(points) * 4, dtype=np.float32)
+    points.foreach_get('co', co)
+    radius = np.empty(len(points), dtype=np.float32)
+    points.foreach_get('radius', radius)
+    return to_world(co.reshape(-1, 4)[:, :3].astype(np.float64), obj.matrix_world), radius.astype(np.float64)
+
+
+def get_ac_forward(obj: bpy.types.Object):
+    """ Horizontal driving direction an AC object faces: local -Z ('z front' markers, see new_ac_object) """
+    z = obj.matrix_world.to_3x3() @ Vector((0.0, 0.0, 1.0))
+    forward = np.array((-z.x, -z.y, 0.0))
+    length = np.linalg.norm(forward)
+    return forward / length if length > 1e-6 else None
+
+
+def get_start_reference(scene: bpy.types.Scene):
+    """
+    (start line position, driving direction) from the AC objects, None for what is missing:
+    position = center of the AC_TIME_0 gate (else the first start position),
+    direction = the way the first AC_START (else AC_HOTLAP_START) object faces.
+    """
+    starts = {}     # prefix -> [(number, obj)]
+    gate = []
+    for obj in scene.objects:
+        prefix, number = ACObjectRegistry.parse(obj.name)
+        if prefix in (AC_OBJ_PREFIX['START'], AC_OBJ_PREFIX['HOTLAP']) and number is not None:
+            starts.setdefault(prefix, []).append((number, obj))
+        elif prefix == AC_OBJ_PREFIX['TIME'] and number == 0:
+            gate.append(obj)
+
+    candidates = starts.get(AC_OBJ_PREFIX['START']) or starts.get(AC_OBJ_PREFIX['HOTLAP'])
+    grid = min(candidates, key=lambda item: item[0])[1] if candidates else None
+    if gate:
+        position = np.mean([obj.matrix_world.translation[:] for obj in gate], axis=0)
+    else:
+        position = np.array(grid.matrix_world.translation[:]) if grid else None
+    return position, get_ac_forward(grid) if grid else None
+
+
+def parse_run(run):
+    """ 'run' of ui_track.json -> True (clockwise), False (counter / anti clockwise) or None """
+    value = str(run or "").lower().replace('-', '').replace(' ', '')
+    if value == 'clockwise':
+        return True
+    if value in ('counterclockwise', 'anticlockwise'):
+        return False
+    return None
+
+
+def orient_centerline(centerline: Centerline, start=None, forward=None, clockwise: bool = None):
+    """
+    Closed centerline in driving direction, starting at the point nearest to start (the start/finish line).
+    The direction comes from forward (driving direction at the start), else from clockwise
+    (seen from above), else it is kept.
+    """
+    points, widths = centerline.points, centerline.widths
+    first = int(np.argmin(np.linalg.norm(points - start, axis=1))) if start is not None else 0
+    if forward is not None:
+        reverse = float(np.dot(centerline.tangents[first], forward)) < 0
+    elif clockwise is not None:
+        x, y = points[:, 0], points[:, 1]
+        area = 0.5 * float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)) # < 0: clockwise
+        reverse = (area < 0) != clockwise
+    else:
+        reverse = False
+
+    if reverse:
+        points, widths = points[::-1], widths[::-1]
+        first = len(points) - 1 - first
+    return Centerline(np.roll(points, -first, axis=0), np.roll(widths, -first))
+
+
+def orient_to_track(context: bpy.types.Context, centerline: Centerline):
+    """
+    orient_centerline with the AC objects of the scene and 'run' of ui_track.json.
+    Returns (centerline, direction source or None if the direction is unknown)
+    """
+    start, forward = get_start_reference(context.scene)
+    clockwise = None
+    if forward is None:
+        path = TrackFolder(get_properties(context).track_folder).get_ac_file_path(FILE_UI_TRACK)
+        data = read_json(path) if path else None
+        clockwise = parse_run(data.get('run')) if isinstance(data, dict) else None
+
+    source = f"{AC_OBJ_PREFIX['START']} objects" if forward is not None else f"'run' in {FILE_UI_TRACK}" if clockwise is not None else None
+    return orient_centerline(centerline, start, forward, clockwise), source
+
+
+def get_centerline(context: bpy.types.Context, spacing: float):
+    """
+    Centerline from the CENTERLINE_NAME curve (may be edited by hand), extracted from the road if missing.
+    None without road objects, ValueError if the road edges can't be paired (see extract_centerline).
+    """
+    curve = read_curve_points(CENTERLINE_NAME)
+    if curve is not None and len(curve[0]) > 2:
+        world, radius = curve
+        samples = resample(np.column_stack((world, radius * 2)), spacing)
+        return Centerline(samples[:, :3], samples[:, 3])
+
+    objects = get_road_objects(context.scene)
+    return extract_centerline(objects, context.evaluated_depsgraph_get(), spacing) if objects else None
+
+
+# AI SPLINES (ai/fast_lane.ai, ai/pit_lane.ai)
+#
+# little endian, AC coordinates (x, z, -y):
+#   int32 version (7), int32 count, int32 lap time, int32 sample count
+#   count * (float32[3] position, float32 length, int32 id)
+#   int32 extra count, extra count * float32[18] (see AI_EXTRA_FIELDS)
+#   rest (grid data, int32 0 if none) is kept as is by read/write
+
+AI_VERSION = 7
+AI_SPACING = 1.0        # distance between AI points
+PIT_LANE_WIDTH = 6.0
+PIT_LANE_MARGIN = 50.0  # pit lane leaves / joins the fast lane this far before the first / after the last pit
+PIT_LANE_NAME = "AC_PITLANE"    # optional open curve drawn along the pit road
+PIT_LANE_OFFSET = 8.0   # without PIT_LANE_NAME the AC_PIT positions are moved this far towards the track
+AI_EXTRA_FIELDS = (
+    'speed', 'gas', 'brake', 'obsolete_lat_g', 'radius', 'side_left', 'side_right', 'camber', 'direction',
+    'normal_x', 'normal_y', 'normal_z', 'length', 'forward_x', 'forward_y', 'forward_z', 'tag', 'grade',
+)
+RADIUS_MAX = 10000.0
+
+
+def _ai_point_dtype():
+    return np.dtype([('position', '<f4', 3), ('length', '<f4'), ('id', '<i4')])
+
+
+def to_ac(vectors):
+    """ Blender (x, y, z) -> AC (x, z, -y) """
+    return np.column_stack((vectors[:, 0], vectors[:, 2], -vectors[:, 1]))
+
+
+def write_ai_spline(path: str, spline: dict):
+    """ spline: {'points': (n, 3) AC, 'lengths': (n,), 'extra': (n, 18), ['ids', 'lap_time', 'sample_count', 'tail']} """
+    count = len(spline['points'])
+    points = np.zeros(count, dtype=_ai_point_dtype())
+    points['position'] = spline['points']
+    points['length'] = spline['lengths']
+    points['id'] = spline.get('ids', np.arange(count))
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4i', spline.get('version', AI_VERSION), count, spline.get('lap_time', 0), spline.get('sample_count', 0)))
+        f.write(points.tobytes())
+        f.write(struct.pack('<i', len(spline['extra'])))
+        f.write(np.ascontiguousarray(spline['extra'], dtype='<f4').tobytes())
+        f.write(spline.get('tail', struct.pack('<i', 0)))
+
+
+def read_ai_spline(path: str):
+    """ Counterpart of write_ai_spline (write_ai_spline(read_ai_spline(file)) reproduces the file) """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    version, count, lap_time, sample_count = struct.unpack_from('<4i', data, 0)
+    offset = 16
+    points = np.frombuffer(data, dtype=_ai_point_dtype(), count=count, offset=offset)
+    offset += points.nbytes
+    extra_count, = struct.unpack_from('<i', data, offset)
+    offset += 4
+    extra = np.frombuffer(data, dtype='<f4', count=extra_count * len(AI_EXTRA_FIELDS), offset=offset).reshape(-1, len(AI_EXTRA_FIELDS))
+    offset += extra.nbytes
+
+    return {
+        'version': version,
+        'lap_time': lap_time,
+        'sample_count': sample_count,
+        'points': points['position'].copy(),
+        'lengths': points['length'].copy(),
+        'ids': points['id'].copy(),
+        'extra': extra.copy(),
+        'tail': data[offset:],
+    }
+
+
+def sample_road_surface(objects: list, points, offsets):
+    """
+    Raycast down onto the road objects at points + offsets (both (n, 3)).
+    Returns (heights (n,), normals (n, 3)), nan / up where the road was missed.
+    Only points inside the bounds of an object are cast against it (cached BVH).
+    """
+    targets = points + offsets
+    heights = np.full(len(targets), np.nan)
+    normals = np.tile((0.0, 0.0, 1.0), (len(targets), 1))
+    top = targets[:, 2].max() + 100.0 if len(targets) else 0.0
+    down = Vector((0.0, 0.0, -1.0))
+
+    for obj in objects:
+        corners = np.array([obj.matrix_world @ Vector(corner) for corner in obj.bound_box])
+        lo, hi = corners.min(axis=0), corners.max(axis=0)
+        inside = np.nonzero((targets[:, 0] >= lo[0]) & (targets[:, 0] <= hi[0]) & (targets[:, 1] >= lo[1]) & (targets[:, 1] <= hi[1]))[0]
+        if len(inside) == 0:
+            continue
+        bvh = get_bvh(obj)
+        for i in inside.tolist():
+            x, y, z = targets[i]
+            location, normal, _, _ = bvh.ray_cast(Vector((x, y, top)), down)
+            # closest hit to the centerline height wins (bridges)
+            if location is not None and (np.isnan(heights[i]) or abs(location.z - z) < abs(heights[i] - z)):
+                heights[i] = location.z
+                normals[i] = normal.normalized() if normal.z >= 0 else -normal.normalized()
+    return heights, normals
+
+
+def build_ai_spline(points, widths, closed: bool, road_objects: list):
+    """ AI spline data (AC coordinates) for a line in Blender coordinates, surface fields sampled from the road """
+    count = len(points)
+    nxt = np.roll(points, -1, axis=0) if closed else np.vstack((points[1:], 2 * points[-1:] - points[-2:-1]))
+    prv = np.roll(points, 1, axis=0) if closed else np.vstack((2 * points[:1] - points[1:2], points[:-1]))
+    forward = nxt - prv
+    forward /= np.maximum(np.linalg.norm(forward, axis=1, keepdims=True), 1e-9)
+
+    segments = np.linalg.norm(nxt - points, axis=1)
+    lengths = np.concatenate(([0.0], np.cumsum(segments[:-1])))
+
+    # curvature radius from the turning angle between neighbour segments
+    a = points - prv
+    b = nxt - points
+    heading_a = np.arctan2(a[:, 1], a[:, 0])
+    heading_b = np.arctan2(b[:, 1], b[:, 0])
+    turn = np.abs((heading_b - heading_a + np.pi) % (2 * np.pi) - np.pi)
+    ds = (np.linalg.norm(a[:, :2], axis=1) + np.linalg.norm(b[:, :2], axis=1)) / 2
+    radius = np.minimum(ds / np.maximum(turn, 1e-9), RADIUS_MAX)
+
+    # camber from the road height left and right of the line
+    side = np.column_stack((forward[:, 1], -forward[:, 0], np.zeros(count)))
+    side /= np.maximum(np.linalg.norm(side, axis=1, keepdims=True), 1e-9)
+    probe = side * (widths / 4)[:, None]
+    center_z, normals = sample_road_surface(road_objects, points, np.zeros_like(points))
+    left_z, _ = sample_road_surface(road_objects, points, -probe)
+    right_z, _ = sample_road_surface(road_objects, points, probe)
+    camber = np.nan_to_num(np.arctan2(left_z - right_z, widths / 2))
+
+    horizontal = np.linalg.norm(forward[:, :2], axis=1)
+    grade = np.arctan2(forward[:, 2], horizontal)
+
+    forward_ac = to_ac(forward)
+    extra = np.zeros((count, len(AI_EXTRA_FIELDS)), dtype=np.float32)
+    field = {name: i for i, name in enumerate(AI_EXTRA_FIELDS)}
+    extra[:, field['radius']] = radius
+    extra[:, field['side_left']] = widths / 2
+    extra[:, field['side_right']] = widths / 2
+    extra[:, field['camber']] = camber
+    extra[:, field['direction']] = np.arctan2(forward_ac[:, 0], forward_ac[:, 2])
+    extra[:, field['normal_x']:field['normal_z'] + 1] = to_ac(normals)
+    extra[:, field['length']] = lengths
+    extra[:, field['forward_x']:field['forward_z'] + 1] = forward_ac
+    extra[:, field['grade']] = grade
+
+    # keep the line on the road surface where it was hit
+    points = points.copy()
+    hit = ~np.isnan(center_z)
+    points[hit, 2] = center_z[hit]
+
+    return {'points': to_ac(points), 'lengths': lengths, 'extra': extra}
+
+
+def get_pit_lane(scene: bpy.types.Scene, centerline: Centerline, spacing: float):
+    """
+    Pit lane as (points, widths, approximated), None without PIT_LANE_NAME curve and pits.
+    The PIT_LANE_NAME curve drawn along the pit road is used as is (in driving direction, point radius =
+    half width, PIT_LANE_WIDTH where the radius was left at 1). Without it the line is approximated:
+    through the AC_PIT objects moved PIT_LANE_OFFSET towards the track (ordered along the centerline),
+    leaving and joining the centerline PIT_LANE_MARGIN before / after the pits.
+    """
+    kd = kdtree.KDTree(len(centerline))
+    for i, co in enumerate(centerline.points.tolist()):
+        kd.insert(co, i)
+    kd.balance()
+
+    curve = read_curve_points(PIT_LANE_NAME)
+    if curve is not None:
+        world, radius = curve
+        widths = np.where(np.isclose(radius, 1.0), PIT_LANE_WIDTH, radius * 2)
+        samples = resample(np.column_stack((world, widths)), spacing, closed=False)
+        middle = len(samples) // 2
+        index = kd.find(samples[middle, :3].tolist())[1]
+        if float(np.dot(samples[min(middle + 1, len(samples) - 1), :3] - samples[max(middle - 1, 0), :3], centerline.tangents[index])) < 0:
+            samples = samples[::-1]
+        return samples[:, :3], samples[:, 3], False
+
+    pits = [obj for obj in scene.objects if ACObjectRegistry.parse(obj.name)[0] == AC_OBJ_PREFIX['PIT']]
+    if not pits:
+        return None
+
+    pit_points = np.array([obj.matrix_world.translation[:] for obj in pits])
+    pit_index = np.array([kd.find(co)[1] for co in pit_points.tolist()])
+
+    # the pit lane runs between the boxes and the track
+    towards = centerline.points[pit_index] - pit_points
+    distance = np.maximum(np.linalg.norm(towards, axis=1, keepdims=True), 1e-6)
+    pit_points = pit_points + towards / distance * np.minimum(distance / 2, PIT_LANE_OFFSET)
+
+    # order along the driving direction, starting after the largest gap (pit lane over start/finish)
+    order = np.argsort(pit_index)
+    pit_index = pit_index[order]
+    gaps = (np.roll(pit_index, -1) - pit_index) % len(centerline)
+    first = (int(np.argmax(gaps)) + 1) % len(pit_index) if len(pit_index) > 1 else 0
+    order = np.roll(order, -first)
+    pit_index = np.roll(pit_index, -first)
+
+    margin = int(PIT_LANE_MARGIN / max(centerline.length / len(centerline), 1e-6))
+    entry = (pit_index[0] - margin) % len(centerline)
+    exit_ = (pit_index[-1] + margin) % len(centerline)
+
+    line = np.vstack((centerline.points[entry], pit_points[order], centerline.points[exit_]))
+    points = resample(line, spacing, closed=False)
+    return points, np.full(len(points), PIT_LANE_WIDTH), True
+
+
+def generate_ai_lines(context: bpy.types.Context, ai_folder: str):
+    """
+    Write fast_lane.ai (oriented centerline) and pit_lane.ai into ai_folder.
+    Returns [(report type, message)], raises ValueError if there is no centerline.
+    """
+    centerline = get_centerline(context, AI_SPACING)
+    if centerline is None:
+        raise ValueError(f"No road objects ('{materials.get_prefix('road')}...') in scene")
+    centerline, direction = orient_to_track(context, centerline)
+
+    reports = []
+    if direction is None:
+        reports.append(({'WARNING'}, f"Driving direction unknown, place {AC_OBJ_PREFIX['START']} objects or set 'run' in {FILE_UI_TRACK}"))
+
+    road_objects = get_road_objects(context.scene)
+    write_ai_spline(os.path.join(ai_folder, "fast_lane.ai"), build_ai_spline(centerline.points, centerline.widths, True, road_objects))
+    reports.append(({'INFO'}, f"fast_lane.ai: {len(centerline)} points, {centerline.length:.0f} m"))
+
+    pit_lane = get_pit_lane(context.scene, centerline, AI_SPACING)
+    if pit_lane is None:
+        reports.append(({'INFO'}, f"No {PIT_LANE_NAME} curve or '{AC_OBJ_PREFIX['PIT']}' objects, pit_lane.ai not written"))
+    else:
+        points, widths, approximated = pit_lane
+        write_ai_spline(os.path.join(ai_folder, "pit_lane.ai"), build_ai_spline(points, widths, False, road_objects))
+        reports.append(({'INFO'}, f"pit_lane.ai: {len(points)} points"))
+        if approximated:
+            reports.append(({'WARNING'}, f"pit_lane.ai approximated from the {AC_OBJ_PREFIX['PIT']} positions, draw a {PIT_LANE_NAME} curve along the pit road for an exact line"))
+    return reports
+
+
+# MAP (map.png, ui/outline.png, data/map.ini)
+#
+# AC maps world (x, z) to map pixels: ((x + X_OFFSET) / SCALE_FACTOR, (z + Z_OFFSET) / SCALE_FACTOR)
+
+MAP_MARGIN = 20         # pixels around the track
+MAP_SUPERSAMPLE = 2     # samples per pixel and axis (anti aliasing)
+OUTLINE_SIZE = 512      # longest side of outline.png
+OUTLINE_STROKE = 2      # pixels the outline shape is grown by (thin roads stay visible)
+RASTER_CHUNK = 200000   # triangles per rasterization batch (bounds memory)
+
+
+def rasterize(tris, width: int, height: int):
+    """
+    Coverage mask (height, width) of 2D triangles (n, 3, 2) in pixel coordinates, all in NumPy:
+    every (triangle, row) pair gives a span between its edge crossings at the pixel center,
+    spans are added to a difference array (+1 start, -1 end) and summed up per row.
+    """
+    diff = np.zeros(height * (width + 1), dtype=np.int32)
+    for first in range(0, len(tris), RASTER_CHUNK):
+        t = tris[first:first + RASTER_CHUNK]
+        ys = t[:, :, 1]
+        row_min = np.clip(np.ceil(ys.min(axis=1) - 0.5), 0, height).astype(np.int64)
+        row_max = np.clip(np.floor(ys.max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+        counts = np.maximum(row_max - row_min + 1, 0)
+        if counts.sum() == 0:
+            continue
+
+        tri = np.repeat(np.arange(len(t)), counts)
+        row = row_min[tri] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        yc = row + 0.5
+
+        x0 = np.full(len(row), np.inf)
+        x1 = np.full(len(row), -np.inf)
+        for a, b in ((0, 1), (1, 2), (2, 0)):
+            xa, ya = t[tri, a, 0], t[tri, a, 1]
+            xb, yb = t[tri, b, 0], t[tri, b, 1]
+            crosses = (yc >= np.minimum(ya, yb)) & (yc <= np.maximum(ya, yb)) & (ya != yb)
+            x = xa + (yc - ya) * (xb - xa) / np.where(ya != yb, yb - ya, 1.0)
+            x0 = np.where(crosses, np.minimum(x0, x), x0)
+            x1 = np.where(crosses, np.maximum(x1, x), x1)
+
+        start = np.clip(np.ceil(x0 - 0.5), 0, width).astype(np.int64)
+        end = np.clip(np.floor(x1 - 0.5) + 1, 0, width).astype(np.int64)
+        valid = start < end
+        base = row[valid] * (width + 1)
+        np.add.at(diff, base + start[valid], 1)
+        np.add.at(diff, base + end[valid], -1)
+
+    return np.cumsum(diff.reshape(height, width + 1), axis=1, dtype=np.int32)[:, :width] > 0
+
+
+def render_coverage(tris, scale: float, offset, width: int, height: int, supersample: int = MAP_SUPERSAMPLE):
+    """ Anti aliased coverage (height, width) in 0..1 of AC (x, z) triangles """
+    pixels = (tris + offset) / scale * supersample
+    mask = rasterize(pixels, width * supersample, height * supersample)
+    return mask.reshape(height, supersample, width, supersample).mean(axis=(1, 3))
+
+
+def grow(mask, radius: int):
+    """ Dilate a boolean mask by radius pixels (square) """
+    if radius <= 0:
+        return mask
+    padded = np.pad(mask, radius)
+    result = np.zeros_like(mask)
+    h, w = mask.shape
+    for dy in range(2 * radius + 1):
+        for dx in range(2 * radius + 1):
+            result |= padded[dy:dy + h, dx:dx + w]
+    return result
+
+
+def to_rgba(alpha):
+    """ White image with alpha 0..1 as uint8 RGBA """
+    pixels = np.full(alpha.shape + (4,), 255, dtype=np.uint8)
+    pixels[..., 3] = np.round(np.clip(alpha, 0, 1) * 255).astype(np.uint8)
+    return pixels
+
+
+def get_map_layout(tris, resolution: int):
+    """ (scale factor, (x offset, z offset), width, height) fitting the AC (x, z) triangles into resolution """
+    points = tris.reshape(-1, 2)
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    scale = max(float((hi - lo).max()), 1e-3) / (resolution - 2 * MAP_MARGIN)
+    offset = -lo + MAP_MARGIN * scale
+    width, height = (np.ceil((hi - lo) / scale).astype(int) + 2 * MAP_MARGIN).tolist()
+    return scale, offset, width, height
+
+
+def generate_map(context: bpy.types.Context, track_folder: TrackFolder, resolution: int):
+    """ Render road and curbs top down to map.png and ui/outline.png, write data/map.ini. Returns (width, height) or None """
+    prefixes = tuple(materials.get_prefix(key) for key in ('road', 'curb'))
+    objects = [obj for obj in context.scene.objects if obj.type == 'MESH' and obj.name.startswith(prefixes)]
+    verts, tris = collect_triangles(objects, context.evaluated_depsgraph_get())
+    if len(tris) == 0:
+        return None
+
+    # AC (x, z) = Blender (x, -y)
+    tris2d = np.stack((verts[:, 0], -verts[:, 1]), axis=1)[tris]
+
+    scale, offset, width, height = get_map_layout(tris2d, resolution)
+    write_png(to_rgba(render_coverage(tris2d, scale, offset, width, height)), os.path.join(track_folder.get_folder(), "map.png"))
+
+    # outline: smaller, shape grown by a few pixels
+    o_scale, o_offset, o_width, o_height = get_map_layout(tris2d, OUTLINE_SIZE)
+    coverage = render_coverage(tris2d, o_scale, o_offset, o_width, o_height)
+    outline = np.maximum(coverage, grow(coverage > 0.5, OUTLINE_STROKE))
+    ui_folder = track_folder.get_folder('ui')
+    os.makedirs(ui_folder, exist_ok=True)
+    write_png(to_rgba(outline), os.path.join(ui_folder, "outline.png"))
+
+    data_folder = track_folder.get_folder('data')
+    os.makedirs(data_folder, exist_ok=True)
+    ini_path = os.path.join(data_folder, FILE_MAP_INI)
+    config = read_config(ini_path if os.path.exists(ini_path) else get_template(FILE_MAP_INI), preserve_case=True)
+    if not config.has_section('PARAMETERS'):
+        config.add_section('PARAMETERS')
+    parameters = config['PARAMETERS']
+    parameters['WIDTH'] = str(width)
+    parameters['HEIGHT'] = str(height)
+    parameters['SCALE_FACTOR'] = f"{scale:.6f}"
+    parameters['X_OFFSET'] = f"{offset[0]:.3f}"
+    parameters['Z_OFFSET'] = f"{offset[1]:.3f}"
+    write_config(config, ini_path)
+
+    return width, height
+
+
+# OPERATOR #
+
+class TRACK_OT_extract_centerline(bpy.types.Operator):
+    bl_idname = "ac_tools.extract_centerline"
+    bl_label = "Extract Centerline"
+    bl_description = f"Compute the centerline of the road objects ({CENTERLINE_NAME}) and write length and width to {FILE_UI_TRACK}"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    spacing: bpy.props.FloatProperty(
+        name="Spacing",
+        description="Distance between centerline points",
+        default=2.0,
+        min=0.1,
+        unit='LENGTH'
+    ) # type: ignore
+    write_ui_track: bpy.props.BoolProperty(
+        name="Update ui_track.json",
+        description=f"Write length and width to {FILE_UI_TRACK}",
+        default=True
+    ) # type: ignore
+
+    def execute(self, context):
+        objects = get_road_objects(context.scene)
+        if not objects:
+            self.report({'INFO'}, f"No road objects ('{materials.get_prefix('road')}...') in scene")
+            return {'FINISHED'}
+
+        try:
+            centerline = extract_centerline(objects, context.evaluated_depsgraph_get(), self.spacing)
+        except ValueError as e:
+            self.report({'WARNING'}, f"Cannot extract centerline: {e}")
+            return {'CANCELLED'}
+
+        centerline, direction = orient_to_track(context, centerline)
+        if direction is None:
+            self.report({'WARNING'}, f"Driving direction unknown, place {AC_OBJ_PREFIX['START']} objects or set 'run' in {FILE_UI_TRACK}")
+        create_centerline_curve(context, centerline)
+        self.report({'INFO'}, f"Track length {centerline.length:.0f} m, average width {centerline.width:.1f} m")
+
+        if self.write_ui_track:
+            path = TrackFolder(get_properties(context).track_folder).get_ac_file_path(FILE_UI_TRACK)
+            if not path or not os.path.exists(path) or not write_track_dimensions(path, centerline):
+                self.report({'INFO'}, f"Cannot locate '{FILE_UI_TRACK}'")
+
+        return {'FINISHED'}
+
+
+class TRACK_OT_generate_ai(bpy.types.Operator):
+    bl_idname = "ac_tools.generate_ai"
+    bl_label = "Generate AI Lines"
+    bl_description = f"Write ai/fast_lane.ai from the centerline ({CENTERLINE_NAME} or extracted from the road) and ai/pit_lane.ai along the pit road ({PIT_LANE_NAME} curve, else approximated from the pits)"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        ai_folder = TrackFolder(get_properties(context).track_folder).get_folder('ai')
+        if not ai_folder:
+            self.report({'INFO'}, "Track folder doesn't exist")
+            return {'FINISHED'}
+        os.makedirs(ai_folder, exist_ok=True)
+
+        try:
+            reports = generate_ai_lines(context, ai_folder)
+        except ValueError as e:
+            self.report({'WARNING'}, f"No centerline: {e}")
+            return {'CANCELLED'}
+
+        for report_type, message in reports:
+            self.report(report_type, message)
+        return {'FINISHED'}
+
+
+class TRACK_OT_generate_map(bpy.types.Operator):
+    bl_idname = "ac_tools.generate_map"
+    bl_label = "Generate Map"
+    bl_description = f"Render road and curbs top down to map.png and ui/outline.png and write data/{FILE_MAP_INI}"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        props = get_properties(context)
+        tf = TrackFolder(props.track_folder)
+        if not tf.get_folder():
+            self.report({'INFO'}, "Track folder doesn't exist")
+            return {'FINISHED'}
+
+        size = generate_map(context, tf, props.map_resolution)
+        if size is None:
+            self.report({'INFO'}, "No road or curb objects in scene")
+            return {'FINISHED'}
+
+        self.report({'INFO'}, f"map.png ({size[0]} x {size[1]}), outline.png and {FILE_MAP_INI} written")
+        return {'FINISHED'}
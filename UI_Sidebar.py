@@ -2,7 +2,15 @@ import bpy
 import os
 
 from .Functions import TrackFolder, get_blender_path, get_properties
-from . Tools_Materials import default_mat_operators, custom_mat_operators, collision_mat_operators
+from .Tools_Materials import MaterialData, is_surface_list_stale, materials_loaded, request_materials_load, request_surface_list_sync
+from .Tools_Rules import last_preview
+from .Tools_Objects import ac_registry
+from .Project_Setup import ensure_track_ui, track_ui_data
+from .Properties import AC_OBJ_PREFIX
+from .Profiling import get_sorted_stats
+from .Tools_Analysis import last_budget_report, last_surface_report
+from .Tools_LOD import get_lod_job_progress, is_lod_job_running, last_lod_result
+from .Tools_Track import PIT_LANE_NAME
 
 
 class UI_Tools(bpy.types.Panel):
@@ -35,12 +43,53 @@ class UI_Objects(bpy.types.Panel):
 
         layout.prop(props, "grid_align", text="Align")
         layout.prop(props, "grid_offset", text="Offset")
-        #layout.prop(props, "track_align", text="Align Track") # make function for align first...
+        layout.prop(props, "track_align", text="Align Track")
         box = layout.box()
         box.operator("object.create_start", icon='RESTRICT_SELECT_OFF')
         box.operator("object.create_hotlap_start", icon='RESTRICT_SELECT_OFF')
         box.operator("object.create_pit", icon='PMARKER_ACT')
         box.operator("object.create_timing", icon='TIME')
+        box.operator("object.create_ac_grid", icon='MESH_GRID')
+        box.operator("object.create_colliders", icon='MOD_PHYSICS')
+
+        # live counts (registry only rescans after changes of AC objects)
+        scene = context.scene
+        col = layout.column(align=True)
+        col.label(text=f"Start: {ac_registry.count(scene, AC_OBJ_PREFIX['START'])}   Hotlap: {ac_registry.count(scene, AC_OBJ_PREFIX['HOTLAP'])}")
+        pits = ac_registry.count(scene, AC_OBJ_PREFIX['PIT'])
+        ensure_track_ui()
+        pitboxes = track_ui_data.get('pitboxes')
+        col.label(text=f"Pits: {pits} / {pitboxes}" if pitboxes is not None else f"Pits: {pits}")
+        col.label(text=f"Timing: {ac_registry.count(scene, AC_OBJ_PREFIX['TIME']) // 2} gate(s)")
+
+
+class AC_UL_surfaces(bpy.types.UIList):
+    """Surface browser (filter by type and name, only visible rows are drawn)"""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name.upper(), icon='MESH_CUBE' if item.surface_type == MaterialData.TYPE_COLLISION else 'VIEW_PERSPECTIVE')
+        row.label(text=item.prefix)
+        if item.surface_type == MaterialData.TYPE_CUSTOM:
+            row.label(text=f"{item.friction:.2f}" if item.friction >= 0 else "-")
+            row.label(text="", icon='CHECKMARK' if item.is_valid_track else 'X')
+        else:
+            row.label(text="-")
+            row.label(text="", icon='BLANK1')
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        if self.filter_name:
+            flags = bpy.types.UI_UL_list.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+        else:
+            flags = [self.bitflag_filter_item] * len(items)
+
+        surface_filter = data.surface_filter
+        if surface_filter != 'ALL':
+            for i, item in enumerate(items):
+                if item.surface_type != surface_filter:
+                    flags[i] = 0
+        return flags, []
 
 
 class UI_Materials(bpy.types.Panel):
@@ -56,36 +105,96 @@ class UI_Materials(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
 
+        props = get_properties(context)
+
+        if not materials_loaded():
+            request_materials_load()
+        elif is_surface_list_stale(context.scene): # e.g. other scene, surfaces.ini values changed
+            request_surface_list_sync()
+
         box = layout.box()
 
         col = box.column()
         col.operator("object.remove_material", icon='TRASH')
         col.separator()
 
-        col.label(text='Default:')
-        for op in default_mat_operators:
-            col.operator(op.bl_idname, icon='VIEW_PERSPECTIVE')
-        if custom_mat_operators:
-            col.label(text='Custom:')
-        for op in custom_mat_operators:
-            col.operator(op.bl_idname, icon='VIEW_PERSPECTIVE')
+        col.row().prop(props, "surface_filter", expand=True)
+        col.template_list("AC_UL_surfaces", "", props, "surfaces", props, "surface_index", rows=6)
 
-        if collision_mat_operators:
-            col.label(text='Collision:')
-        for op in collision_mat_operators:
-            col.operator(op.bl_idname, icon='MESH_CUBE')
+        if 0 <= props.surface_index < len(props.surfaces):
+            item = props.surfaces[props.surface_index]
+            op = col.operator("object.ac_apply_surface", text=f"Make {item.name.capitalize()}", icon='CHECKMARK')
+            op.surface = item.name
 
         box.separator(type='SPACE')
         box.operator("ac_tools.add_material", icon='ADD', text='Add new material')
         box.operator("ac_tools.edit_materials", icon='CURRENT_FILE', text='Edit materials')
         box.operator("ac_tools.load_materials", icon='FILE_REFRESH', text='Reload materials')
 
+        box = layout.box()
+        box.label(text="Auto-Tag:")
+        row = box.row(align=True)
+        row.operator("ac_tools.preview_surface_rules", icon='VIEWZOOM', text='Preview')
+        row.operator("ac_tools.auto_tag_surfaces", icon='CHECKMARK', text='Apply')
+        box.operator("ac_tools.edit_surface_rules", icon='CURRENT_FILE', text='Edit rules')
+        if last_preview:
+            col = box.column(align=True)
+            for surface, count in sorted(last_preview.items()):
+                col.label(text=f"{surface.upper()}: {count}")
+
         row = layout.row()
         row.label(text="""\nTo modify or create materials check your './ac_track/data/surfaces.ini' and adjust it.\
                   \nThe names of the materials have to math the object prefixes! \
                   """, icon='INFO')
     
 
+class UI_Optimize(bpy.types.Panel):
+    """Creates a Panel in the scene context of sidebar"""
+    bl_label = "Optimize"
+    bl_idname = "SCENE_PT_ac_tools_optimize"
+    bl_space_type = 'VIEW_3D'  # Correct space type for the 3D View
+    bl_region_type = 'UI'  # 'UI' is the region type for the Sidebar
+    bl_context = "objectmode"  # You can change this depending on the context where you want the panel to appear
+    bl_category = "AC Tools"
+    bl_parent_id = "SCENE_PT_ac_tools_tools"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+
+        props = get_properties(context)
+
+        # SPLIT
+        box = layout.box()
+        box.prop(props, "split_vertex_limit")
+        box.operator("ac_tools.split_meshes", icon='MOD_EXPLODE')
+
+        # MERGE
+        box = layout.box()
+        box.prop(props, "merge_max_vertices")
+        box.prop(props, "merge_cell_size")
+        row = box.row(align=True)
+        row.operator("ac_tools.merge_objects", icon='AUTOMERGE_ON', text="Merge")
+        row.operator("ac_tools.restore_merged", icon='LOOP_BACK', text="Restore")
+
+        # LOD
+        box = layout.box()
+        box.prop(props, "lod_ratios")
+        box.prop(props, "lod_workers")
+        row = box.row(align=True)
+        row.operator("ac_tools.generate_lods", icon='MOD_DECIM', text="Generate LODs")
+        row.operator("ac_tools.clear_lod_cache", icon='TRASH', text="")
+        if is_lod_job_running():
+            finished, workers = get_lod_job_progress()
+            row = box.row(align=True)
+            row.label(text=f"Decimating: {finished} / {workers} workers done", icon='TIME')
+            row.operator("ac_tools.cancel_lods", icon='CANCEL', text="")
+        elif last_lod_result:
+            row = box.row()
+            row.alert = last_lod_result['failed'] > 0
+            row.label(text=last_lod_result['message'] + (f", {last_lod_result['failed']} worker(s) failed (see console)" if last_lod_result['failed'] else ""))
+
+
 class UI_ProjectSetup(bpy.types.Panel):
     """Creates a Panel in the scene context of sidebar"""
     bl_label = "Project Setup"
@@ -121,6 +230,17 @@ class UI_ProjectSetup(bpy.types.Panel):
             box.operator("project.rename_track", text="Rename Track", icon='GREASEPENCIL')
             #box.operator("project.edit_surface_ini")
 
+            # TRACK DATA (generated from the road)
+            box = layout.box()
+            box.label(text="From Road:")
+            box.operator("ac_tools.extract_centerline", icon='CURVE_PATH')
+            box.operator("ac_tools.generate_ai", icon='AUTO')
+            if not bpy.data.objects.get(PIT_LANE_NAME):
+                box.label(text=f"Pit lane approximated, draw {PIT_LANE_NAME} for the real one", icon='INFO')
+            row = box.row(align=True)
+            row.prop(props, "map_resolution", text="")
+            row.operator("ac_tools.generate_map", icon='IMAGE_DATA')
+
 
 class UI_ProjectExport(bpy.types.Panel):
     """Creates a Panel in the scene context of sidebar"""
@@ -144,4 +264,110 @@ class UI_ProjectExport(bpy.types.Panel):
         box.label(text="Scene to FBX")
         box.prop(props, "disable_export_checks", text="Disable Export Checks")
         box.prop(props, "exp_use_sel", text="Use Selection Only")
+        box.prop(props, "exp_split_meshes", text="Split Large Meshes")
+        box.prop(props, "exp_generate_ai", text="Write AI Lines")
         box.operator("project.export_fbx_for_ac", text="Export FBX for KsEditor", icon='EXPORT')
+
+
+class UI_Analysis(bpy.types.Panel):
+    """Creates a Panel in the scene context of sidebar"""
+    bl_label = "Analysis"
+    bl_idname = "SCENE_PT_ac_tools_analysis"
+    bl_space_type = 'VIEW_3D'  # Correct space type for the 3D View
+    bl_region_type = 'UI'  # 'UI' is the region type for the Sidebar
+    bl_context = "objectmode"  # You can change this depending on the context where you want the panel to appear
+    bl_category = "AC Tools"
+    bl_options = {'DEFAULT_CLOSED'}
+    bl_order = 50
+
+    def draw(self, context):
+        layout = self.layout
+
+        # SURFACE USAGE
+        box = layout.box()
+        box.operator("ac_tools.surface_report", icon='SPREADSHEET')
+        report = last_surface_report
+        if report:
+            col = box.column(align=True)
+            row = col.row()
+            row.label(text="Surface")
+            row.label(text="Objects")
+            row.label(text="Tris")
+            row.label(text="Area m²")
+            for prefix, s in report['surfaces'].items():
+                row = col.row()
+                row.label(text=prefix)
+                row.label(text=f"{s['objects']}")
+                row.label(text=f"{s['triangles']}")
+                row.label(text=f"{s['area_m2']:.0f}")
+            box.label(text=f"Untagged mesh objects: {len(report['untagged'])}", icon='ERROR' if report['untagged'] else 'CHECKMARK')
+            if report['unused_keys']:
+                box.label(text="Unused: " + ", ".join(key.upper() for key in report['unused_keys']), icon='INFO')
+
+        # PERFORMANCE BUDGET
+        props = get_properties(context)
+        box = layout.box()
+        col = box.column(align=True)
+        col.prop(props, "budget_draw_calls")
+        col.prop(props, "budget_triangles")
+        col.prop(props, "budget_mesh_vertices")
+        col.prop(props, "budget_cell_size")
+        box.operator("ac_tools.budget_report", icon='MEMORY')
+        report = last_budget_report
+        if report:
+            totals, budgets = report['totals'], report['budgets']
+            for key, label in (('draw_calls', "Draw Calls"), ('triangles', "Triangles")):
+                row = box.row()
+                row.alert = totals[key] > budgets[key]
+                row.label(text=f"{label}: {totals[key]} / {budgets[key]}")
+            if report['over_vertex_limit']:
+                row = box.row()
+                row.alert = True
+                row.label(text=f"Over vertex limit: {len(report['over_vertex_limit'])}", icon='ERROR')
+            col = box.column(align=True)
+            col.label(text="Heaviest areas:")
+            for cell in report['cells']:
+                col.label(text=f"  {cell['min'][0]:.0f}, {cell['min'][1]:.0f} m: {cell['draw_calls']} calls, {cell['triangles']} tris")
+                col.label(text="      calls: " + ", ".join(cell['worst_draw_calls']))
+                col.label(text="      tris: " + ", ".join(cell['worst_triangles']))
+
+
+class UI_Debug(bpy.types.Panel):
+    """Creates a Panel in the scene context of sidebar"""
+    bl_label = "Debug"
+    bl_idname = "SCENE_PT_ac_tools_debug"
+    bl_space_type = 'VIEW_3D'  # Correct space type for the 3D View
+    bl_region_type = 'UI'  # 'UI' is the region type for the Sidebar
+    bl_context = "objectmode"  # You can change this depending on the context where you want the panel to appear
+    bl_category = "AC Tools"
+    bl_options = {'DEFAULT_CLOSED'}
+    bl_order = 100
+
+    def draw(self, context):
+        layout = self.layout
+
+        layout.prop(context.window_manager, "ac_tools_profiling", text="Profiling")
+        row = layout.row(align=True)
+        row.operator("ac_tools.profile_reset", icon='TRASH', text="Reset")
+        row.operator("ac_tools.profile_dump", icon='EXPORT', text="Save JSON")
+
+        entries = get_sorted_stats()
+        if not entries:
+            return
+
+        col = layout.column(align=True)
+        row = col.row()
+        row.label(text="Name")
+        row.label(text="Calls")
+        row.label(text="Total ms")
+        row.label(text="p95 ms")
+        for name, entry in entries[:20]:
+            row = col.row()
+            row.label(text=name)
+            row.label(text=f"{entry.count}")
+            row.label(text=f"{entry.total * 1000:.1f}")
+            row.label(text=f"{entry.p95() * 1000:.2f}")
+
+        bytes_read = sum(entry.bytes_read for _, entry in entries)
+        if bytes_read:
+            layout.label(text=f"Read: {bytes_read / 1024:.1f} KiB")
@@ -14,31 +14,17 @@
 
 import bpy
 
-from .Functions import get_properties
-from .Tools_Materials import load_materials
 from . import auto_load
 
 auto_load.init()
 
-
-def init():
-    context = bpy.context
-
-    if not context.scene: # check if context is loaded
-        return
-    
-    # init custom materials
-    load_materials(context) # FIXME init hier bringt nur bedingt was, wenn man dann erst projekt öffnet -> auch woanders init für track_folder
-    
-    return None
+# custom materials, track folder state and file watches are initialized lazily on first use
+# and reset per opened file (load_post, see Tools_Materials and Project_Setup)
 
 
 def register():
     auto_load.register()
 
-    bpy.app.timers.register(init, first_interval=0.1) # delay so context is loaded already
-    
-
 
 def unregister():
     auto_load.unregister()
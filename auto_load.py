@@ -1,7 +1,11 @@
 import bpy
+import os
+import sys
+import json
 import typing
 import inspect
 import pkgutil
+import tempfile
 import importlib
 from pathlib import Path
 
@@ -22,7 +26,13 @@ def init():
     global ordered_classes
 
     modules = get_all_submodules(Path(__file__).parent)
-    ordered_classes = get_ordered_classes_to_register(modules)
+
+    # registration order is cached, full discovery only when a module changed
+    stamp = get_modules_stamp(modules)
+    ordered_classes = load_cached_classes(stamp)
+    if ordered_classes is None:
+        ordered_classes = get_ordered_classes_to_register(modules)
+        save_cached_classes(stamp, ordered_classes)
 
 
 def register():
@@ -164,6 +174,60 @@ def get_register_base_types():
     )
 
 
+# Cache registration order
+#################################################
+
+CACHE_FILE = "auto_load_cache.json"
+
+
+def get_cache_path():
+    try:
+        folder = bpy.utils.extension_path_user(__package__, create=True)
+    except (AttributeError, ValueError, RuntimeError): # no extension (legacy add-on)
+        folder = os.path.join(tempfile.gettempdir(), __package__.replace(".", "_"))
+        os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, CACHE_FILE)
+
+
+def get_modules_stamp(modules):
+    stamp = {"blender": list(blender_version)}
+    for module in modules + [sys.modules[__name__]]:
+        st = os.stat(module.__file__)
+        stamp[module.__name__] = [st.st_mtime_ns, st.st_size]
+    return stamp
+
+
+def load_cached_classes(stamp):
+    try:
+        with open(get_cache_path()) as f:
+            cache = json.load(f)
+        if cache.get("stamp") != stamp:
+            return None
+
+        classes = []
+        for module_name, class_name in cache["classes"]:
+            cls = getattr(sys.modules[module_name], class_name)
+            if getattr(cls, "is_registered", False):
+                return None
+            classes.append(cls)
+        return classes
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        return None
+
+
+def save_cached_classes(stamp, classes):
+    try:
+        path = get_cache_path()
+        with open(path + ".tmp", "w") as f:
+            json.dump({
+                "stamp": stamp,
+                "classes": [[cls.__module__, cls.__qualname__] for cls in classes],
+            }, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Cannot write registration cache: {e}")
+
+
 # Find order to register to solve dependencies
 #################################################
 
@@ -0,0 +1,289 @@
+"""
+Headless benchmarks for AC Tools.
+
+Runs with Blender in background mode (or the bpy wheel) on synthetic scenes and track folders:
+
+    blender -b --factory-startup --python-exit-code 1 --python benchmarks/run_benchmarks.py -- \
+        --sizes small,medium --output bench.json --baseline benchmarks/baseline.json
+
+    python benchmarks/run_benchmarks.py --sizes small     (bpy wheel)
+
+Sizes:  small  =   1k objects,  100k road vertices,   2k files, 100 surfaces
+        medium =  10k objects,    1M road vertices,  10k files, 300 surfaces
+        large  = 100k objects,    5M road vertices,  50k files, 1000 surfaces
+
+Results are written as JSON ({"meta": ..., "results": {name: {"median_s", "min_s", "runs"}}}).
+With --baseline, medians are compared against the stored baseline and the script exits with 1
+if a benchmark got slower than --tolerance (default 25%), or with 2 if the baseline file doesn't exist.
+--update-baseline writes the results as new baseline (baselines are machine specific and not committed).
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+from mathutils import Vector
+
+ADDON_DIR = Path(__file__).resolve().parents[1]
+
+SIZES = {
+    "small":  {"objects": 1_000,   "road_vertices": 100_000,   "files": 2_000,  "surfaces": 100},
+    "medium": {"objects": 10_000,  "road_vertices": 1_000_000, "files": 10_000, "surfaces": 300},
+    "large":  {"objects": 100_000, "road_vertices": 5_000_000, "files": 50_000, "surfaces": 1_000},
+}
+ROAD_SEGMENTS_ACROSS = 25   # road grid vertices across the road
+ROAD_WIDTH = 12.0
+
+results = {}
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="AC Tools benchmarks")
+    parser.add_argument("--sizes", default="small", help="comma separated: " + ",".join(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--skip-fbx", action="store_true", help="don't time the FBX export")
+    return parser.parse_args(argv)
+
+
+def load_addon():
+    sys.path.insert(0, str(ADDON_DIR.parent))
+    addon = importlib.import_module(ADDON_DIR.name)
+    addon.register()
+    return addon
+
+
+def submodule(name):
+    return importlib.import_module(f"{ADDON_DIR.name}.{name}")
+
+
+class Reporter():
+    """ Stand-in for the operator 'self' of functions that report """
+    def report(self, type, message):
+        pass
+
+
+def measure(name, fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    results[name] = {"median_s": statistics.median(times), "min_s": min(times), "runs": repeat}
+    print(f"{name:60s} {results[name]['median_s'] * 1000:12.2f} ms")
+
+
+# SYNTHETIC DATA
+
+def reset_scene():
+    """ Remove all data of the previous size (keeps the add-on registered) """
+    ids = [*bpy.data.objects, *bpy.data.meshes, *bpy.data.collections, *bpy.data.materials]
+    bpy.data.batch_remove(ids)
+    submodule("Tools_Objects").ac_registry.mark_dirty()
+    submodule("Functions_Mesh").mesh_cache.clear()
+
+
+def make_grid_mesh(name, nx, ny, size_x, size_y):
+    """ Quad grid with nx * ny vertices built through foreach_set """
+    gx, gy = np.meshgrid(np.linspace(-size_x / 2, size_x / 2, nx), np.linspace(0, size_y, ny))
+    co = np.stack([gx.ravel(), gy.ravel(), np.zeros(nx * ny)], axis=1).astype(np.float32)
+
+    first = (np.arange(ny - 1)[:, None] * nx + np.arange(nx - 1)[None, :]).ravel()
+    quads = np.stack([first, first + 1, first + nx + 1, first + nx], axis=1).astype(np.int32).ravel()
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(nx * ny)
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.loops.add(len(quads))
+    mesh.loops.foreach_set("vertex_index", quads)
+    mesh.polygons.add(len(quads) // 4)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(quads), 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def make_objects(count):
+    mesh = make_grid_mesh("bench_piece", 3, 3, 1.0, 1.0)
+    collection = bpy.data.collections.new("BENCH_OBJECTS")
+    bpy.context.scene.collection.children.link(collection)
+    side = int(np.ceil(np.sqrt(count)))
+    objects = []
+    for i in range(count):
+        obj = bpy.data.objects.new(f"piece_{i}", mesh)
+        obj.location = (i % side * 2.0, i // side * 2.0, 0)
+        collection.objects.link(obj)
+        objects.append(obj)
+    return objects
+
+
+def make_road(vertex_count):
+    ny = max(2, vertex_count // ROAD_SEGMENTS_ACROSS)
+    mesh = make_grid_mesh("bench_road", ROAD_SEGMENTS_ACROSS, ny, ROAD_WIDTH, ny * 0.5)
+    obj = bpy.data.objects.new("1ROAD.bench_road", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def make_track_folder(root, file_count, surface_count, pitboxes):
+    track = os.path.join(root, "bench_track")
+    for sub in ("ui", "ai", "data", "extension"):
+        os.makedirs(os.path.join(track, sub), exist_ok=True)
+
+    # large file tree (skins/textures)
+    per_dir = 200
+    for i in range(file_count):
+        folder = os.path.join(track, "skins", f"skin_{i // per_dir}")
+        if i % per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        open(os.path.join(folder, f"texture_{i}.dds"), "w").close()
+
+    with open(os.path.join(track, "data", "surfaces.ini"), "w") as f:
+        for i in range(surface_count):
+            f.write(f"[SURFACE_{i}]\nKEY=BENCH{i}\nFRICTION=0.98\nDAMPING=0\nWAV=\nWAV_PITCH=0\nFF_EFFECT=NULL\n"
+                    f"DIRT_ADDITIVE=0\nIS_VALID_TRACK=1\nBLACK_FLAG_TIME=0\nSIN_HEIGHT=0\nSIN_LENGTH=0\n"
+                    f"IS_PITLANE=0\nVIBRATION_GAIN=0\nVIBRATION_LENGTH=0\n\n")
+
+    with open(os.path.join(track, "ui", "ui_track.json"), "w") as f:
+        json.dump({"name": "Bench", "pitboxes": str(pitboxes)}, f)
+    return track
+
+
+# BENCHMARKS
+
+def run_size(tag, size, args, tmp):
+    Functions = submodule("Functions")
+    Functions_Mesh = submodule("Functions_Mesh")
+    Tools_Materials = submodule("Tools_Materials")
+    Tools_Objects = submodule("Tools_Objects")
+    Project_Export = submodule("Project_Export")
+    repeat = args.repeat
+    reporter = Reporter()
+
+    reset_scene()
+    context = bpy.context
+    props = Functions.get_properties(context)
+    track = make_track_folder(os.path.join(tmp, tag), size["files"], size["surfaces"], pitboxes=40)
+    props.track_folder = track
+    tf = Functions.TrackFolder(track)
+
+    # file lookup
+    measure(f"get_ac_file_path[cold,{tag}]", lambda: tf.get_ac_file_path("surfaces.ini"), repeat,
+            setup=Functions.invalidate_file_index)
+    measure(f"get_ac_file_path[warm,{tag}]", lambda: [tf.get_ac_file_path("surfaces.ini") for _ in range(1000)], repeat)
+
+    # materials
+    measure(f"load_materials[force,{tag}]", lambda: Tools_Materials.load_materials(context, force=True), repeat)
+    measure(f"load_materials[cached,{tag}]", lambda: Tools_Materials.load_materials(context), repeat)
+
+    # renaming
+    objects = make_objects(size["objects"])
+    measure(f"rename_objects[{tag}]", lambda: Tools_Materials.rename_objects(reporter, objects, "road"), repeat,
+            setup=lambda: Tools_Materials.remove_prefix(reporter, objects))
+    measure(f"remove_prefix[{tag}]", lambda: Tools_Materials.remove_prefix(reporter, objects), repeat,
+            setup=lambda: Tools_Materials.rename_objects(reporter, objects, "road"))
+
+    # AC objects
+    prefix = submodule("Properties").AC_OBJ_PREFIX
+    measure(f"create_ac_grid[40 pits,{tag}]",
+            lambda: Tools_Objects.create_ac_grid(prefix["PIT"], 40, Vector((0, 0, 0)), 8.0), 1)
+    Tools_Objects.create_ac_grid(prefix["START"], 40, Vector((10, 0, 0)), 8.0)
+    Tools_Objects.create_ac_grid(prefix["HOTLAP"], 1, Vector((20, 0, 0)), 8.0)
+    Tools_Objects.create_timing_objects(prefix["TIME"])
+    measure(f"create_ac_object[{tag}]", lambda: Tools_Objects.create_ac_object(prefix["START"]), repeat)
+    measure(f"ac_objects_valid[rebuild,{tag}]", lambda: Project_Export.ac_objects_valid(reporter, context), repeat,
+            setup=Tools_Objects.ac_registry.mark_dirty)
+    measure(f"ac_objects_valid[warm,{tag}]", lambda: Project_Export.ac_objects_valid(reporter, context), repeat)
+
+    # road queries
+    road = make_road(size["road_vertices"])
+    measure(f"kdtree_build[{tag}]", lambda: Functions_Mesh.build_kdtree(road), 1)
+    measure(f"bvh_build[{tag}]", lambda: Functions_Mesh.build_bvh(road), 1)
+    Functions_Mesh.get_bvh(road)
+    Functions_Mesh.get_kdtree(road)
+    cursor = Vector((0.5, road.data.vertices[-1].co.y / 2, 0))
+    measure(f"find_road_placement[cached,{tag}]",
+            lambda: Tools_Objects.find_road_placement(road, cursor, Vector((0, 1, 0))), repeat)
+
+    # export
+    if not args.skip_fbx:
+        fbx_path = os.path.join(tmp, f"{tag}.fbx")
+        measure(f"export_fbx[{tag}]", lambda: bpy.ops.export_scene.fbx(
+            filepath=fbx_path, check_existing=False, global_scale=0.01, apply_unit_scale=True,
+            apply_scale_options='FBX_SCALE_ALL', object_types={'EMPTY', 'MESH', 'OTHER'},
+            axis_forward='-Z', axis_up='Y', use_mesh_modifiers=True, use_triangles=True,
+            mesh_smooth_type='OFF'), 1)
+
+
+def compare(baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f).get("results", {})
+
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or base["median_s"] <= 0:
+            print(f"{name:60s} {'-':>8s}  (not in baseline)")
+            continue
+        ratio = result["median_s"] / base["median_s"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{name:60s} {ratio:8.2f}x {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if args.baseline and not args.update_baseline and not os.path.exists(args.baseline):
+        print(f"Baseline not found: {args.baseline} (create it with --update-baseline)", file=sys.stderr)
+        sys.exit(2)
+    load_addon()
+
+    tmp = tempfile.mkdtemp(prefix="ac_tools_bench_")
+    try:
+        for tag in args.sizes.split(","):
+            run_size(tag, SIZES[tag], args, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    output = {
+        "meta": {
+            "blender": bpy.app.version_string,
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline and args.baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+    elif args.baseline:
+        regressions = compare(args.baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
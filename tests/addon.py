@@ -0,0 +1,27 @@
+"""
+Import helper for the tests.
+
+The add-on modules use relative imports, so the add-on folder is mounted as package 'ac_tools'
+(without running its __init__, nothing is registered). The modules import bpy: the tests need
+Blender's Python or the bpy wheel and are skipped without it.
+
+    python -m pytest tests
+"""
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "ac_tools"
+
+
+def import_addon_module(name: str):
+    pytest.importorskip("bpy")
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ADDON_DIR]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{name}")
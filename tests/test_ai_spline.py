@@ -0,0 +1,83 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from addon import import_addon_module
+
+Tools_Track = import_addon_module("Tools_Track")
+
+
+def make_spline(count: int = 50):
+    rng = np.random.default_rng(7)
+    return {
+        'points': rng.uniform(-500, 500, (count, 3)),
+        'lengths': np.arange(count, dtype=float),
+        'extra': rng.uniform(-1, 1, (count, len(Tools_Track.AI_EXTRA_FIELDS))),
+    }
+
+
+def test_write_read_write_reproduces_the_file(tmp_path):
+    first = tmp_path / "first.ai"
+    second = tmp_path / "second.ai"
+    Tools_Track.write_ai_spline(str(first), make_spline())
+
+    Tools_Track.write_ai_spline(str(second), Tools_Track.read_ai_spline(str(first)))
+
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_unknown_tail_is_kept(tmp_path):
+    spline = make_spline(10)
+    spline['tail'] = struct.pack('<3i', 2, 7, 9) # e.g. grid data of AC's own splines
+    path = tmp_path / "fast_lane.ai"
+    Tools_Track.write_ai_spline(str(path), spline)
+
+    data = Tools_Track.read_ai_spline(str(path))
+
+    assert data['tail'] == spline['tail']
+    assert data['version'] == Tools_Track.AI_VERSION
+    assert np.allclose(data['points'], spline['points'], atol=1e-3)
+    assert np.array_equal(data['ids'], np.arange(10))
+
+
+def test_file_layout(tmp_path):
+    path = tmp_path / "fast_lane.ai"
+    Tools_Track.write_ai_spline(str(path), make_spline(3))
+
+    data = path.read_bytes()
+    assert struct.unpack_from('<4i', data, 0) == (Tools_Track.AI_VERSION, 3, 0, 0)
+    extra_offset = 16 + 3 * 20
+    assert struct.unpack_from('<i', data, extra_offset) == (3,)
+    assert len(data) == extra_offset + 4 + 3 * len(Tools_Track.AI_EXTRA_FIELDS) * 4 + 4
+
+
+def circle(count: int = 100, clockwise: bool = False):
+    angle = np.linspace(0, 2 * np.pi, count, endpoint=False) * (-1 if clockwise else 1)
+    points = np.column_stack((100 * np.cos(angle), 100 * np.sin(angle), np.zeros(count)))
+    return Tools_Track.Centerline(points, np.arange(count, dtype=float))
+
+
+def test_orient_starts_at_start_line_in_driving_direction():
+    oriented = Tools_Track.orient_centerline(circle(), start=np.array((0.0, 100.0, 0.0)), forward=np.array((1.0, 0.0, 0.0)))
+
+    assert np.allclose(oriented.points[0], (0.0, 100.0, 0.0))
+    assert oriented.points[1, 0] > 0 # driving towards +x
+    assert oriented.widths[0] == 25 # widths follow their points
+
+
+@pytest.mark.parametrize("clockwise", (True, False))
+def test_orient_by_run(clockwise):
+    for line in (circle(clockwise=False), circle(clockwise=True)):
+        oriented = Tools_Track.orient_centerline(line, clockwise=clockwise)
+        x, y = oriented.points[:, 0], oriented.points[:, 1]
+        area = np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+        assert (area < 0) == clockwise
+
+
+def test_parse_run():
+    assert Tools_Track.parse_run("clockwise") is True
+    assert Tools_Track.parse_run("Counter-Clockwise") is False
+    assert Tools_Track.parse_run("anti-clockwise") is False
+    assert Tools_Track.parse_run("") is None
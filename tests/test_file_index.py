@@ -0,0 +1,57 @@
+import os
+
+from addon import import_addon_module
+
+Functions = import_addon_module("Functions")
+FileIndex = Functions.FileIndex
+
+
+def make_file(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write("x")
+    return str(path)
+
+
+def test_lookup_finds_files_in_sub_folders(tmp_path):
+    surfaces = make_file(tmp_path / "data" / "surfaces.ini")
+    ui_track = make_file(tmp_path / "ui" / "ui_track.json")
+
+    index = FileIndex(str(tmp_path))
+    assert index.lookup("surfaces.ini") == surfaces
+    assert index.lookup("ui_track.json") == ui_track
+    assert index.lookup("missing.ini") is None
+
+
+def test_first_match_wins_like_os_walk(tmp_path):
+    top = make_file(tmp_path / "map.ini")
+    make_file(tmp_path / "data" / "map.ini")
+
+    assert FileIndex(str(tmp_path)).lookup("map.ini") == top
+
+
+def test_new_file_is_found_after_validate_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileIndex, "VALIDATE_INTERVAL", 0.0)
+    index = FileIndex(str(tmp_path))
+    assert index.lookup("surfaces.ini") is None
+
+    path = make_file(tmp_path / "surfaces.ini")
+    os.utime(tmp_path, ns=(0, 0)) # mtime change independent of the file system resolution
+    assert index.lookup("surfaces.ini") == path
+
+
+def test_deleted_file_is_not_returned(tmp_path):
+    path = make_file(tmp_path / "data" / "surfaces.ini")
+    index = FileIndex(str(tmp_path))
+    assert index.lookup("surfaces.ini") == path
+
+    os.remove(path)
+    assert index.lookup("surfaces.ini") is None
+
+
+def test_get_file_index_is_cached_per_folder(tmp_path):
+    index = Functions.get_file_index(str(tmp_path))
+    assert Functions.get_file_index(str(tmp_path)) is index
+
+    Functions.invalidate_file_index()
+    assert Functions.get_file_index(str(tmp_path)) is not index
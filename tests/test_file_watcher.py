@@ -0,0 +1,84 @@
+import os
+from types import SimpleNamespace
+
+from addon import import_addon_module
+
+Functions = import_addon_module("Functions")
+FileWatcher = Functions.FileWatcher
+
+
+class Clock():
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def touch(path, text: str, mtime_ns: int):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns)) # stamp change independent of the file system resolution
+
+
+def make_watcher(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(Functions, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(FileWatcher, "DEBOUNCE", 0.5)
+    return FileWatcher(), clock
+
+
+def test_callback_waits_until_the_file_is_stable(tmp_path, monkeypatch):
+    watcher, clock = make_watcher(monkeypatch)
+    surfaces = tmp_path / "surfaces.ini"
+    touch(surfaces, "a", 1_000_000_000)
+    calls = []
+    watcher.watch("surfaces.ini", calls.append)
+
+    watcher.poll(str(tmp_path))
+    clock.now = 0.6
+    watcher.poll(str(tmp_path))
+    assert calls == [str(surfaces)]
+
+    clock.now = 1.0
+    touch(surfaces, "ab", 2_000_000_000)
+    watcher.poll(str(tmp_path))
+    clock.now = 1.2
+    touch(surfaces, "abc", 3_000_000_000) # still being written
+    watcher.poll(str(tmp_path))
+    clock.now = 1.6
+    watcher.poll(str(tmp_path))
+    assert len(calls) == 1
+
+    clock.now = 1.8
+    watcher.poll(str(tmp_path))
+    clock.now = 2.5
+    watcher.poll(str(tmp_path))
+    assert len(calls) == 2
+
+
+def test_only_watched_files_are_reported(tmp_path, monkeypatch):
+    watcher, clock = make_watcher(monkeypatch)
+    touch(tmp_path / "surfaces.ini", "a", 1_000_000_000)
+    touch(tmp_path / "ui_track.json", "{}", 1_000_000_000)
+    calls = []
+
+    watcher.poll(str(tmp_path))
+    clock.now = 1.0
+    watcher.poll(str(tmp_path))
+    assert calls == []
+
+    watcher.watch("ui_track.json", calls.append)
+    watcher.poll(str(tmp_path))
+    clock.now = 2.0
+    watcher.poll(str(tmp_path))
+    assert calls == [str(tmp_path / "ui_track.json")]
+
+
+def test_timer_does_not_poll_before_first_watch(monkeypatch):
+    watcher = FileWatcher()
+    polls = []
+    monkeypatch.setattr(watcher, "poll", polls.append)
+    monkeypatch.setattr(Functions, "file_watcher", watcher)
+
+    assert Functions._poll_file_watcher() == FileWatcher.POLL_INTERVAL
+    assert polls == []
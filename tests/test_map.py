@@ -0,0 +1,83 @@
+import struct
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from addon import import_addon_module
+
+Functions = import_addon_module("Functions")
+Tools_Track = import_addon_module("Tools_Track")
+
+
+def read_png(path):
+    """ Minimal decoder for the files write_png writes (RGBA 8 bit, filter 0) """
+    data = path.read_bytes()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    offset, chunks = 8, []
+    while offset < len(data):
+        length, = struct.unpack_from('>I', data, offset)
+        tag = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack_from('>I', data, offset + 8 + length)
+        assert crc == zlib.crc32(tag + body) & 0xffffffff
+        chunks.append((tag, body))
+        offset += 12 + length
+
+    assert [tag for tag, _ in chunks] == [b'IHDR', b'IDAT', b'IEND']
+    width, height, depth, color, _, _, _ = struct.unpack('>2I5B', chunks[0][1])
+    assert (depth, color) == (8, 6)
+    rows = np.frombuffer(zlib.decompress(chunks[1][1]), dtype=np.uint8).reshape(height, width * 4 + 1)
+    assert not rows[:, 0].any()
+    return rows[:, 1:].reshape(height, width, 4)
+
+
+def test_write_png_round_trip(tmp_path):
+    pixels = np.random.default_rng(3).integers(0, 256, (7, 5, 4), dtype=np.uint8)
+    path = tmp_path / "map.png"
+
+    Functions.write_png(pixels, str(path))
+
+    assert np.array_equal(read_png(path), pixels)
+
+
+def square(x0, y0, x1, y1):
+    """ Two triangles covering an axis aligned rectangle """
+    return np.array([
+        [(x0, y0), (x1, y0), (x1, y1)],
+        [(x0, y0), (x1, y1), (x0, y1)],
+    ], dtype=float)
+
+
+def test_rasterize_rectangle_covers_pixel_centers_inside():
+    mask = Tools_Track.rasterize(square(2, 3, 6, 5), 10, 8)
+
+    expected = np.zeros((8, 10), dtype=bool)
+    expected[3:5, 2:6] = True
+    assert np.array_equal(mask, expected)
+
+
+def test_rasterize_clips_to_image():
+    mask = Tools_Track.rasterize(square(-5, -5, 3, 2), 4, 4)
+
+    expected = np.zeros((4, 4), dtype=bool)
+    expected[0:2, 0:3] = True
+    assert np.array_equal(mask, expected)
+
+
+def test_rasterize_triangle_area():
+    tri = np.array([[(0, 0), (200, 0), (0, 100)]], dtype=float)
+
+    mask = Tools_Track.rasterize(tri, 256, 128)
+
+    assert abs(int(mask.sum()) - 10000) < 200
+
+
+def test_rasterize_in_chunks_matches_single_pass(monkeypatch):
+    rng = np.random.default_rng(1)
+    tris = rng.uniform(0, 64, (50, 3, 2))
+    single = Tools_Track.rasterize(tris, 64, 64)
+
+    monkeypatch.setattr(Tools_Track, "RASTER_CHUNK", 7)
+    assert np.array_equal(Tools_Track.rasterize(tris, 64, 64), single)
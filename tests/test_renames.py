@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from addon import import_addon_module
+
+Tools_Materials = import_addon_module("Tools_Materials")
+
+
+def objects(*names):
+    return [SimpleNamespace(name=name) for name in names]
+
+
+def test_plan_add_prefix_skips_tagged_objects():
+    objs = objects("asphalt", "1ROAD.main", "1GRASS_field")
+
+    plan, skipped = Tools_Materials.plan_add_prefix(objs, "1ROAD")
+
+    assert [(obj.name, new_name) for obj, new_name in plan] == [("asphalt", "1ROAD.asphalt")]
+    assert skipped == 2
+
+
+def test_plan_remove_prefix_strips_prefix_and_delimiter():
+    objs = objects("1ROAD.main", "1KERB_left", "1WALL-barrier", "untagged", "1ROAD")
+
+    plan = Tools_Materials.plan_remove_prefix(objs)
+
+    assert [(obj.name, new_name) for obj, new_name in plan] == [
+        ("1ROAD.main", "main"),
+        ("1KERB_left", "left"),
+        ("1WALL-barrier", "barrier"),
+    ]
+
+
+def test_add_then_remove_restores_names():
+    objs = objects("fence", "tree.001")
+    plan, _ = Tools_Materials.plan_add_prefix(objs, "1WALL")
+    tagged = objects(*(new_name for _, new_name in plan))
+
+    assert [new_name for _, new_name in Tools_Materials.plan_remove_prefix(tagged)] == ["fence", "tree.001"]
+
+
+def test_strip_prefix():
+    assert Tools_Materials.strip_prefix("1WALL.barrier") == "barrier"
+    assert Tools_Materials.strip_prefix("barrier") == "barrier"
+
+
+def test_apply_renames_waits_for_names_freed_after_truncation():
+    bpy = Tools_Materials.bpy
+    clipped = "1ROAD." + "a" * 57
+    holder = bpy.data.objects.new(clipped, None)
+    source = bpy.data.objects.new("a" * 60, None)
+    try:
+        plan = [(source, "1ROAD." + "a" * 60), (holder, "holder")]
+
+        Tools_Materials.apply_renames(plan)
+
+        assert len(clipped.encode()) == Tools_Materials.MAX_NAME_BYTES
+        assert source.name == clipped
+        assert holder.name == "holder"
+    finally:
+        bpy.data.objects.remove(source)
+        bpy.data.objects.remove(holder)
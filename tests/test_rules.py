@@ -0,0 +1,55 @@
+import json
+
+from addon import import_addon_module
+
+Tools_Rules = import_addon_module("Tools_Rules")
+RuleSet = Tools_Rules.RuleSet
+
+
+def test_glob_and_regex_are_case_insensitive():
+    rules = RuleSet([
+        {"match": "material", "pattern": "asphalt*", "surface": "road"},
+        {"match": "object", "pattern": "^kerb_\\d+$", "regex": True, "surface": "curb"},
+    ])
+
+    assert rules.errors == []
+    assert rules.classify("x", ["ASPHALT_dark"], []) == "road"
+    assert rules.classify("KERB_12", [], []) == "curb"
+    assert rules.classify("kerb_a", ["grass"], []) is None
+
+
+def test_first_matching_rule_wins():
+    rules = RuleSet([
+        {"match": "collection", "pattern": "runoff", "surface": "sand"},
+        {"match": "material", "pattern": "*", "surface": "GRASS"},
+    ])
+
+    assert rules.classify("obj", ["any"], ["Runoff"]) == "sand"
+    assert rules.classify("obj", ["any"], ["other"]) == "grass"
+
+
+def test_invalid_rules_are_reported_and_skipped():
+    rules = RuleSet([
+        {"match": "shader", "pattern": "*", "surface": "road"},
+        {"match": "object", "pattern": "(", "regex": True, "surface": "road"},
+        {"match": "object", "surface": "road"},
+        "not a rule",
+        {"match": "object", "pattern": "ok", "surface": "road"},
+    ])
+
+    assert len(rules.errors) == 4
+    assert len(rules.rules) == 1
+
+
+def test_load_rules_reports_wrong_top_level(tmp_path):
+    path = tmp_path / "surface_rules.json"
+    path.write_text(json.dumps([{"pattern": "*", "surface": "road"}]))
+
+    rules = Tools_Rules.load_rules(str(path))
+
+    assert rules.rules == []
+    assert len(rules.errors) == 1
+
+
+def test_load_rules_missing_file(tmp_path):
+    assert Tools_Rules.load_rules(str(tmp_path / "missing.json")) is None
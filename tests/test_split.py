@@ -0,0 +1,138 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from addon import import_addon_module
+
+Tools_Optimize = import_addon_module("Tools_Optimize")
+
+
+def grid_buffers(nx: int, ny: int, split_corners: bool = False):
+    """ Buffers of a flat nx * ny quad grid as read_mesh_buffers returns them (ids: export vertex per corner) """
+    x, y = np.meshgrid(np.arange(nx + 1), np.arange(ny + 1))
+    co = np.column_stack((x.ravel(), y.ravel(), np.zeros(x.size))).astype(np.float32)
+    i, j = np.meshgrid(np.arange(nx), np.arange(ny))
+    v = (j * (nx + 1) + i).ravel()
+    corners = np.column_stack((v, v + 1, v + nx + 2, v + nx + 1)).ravel().astype(np.int32)
+    count = nx * ny
+    return {
+        'co': co,
+        'corners': corners,
+        'centers': co[corners.reshape(-1, 4)].mean(axis=1),
+        'loop_start': (np.arange(count) * 4).astype(np.int32),
+        'loop_total': np.full(count, 4, dtype=np.int32),
+        'ids': np.arange(len(corners), dtype=np.int32) if split_corners else corners,
+        'attributes': [],
+    }
+
+
+def export_vertices(buffers, polys):
+    loops = Tools_Optimize._polygon_loops(buffers['loop_start'][polys], buffers['loop_total'][polys])
+    return len(np.unique(buffers['ids'][loops]))
+
+
+@pytest.mark.parametrize("split_corners", (False, True))
+def test_chunks_respect_limit_and_cover_all_polygons(split_corners):
+    buffers = grid_buffers(40, 25, split_corners)
+    limit = 300
+
+    chunks = Tools_Optimize.split_polygons(buffers, limit)
+
+    assert len(chunks) > 1
+    assert all(export_vertices(buffers, polys) <= limit for polys in chunks)
+    assert np.array_equal(np.sort(np.concatenate(chunks)), np.arange(40 * 25))
+
+
+def test_mesh_within_limit_is_one_chunk():
+    buffers = grid_buffers(4, 4)
+
+    chunks = Tools_Optimize.split_polygons(buffers, 1000)
+
+    assert len(chunks) == 1
+    assert np.array_equal(chunks[0], np.arange(16))
+
+
+def test_split_is_deterministic():
+    buffers = grid_buffers(30, 30)
+
+    first = Tools_Optimize.split_polygons(buffers, 200)
+    second = Tools_Optimize.split_polygons(buffers, 200)
+
+    assert [c.tolist() for c in first] == [c.tolist() for c in second]
+
+
+def corner_normals(mesh):
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    mesh.corner_normals.foreach_get('vector', normals)
+    return normals.reshape(-1, 3)
+
+
+def sharp_edges(mesh):
+    """ Sharp edges as sorted vertex coordinate pairs (comparable across meshes) """
+    attr = mesh.attributes.get('sharp_edge')
+    if attr is None:
+        return set()
+    co = [tuple(vertex.co) for vertex in mesh.vertices]
+    return {tuple(sorted((co[edge.vertices[0]], co[edge.vertices[1]]))) for edge, value in zip(mesh.edges, attr.data) if value.value}
+
+
+def sharp_smoothed_grid(nx: int, ny: int):
+    """ Grid mesh with a hard crease along x == 2 and tilted custom normals """
+    bpy = Tools_Optimize.bpy
+    grid = grid_buffers(nx, ny)
+    mesh = Tools_Optimize.build_mesh("sharp_source", grid['co'], grid['corners'], grid['loop_total'], [], [])
+    co = grid['co']
+    edges = np.array([edge.vertices[:] for edge in mesh.edges])
+    sharp = mesh.attributes.new('sharp_edge', 'BOOLEAN', 'EDGE')
+    sharp.data.foreach_set('value', (co[edges][:, :, 0] == 2).all(axis=1))
+    normals = np.column_stack((0.1 * co[:, 0], np.zeros(len(co)), np.ones(len(co))))
+    mesh.normals_split_custom_set_from_vertices(normals / np.linalg.norm(normals, axis=1)[:, None])
+    return bpy, mesh
+
+
+def test_chunks_keep_sharp_edges_and_corner_normals():
+    bpy, source = sharp_smoothed_grid(12, 6)
+    buffers = Tools_Optimize.read_mesh_buffers(source)
+    chunks = []
+    try:
+        whole = Tools_Optimize.build_chunk_mesh(buffers, [], np.arange(len(buffers['loop_total'])), "whole")
+        chunks.append(whole)
+        assert len(sharp_edges(source)) == 6
+        assert sharp_edges(whole) == sharp_edges(source)
+        assert np.allclose(corner_normals(whole), corner_normals(source), atol=1e-3)
+
+        found = set()
+        for polys in Tools_Optimize.split_polygons(buffers, 40):
+            chunk = Tools_Optimize.build_chunk_mesh(buffers, [], polys, "chunk")
+            chunks.append(chunk)
+            loops = Tools_Optimize._polygon_loops(buffers['loop_start'][polys], buffers['loop_total'][polys])
+            assert np.allclose(corner_normals(chunk), buffers['normals'][loops], atol=1e-3)
+            found |= sharp_edges(chunk)
+        assert len(chunks) > 2
+        assert found == sharp_edges(source)
+    finally:
+        for mesh in chunks + [source]:
+            bpy.data.meshes.remove(mesh)
+
+
+def merge_part(attributes, active_uv: str = None):
+    buffers = grid_buffers(1, 1)
+    buffers.update(edges=np.array([[0, 1], [1, 3], [3, 2], [2, 0]], dtype=np.int32), normals=np.tile([0.0, 0.0, 1.0], (4, 1)), active_uv=active_uv, dropped=[], attributes=attributes)
+    return buffers
+
+
+def test_merge_keeps_edge_data_and_refuses_conflicting_attributes():
+    sharp = ('sharp_edge', 'BOOLEAN', 'EDGE', 'value', np.array([True, False, False, True]))
+    first = merge_part([sharp])
+    second = merge_part([sharp])
+    conflicting = merge_part([('sharp_edge', 'BOOLEAN', 'FACE', 'value', np.array([True]))])
+
+    layouts = {}
+    assert Tools_Optimize.get_merge_conflict(layouts, first) is None
+    assert Tools_Optimize.get_merge_conflict(layouts, second) is None
+    assert "sharp_edge" in Tools_Optimize.get_merge_conflict(layouts, conflicting)
+
+    co, corners, loop_total, attributes, edges, normals = Tools_Optimize.merge_buffers([first, second])
+    assert edges.tolist()[4:] == [[4, 5], [5, 7], [7, 6], [6, 4]]
+    assert attributes[0][4].tolist() == [True, False, False, True] * 2
+    assert len(normals) == len(corners) == 8
@@ -0,0 +1,77 @@
+import os
+
+from addon import import_addon_module
+
+Tools_Materials = import_addon_module("Tools_Materials")
+SurfaceStore = Tools_Materials.SurfaceStore
+
+SURFACES = """[SURFACE_0]
+KEY=ROAD
+FRICTION=0.99
+
+[SURFACE_1]
+KEY=KERB
+FRICTION=0.92
+
+[SURFACE_2]
+KEY=GRASS
+FRICTION=0.6
+"""
+
+
+def write_surfaces(path, text: str = SURFACES):
+    path.write_text(text)
+    return str(path)
+
+
+def test_unchanged_file_is_not_read_again(tmp_path, monkeypatch):
+    path = write_surfaces(tmp_path / "surfaces.ini")
+    reads = []
+    read_config = Tools_Materials.read_config
+    monkeypatch.setattr(Tools_Materials, "read_config", lambda file: reads.append(file) or read_config(file))
+
+    store = SurfaceStore()
+    assert store.load(path)
+    assert not store.load(path)
+    assert len(reads) == 1
+    assert store.keys() == ["ROAD", "KERB", "GRASS"]
+
+
+def test_add_surface_takes_the_free_slot_after_a_deletion(tmp_path):
+    path = write_surfaces(tmp_path / "surfaces.ini", SURFACES.replace("[SURFACE_1]\nKEY=KERB\nFRICTION=0.92\n\n", ""))
+    store = SurfaceStore()
+    store.load(path)
+
+    assert store.add_surface("SAND", {"friction": 0.8}) == "SURFACE_1"
+    assert store.add_surface("GRAVEL", {"friction": 0.7}) == "SURFACE_3"
+    assert store.has_key("sand") and store.dirty
+
+
+def test_save_only_writes_when_dirty(tmp_path, monkeypatch):
+    path = write_surfaces(tmp_path / "surfaces.ini")
+    writes = []
+    monkeypatch.setattr(Tools_Materials, "write_config", lambda config, file: writes.append(file))
+
+    store = SurfaceStore()
+    store.load(path)
+    assert not store.save()
+    assert writes == []
+
+    store.add_surface("SAND", {"friction": 0.8})
+    assert store.save()
+    assert writes == [path]
+    assert not store.dirty
+
+
+def test_external_edit_is_picked_up(tmp_path):
+    path = write_surfaces(tmp_path / "surfaces.ini")
+    store = SurfaceStore()
+    store.load(path)
+    revision = store.revision
+
+    write_surfaces(tmp_path / "surfaces.ini", SURFACES + "\n[SURFACE_3]\nKEY=SAND\nFRICTION=0.8\n")
+    os.utime(path, ns=(0, 0)) # stamp change independent of the file system resolution
+
+    assert store.load(path)
+    assert store.has_key("SAND")
+    assert store.revision > revision
@@ -0,0 +1,87 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from addon import import_addon_module
+
+Tools_Track = import_addon_module("Tools_Track")
+
+
+def ring(segments: int = 32, outer: float = 60.0, inner: float = 50.0):
+    """ Flat closed road: ring of quads (two triangles each) between two circles """
+    angle = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    circle = np.column_stack((np.cos(angle), np.sin(angle), np.zeros(segments)))
+    verts = np.vstack((circle * outer, circle * inner))
+    tris = []
+    for i in range(segments):
+        j = (i + 1) % segments
+        tris += [(i, j, segments + i), (j, segments + j, segments + i)]
+    return verts, np.array(tris, dtype=np.int64)
+
+
+def test_resample_closed_is_evenly_spaced():
+    square = np.array([(0, 0, 0), (10, 0, 0), (10, 10, 0), (0, 10, 0)], dtype=float)
+
+    points = Tools_Track.resample(square, spacing=1.0)
+
+    assert len(points) == 40
+    steps = np.linalg.norm(np.roll(points, -1, axis=0) - points, axis=1)
+    assert np.allclose(steps, 1.0)
+
+
+def test_resample_open_keeps_end_points():
+    line = np.array([(0, 0, 0), (3, 0, 0), (3, 4, 0)], dtype=float)
+
+    points = Tools_Track.resample(line, count=8, closed=False)
+
+    assert np.allclose(points[0], line[0]) and np.allclose(points[-1], line[-1])
+
+
+def test_resample_measures_distance_on_coordinates_only():
+    # 4th column (width) is interpolated, not part of the distance
+    line = np.array([(0, 0, 0, 5), (10, 0, 0, 500)], dtype=float)
+
+    points = Tools_Track.resample(line, spacing=1.0, closed=False)
+
+    assert len(points) == 11
+    assert np.allclose(points[:, 3], np.linspace(5, 500, 11))
+
+
+def test_weld_merges_close_vertices_and_drops_degenerate_triangles():
+    verts = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 0, 0.001), (1, 1, 0)], dtype=float)
+    tris = np.array([(0, 1, 2), (3, 4, 2), (1, 3, 2)])
+
+    welded, welded_tris = Tools_Track.weld(verts, tris)
+
+    assert len(welded) == 4
+    assert len(welded_tris) == 2
+    assert welded_tris.max() < len(welded)
+
+
+def test_boundary_loops_of_ring():
+    verts, tris = ring()
+
+    loops, defects = Tools_Track.get_boundary_loops(tris, len(verts))
+
+    assert defects == 0
+    assert [len(loop) for loop in loops] == [32, 32]
+    assert {frozenset(loop) for loop in loops} == {frozenset(range(32)), frozenset(range(32, 64))}
+
+
+def test_boundary_loops_ignore_flipped_triangles():
+    verts, tris = ring()
+    tris[::3] = tris[::3, ::-1]
+
+    loops, defects = Tools_Track.get_boundary_loops(tris, len(verts))
+
+    assert defects == 0
+    assert [len(loop) for loop in loops] == [32, 32]
+
+
+def test_boundary_loops_report_holes():
+    verts, tris = ring()
+
+    loops, defects = Tools_Track.get_boundary_loops(tris[1:], len(verts))
+
+    assert loops == []
+    assert defects > 0
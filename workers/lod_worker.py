@@ -0,0 +1,65 @@
+"""
+LOD worker for AC Tools (see Tools_LOD.start_lod_job).
+
+Runs in a headless Blender started by the add-on:
+
+    blender -b --factory-startup --python-exit-code 1 --python workers/lod_worker.py -- <job.json>
+
+job.json:
+    {"source": "<.blend with the source meshes>",
+     "tasks": [{"mesh": "<mesh name>", "ratio": 0.5, "output": "<cache .blend>"}, ...]}
+
+Every task decimates one mesh (collapse) and writes the result as a single mesh
+named after the output file into its own .blend, so finished tasks are cached
+even if another task fails.
+"""
+import json
+import os
+import sys
+
+import bpy
+
+
+def run(job: dict):
+    with bpy.data.libraries.load(job['source']) as (data_from, data_to):
+        data_to.meshes = sorted({task['mesh'] for task in job['tasks']} & set(data_from.meshes))
+    meshes = {mesh.name: mesh for mesh in data_to.meshes if mesh}
+
+    scene = bpy.context.scene
+    failed = 0
+    for task in job['tasks']:
+        source = meshes.get(task['mesh'])
+        if source is None:
+            print(f"lod_worker: mesh '{task['mesh']}' not found", file=sys.stderr)
+            failed += 1
+            continue
+
+        obj = bpy.data.objects.new("lod_source", source)
+        scene.collection.objects.link(obj)
+        modifier = obj.modifiers.new("Decimate", 'DECIMATE')
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = task['ratio']
+        modifier.use_collapse_triangulate = True
+
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        lod = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+        lod.name = os.path.splitext(os.path.basename(task['output']))[0]
+
+        # write to a temporary name first, the add-on only picks up complete files
+        tmp_path = task['output'] + ".tmp"
+        bpy.data.libraries.write(tmp_path, {lod}, fake_user=True)
+        os.replace(tmp_path, task['output'])
+
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(lod)
+
+    return failed
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if len(argv) != 1:
+        print("usage: blender -b --factory-startup --python lod_worker.py -- <job.json>", file=sys.stderr)
+        sys.exit(2)
+    with open(argv[0], 'r', encoding='utf-8') as f:
+        sys.exit(1 if run(json.load(f)) else 0)